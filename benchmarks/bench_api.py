@@ -0,0 +1,185 @@
+# bench_api.py - Prueba de carga de servidor_api: latencia p50/p99 y solicitudes por segundo
+#
+# Uso: python benchmarks/bench_api.py [--aeronaves 20000] [--clientes 32] [--solicitudes 20000]
+#                                     [--escrituras 0.1] [--lectores 8] [--url http://127.0.0.1:8080]
+#
+# Sin --url levanta servidor_api.py en un subproceso sobre una base temporal
+# poblada con --aeronaves aeronaves; con --url prueba un servidor ya en marcha.
+# Cada cliente mantiene una conexión keep-alive y envía sus solicitudes en serie.
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from database import DatabaseManager
+from bench_pool import poblar_flota
+
+
+class ClienteHTTP:
+    """Cliente HTTP/1.1 mínimo sobre una conexión persistente"""
+
+    def __init__(self, host, puerto):
+        self.host = host
+        self.puerto = puerto
+        self.reader = self.writer = None
+
+    async def solicitar(self, metodo, ruta, datos=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.puerto)
+        cuerpo = json.dumps(datos).encode("utf-8") if datos is not None else b""
+        self.writer.write(f"{metodo} {ruta} HTTP/1.1\r\nHost: {self.host}\r\n"
+                          f"Content-Type: application/json\r\n"
+                          f"Content-Length: {len(cuerpo)}\r\n\r\n".encode("latin-1") + cuerpo)
+        await self.writer.drain()
+        estado = int((await self.reader.readline()).split()[1])
+        largo = 0
+        cerrar = False
+        while True:
+            linea = await self.reader.readline()
+            if linea in (b"\r\n", b""):
+                break
+            clave, _, valor = linea.decode("latin-1").partition(":")
+            if clave.lower() == "content-length":
+                largo = int(valor)
+            elif clave.lower() == "connection" and valor.strip().lower() == "close":
+                cerrar = True
+        respuesta = await self.reader.readexactly(largo)
+        if cerrar:
+            self.cerrar()
+        return estado, json.loads(respuesta)
+
+    def cerrar(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def generar_solicitud(azar, aeronaves, proporcion_escrituras):
+    """(tipo, método, ruta, datos) con una mezcla de lecturas y escrituras"""
+    aeronave_id = azar.randint(1, aeronaves)
+    r = azar.random()
+    if r < proporcion_escrituras:
+        return ("POST vuelos", "POST", f"/api/aeronaves/{aeronave_id}/vuelos",
+                {"horas": round(azar.uniform(0.5, 12), 1), "fecha": "2024-06-01",
+                 "origen": "LPB", "destino": "VVI"})
+    r = azar.random()
+    if r < 0.70:
+        return "GET aeronave", "GET", f"/api/aeronaves/{aeronave_id}", None
+    if r < 0.85:
+        return "GET página", "GET", f"/api/aeronaves?limite=50&despues_de={aeronave_id}", None
+    if r < 0.95:
+        return "GET mantenimientos", "GET", f"/api/aeronaves/{aeronave_id}/mantenimientos", None
+    return "GET alertas", "GET", "/api/alertas?desde_version=0", None
+
+
+async def cliente(host, puerto, solicitudes, latencias, errores):
+    conexion = ClienteHTTP(host, puerto)
+    try:
+        for tipo, metodo, ruta, datos in solicitudes:
+            inicio = time.perf_counter()
+            estado, _ = await conexion.solicitar(metodo, ruta, datos)
+            latencias.setdefault(tipo, []).append(time.perf_counter() - inicio)
+            if estado >= 400:
+                errores[estado] = errores.get(estado, 0) + 1
+    finally:
+        conexion.cerrar()
+
+
+async def ejecutar_carga(host, puerto, args):
+    azar = random.Random(42)
+    solicitudes = [generar_solicitud(azar, args.aeronaves, args.escrituras) for _ in range(args.solicitudes)]
+    latencias, errores = {}, {}
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente(host, puerto, solicitudes[i::args.clientes], latencias, errores)
+                           for i in range(args.clientes)))
+    return time.perf_counter() - inicio, latencias, errores
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def esperar_servidor(host, puerto, proceso, limite_s=30):
+    fin = time.monotonic() + limite_s
+    while time.monotonic() < fin:
+        if proceso.poll() is not None:
+            raise RuntimeError("El servidor terminó antes de aceptar conexiones")
+        try:
+            socket.create_connection((host, puerto), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("El servidor no respondió a tiempo")
+
+
+def informar(segundos, latencias, errores, total):
+    print(f"{total:,} solicitudes en {segundos:.2f} s: {total / segundos:,.0f} solicitudes/s")
+    print(f"{'Tipo':<22}{'Cantidad':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    todas = []
+    for tipo in sorted(latencias):
+        valores = latencias[tipo]
+        todas.extend(valores)
+        print(f"{tipo:<22}{len(valores):>10,}{percentil(valores, 50) * 1000:>10.2f}"
+              f"{percentil(valores, 99) * 1000:>10.2f}")
+    print(f"{'Total':<22}{len(todas):>10,}{percentil(todas, 50) * 1000:>10.2f}"
+          f"{percentil(todas, 99) * 1000:>10.2f}")
+    if errores:
+        print("Errores: " + ", ".join(f"{estado}: {n:,}" for estado, n in sorted(errores.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API HTTP")
+    parser.add_argument("--aeronaves", type=int, default=20000)
+    parser.add_argument("--clientes", type=int, default=32)
+    parser.add_argument("--solicitudes", type=int, default=20000)
+    parser.add_argument("--escrituras", type=float, default=0.1, help="Proporción de solicitudes de escritura")
+    parser.add_argument("--lectores", type=int, default=8)
+    parser.add_argument("--url", help="Probar un servidor existente en lugar de levantar uno")
+    args = parser.parse_args()
+
+    if args.url:
+        url = urlsplit(args.url)
+        segundos, latencias, errores = asyncio.run(ejecutar_carga(url.hostname, url.port or 80, args))
+        informar(segundos, latencias, errores, args.solicitudes)
+        return
+
+    with tempfile.TemporaryDirectory() as directorio:
+        db_name = os.path.join(directorio, "bench.db")
+        db = DatabaseManager(db_name)
+        poblar_flota(db, args.aeronaves)
+        db.cerrar_conexion()
+
+        puerto = puerto_libre()
+        proceso = subprocess.Popen([sys.executable, os.path.join(RAIZ, "servidor_api.py"), "--db", db_name,
+                                    "--puerto", str(puerto), "--lectores", str(args.lectores)],
+                                   stdout=subprocess.DEVNULL)
+        try:
+            esperar_servidor("127.0.0.1", puerto, proceso)
+            print(f"Flota: {args.aeronaves:,} aeronaves | clientes: {args.clientes} | "
+                  f"lectores: {args.lectores} | escrituras: {args.escrituras:.0%}")
+            segundos, latencias, errores = asyncio.run(ejecutar_carga("127.0.0.1", puerto, args))
+            informar(segundos, latencias, errores, args.solicitudes)
+        finally:
+            proceso.terminate()
+            proceso.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# bench_arranque.py - Tiempo de importación al arrancar (python -X importtime)
+#
+# Compara lo que importa main.py al arrancar con lo que importaría si la IA y
+# los reportes se cargaran de forma inmediata.
+# Uso: python benchmarks/bench_arranque.py [--repeticiones 3] [--top 10]
+import argparse
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ESCENARIOS = [
+    ("Arranque (carga diferida)", "import main"),
+    ("Arranque + IA + reportes", "import main, ia_aeronaves, ventana_reportes"),
+]
+
+
+def medir_importaciones(codigo):
+    """Ejecutar en un intérprete nuevo y devolver {módulo: (propio_us, acumulado_us, nivel)}"""
+    proceso = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo],
+                             cwd=RAIZ, capture_output=True, text=True, check=True)
+    modulos = {}
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "self [us]" in linea:
+            continue
+        propio, acumulado, nombre = linea[len("import time:"):].split("|")
+        nivel = (len(nombre) - len(nombre.lstrip())) // 2
+        modulos[nombre.strip()] = (int(propio), int(acumulado), nivel)
+    return modulos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de tiempo de arranque")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    for titulo, codigo in ESCENARIOS:
+        totales = []
+        for _ in range(args.repeticiones):
+            modulos = medir_importaciones(codigo)
+            # El nivel 0 (mínimo indentado) contiene el tiempo acumulado de cada raíz
+            totales.append(sum(a for _, a, nivel in modulos.values() if nivel == 0))
+        mejor = min(totales) / 1000
+        print(f"{titulo}: {mejor:8.1f} ms en imports ({len(modulos)} módulos)")
+        raices = sorted(((a, n) for n, (_, a, nivel) in modulos.items() if nivel == 0), reverse=True)
+        for acumulado, nombre in raices[:args.top]:
+            print(f"    {acumulado / 1000:8.1f} ms  {nombre}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
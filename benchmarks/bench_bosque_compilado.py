@@ -0,0 +1,89 @@
+# bench_bosque_compilado.py - Bosque compilado en numpy vs predict_proba de sklearn
+#
+# Uso: python benchmarks/bench_bosque_compilado.py [--filas 100000] [--repeticiones 200]
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import numpy as np
+
+from bosque_compilado import BosqueCompilado, ARCHIVO_COMPILADO
+from database import DatabaseManager
+from servicio_modelo import ServicioModeloIA
+
+
+def generar_flota(cantidad, semilla=7):
+    rng = np.random.default_rng(semilla)
+    pesos = rng.uniform(100, 500000, cantidad)
+    horas = rng.uniform(0, 8000, cantidad)
+    anos = rng.integers(1970, 2026, cantidad)
+    return np.column_stack([pesos, horas, anos])
+
+
+def medir(funcion, X, repeticiones):
+    """Mediana de los tiempos en ms"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(X)
+        tiempos.append(time.perf_counter() - inicio)
+    return np.median(tiempos) * 1000
+
+
+def tiempo_importacion(modulo):
+    codigo = f"import time; t = time.perf_counter(); import {modulo}; print(time.perf_counter() - t)"
+    salida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+    return float(salida.stdout.strip()) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del bosque compilado")
+    parser.add_argument("--filas", type=int, default=100000)
+    parser.add_argument("--repeticiones", type=int, default=200, help="Repeticiones de la medición por fila")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        db = DatabaseManager(os.path.join(directorio, "bench.db"))
+        ia = ServicioModeloIA(db, directorio)
+        ia.ejecutar_entrenamiento()
+        modelo, scaler = ia.modelo, ia.scaler
+        bosque = BosqueCompilado.cargar(os.path.join(directorio, ARCHIVO_COMPILADO))
+        tamano_joblib = os.path.getsize(os.path.join(directorio, "modelo_actual.joblib"))
+        tamano_npz = os.path.getsize(os.path.join(directorio, ARCHIVO_COMPILADO))
+
+        X = generar_flota(args.filas)
+        sklearn_proba = lambda X: modelo.predict_proba(scaler.transform(X))
+
+        # Igualdad exacta; con n_jobs=1 sklearn suma los árboles en orden fijo
+        n_jobs = modelo.n_jobs
+        modelo.n_jobs = 1
+        esperado = sklearn_proba(X)
+        modelo.n_jobs = n_jobs
+        obtenido = bosque.predict_proba(X)
+        assert np.array_equal(esperado, obtenido), "Las probabilidades no coinciden con sklearn"
+        categorias_sklearn = ia.label_encoder_categoria.inverse_transform(modelo.classes_[esperado.argmax(axis=1)])
+        assert (bosque.predecir_categorias_lote(X)[0] == categorias_sklearn).all()
+
+        print(f"Bosque: {bosque.arboles} árboles, {bosque.nodos:,} nodos, profundidad {bosque.profundidad}")
+        print(f"Archivo: joblib {tamano_joblib / 1e6:.2f} MB | npz {tamano_npz / 1e6:.2f} MB")
+        print(f"Importación: sklearn + servicio {tiempo_importacion('servicio_modelo'):.0f} ms | "
+              f"bosque_compilado {tiempo_importacion('bosque_compilado'):.0f} ms")
+        print(f"{args.filas:,} filas idénticas a sklearn (probabilidades bit a bit)")
+        print(f"{'Filas':>8}{'sklearn ms':>14}{'compilado ms':>14}{'Aceleración':>13}")
+        for filas in (1, 10, 100, 1000, 10000, args.filas):
+            muestra = X[:filas]
+            repeticiones = max(3, args.repeticiones // filas)
+            t_sklearn = medir(sklearn_proba, muestra, repeticiones)
+            t_compilado = medir(bosque.predict_proba, muestra, repeticiones)
+            print(f"{filas:>8,}{t_sklearn:>14.3f}{t_compilado:>14.3f}{t_sklearn / t_compilado:>12.1f}x")
+        db.cerrar_conexion()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# bench_costos.py - Reporte de costos: consulta agregada vs resultado en caché
+#
+# Uso: python benchmarks/bench_costos.py [--mantenimientos 200000] [--aeronaves 5000]
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager, AGRUPACIONES_COSTOS
+from bench_pool import poblar_flota
+
+TIPOS = ["Preventivo", "Correctivo", "Inspección", "Overhaul"]
+
+
+def poblar_mantenimientos(db, cantidad, aeronaves):
+    tecnico_id = db.obtener_tecnicos()[0][0]
+    filas = [(random.randint(1, aeronaves), random.choice(TIPOS),
+              f"20{random.randint(20, 25)}-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+              tecnico_id, "", round(random.uniform(100, 50000), 2), None, 1)
+             for _ in range(cantidad)]
+    db.insertar_mantenimientos_lote(filas)
+
+
+def medir(funcion, repeticiones=1):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del reporte de costos")
+    parser.add_argument("--mantenimientos", type=int, default=200000)
+    parser.add_argument("--aeronaves", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        db = DatabaseManager(os.path.join(directorio, "costos.db"))
+        poblar_flota(db, args.aeronaves)
+        poblar_mantenimientos(db, args.mantenimientos, args.aeronaves)
+
+        print(f"{args.mantenimientos:,} mantenimientos")
+        print(f"{'Agrupación':<12}{'Consulta (ms)':>15}{'Caché (ms)':>12}")
+        for agrupacion in AGRUPACIONES_COSTOS:
+            consulta = medir(lambda: db._leer_costos(agrupacion))
+            db.obtener_costos(agrupacion)
+            cache = medir(lambda: db.obtener_costos(agrupacion), repeticiones=200)
+            print(f"{agrupacion:<12}{consulta:>15.1f}{cache:>12.3f}")
+
+        # Una escritura cambia costos_version y la siguiente lectura vuelve a consultar
+        total = sum(c[1] for c in db.obtener_costos('tipo'))
+        db.insertar_mantenimientos_lote([(1, "Correctivo", "2025-01-01", db.obtener_tecnicos()[0][0],
+                                          "", 1000.0, None, 1)])
+        assert abs(sum(c[1] for c in db.obtener_costos('tipo')) - total - 1000.0) < 1e-6
+        print("Invalidación tras escritura: OK")
+        db.cerrar_conexion()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# bench_datos_entrenamiento.py - Preparación de datos de entrenamiento: listas de tuplas vs bloques en arreglos
+#
+# Uso: python benchmarks/bench_datos_entrenamiento.py [--aeronaves 500000] [--max-filas 100000]
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import numpy as np
+
+from database import DatabaseManager
+from servicio_modelo import ServicioModeloIA, GRUPOS_SINTETICOS
+from bench_pool import poblar_flota
+
+
+def preparar_con_listas(db):
+    """Ruta anterior: todas las filas como tuplas, listas por columna y np.array al final"""
+    X, y, fabricantes = [], [], []
+    for aeronave in db.obtener_aeronaves():
+        peso_mtow = aeronave[4] if aeronave[4] else 10000
+        horas_vuelo = aeronave[6] if aeronave[6] else 100
+        ano_estimado = 2024 - int(horas_vuelo / 500) if horas_vuelo > 500 else 2020
+        X.append([peso_mtow, horas_vuelo, ano_estimado])
+        y.append(aeronave[5])
+        fabricantes.append(aeronave[3])
+    return np.array(X), np.array(y), np.array(fabricantes)
+
+
+def sinteticos_con_listas():
+    """Ruta anterior de datos sintéticos: una lista de valores mixtos por muestra"""
+    rng = np.random.RandomState(42)
+    datos = []
+    for categoria, (cantidad, peso, horas, anos, marcas) in GRUPOS_SINTETICOS.items():
+        for _ in range(cantidad):
+            datos.append([rng.uniform(*peso), rng.uniform(*horas), rng.randint(*anos), categoria, rng.choice(marcas)])
+    rng.shuffle(datos)
+    return (np.array([[d[0], d[1], d[2]] for d in datos]), np.array([d[3] for d in datos]),
+            np.array([d[4] for d in datos]))
+
+
+def medir(funcion, repeticiones=1):
+    """(resultado, segundos por llamada, pico de memoria en MB)"""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        resultado = funcion()
+    segundos = (time.perf_counter() - inicio) / repeticiones
+    pico = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return resultado, segundos, pico
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la preparación de datos de entrenamiento")
+    parser.add_argument("--aeronaves", type=int, default=500000)
+    parser.add_argument("--max-filas", type=int, default=100000, help="Tope de filas de la variante acotada")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        db = DatabaseManager(os.path.join(directorio, "bench.db"))
+        poblar_flota(db, args.aeronaves)
+        ia = ServicioModeloIA(db, directorio)
+
+        (X_a, y_a, f_a), t_listas, m_listas = medir(lambda: preparar_con_listas(db))
+        (X_b, y_b, f_b), t_bloques, m_bloques = medir(ia.preparar_datos_entrenamiento)
+        assert np.array_equal(X_a, X_b) and (y_a == y_b).all() and (f_a == f_b).all()
+        del X_a, y_a, f_a, X_b, y_b, f_b
+
+        ia.max_filas_entrenamiento = args.max_filas
+        (X_c, y_c, _), t_tope, m_tope = medir(ia.preparar_datos_entrenamiento)
+        proporciones = ", ".join(f"{c} {np.mean(y_c == c):.1%}" for c in np.unique(y_c))
+
+        _, t_sint_listas, _ = medir(sinteticos_con_listas, 50)
+        _, t_sint, _ = medir(ia.generar_datos_sinteticos, 50)
+        db.cerrar_conexion()
+
+    print(f"Flota: {args.aeronaves:,} aeronaves")
+    print(f"{'Ruta':<34}{'Tiempo s':>10}{'Pico MB':>10}")
+    print(f"{'Tuplas y listas (anterior)':<34}{t_listas:>10.2f}{m_listas:>10.1f}")
+    print(f"{'Bloques en arreglos':<34}{t_bloques:>10.2f}{m_bloques:>10.1f}")
+    print(f"{f'Bloques con tope de {args.max_filas:,} filas':<34}{t_tope:>10.2f}{m_tope:>10.1f}"
+          f"  muestra {len(X_c):,} filas ({proporciones})")
+    print(f"Datos sintéticos: por muestra {t_sint_listas * 1000:.2f} ms | vectorizados {t_sint * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# bench_entrenamiento.py - Tamaño del bosque vs tiempo de ajuste, tamaño en memoria y latencia
+#
+# Uso: python benchmarks/bench_entrenamiento.py [--muestras 20000] [--arboles 25 50 100 200]
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import numpy as np
+
+from servicio_modelo import ServicioModeloIA
+
+
+def datos_sinteticos(cantidad, semilla=42):
+    """Datos etiquetados con las reglas de peso MTOW"""
+    rng = np.random.default_rng(semilla)
+    pesos = rng.uniform(500, 400000, cantidad)
+    horas = rng.uniform(0, 5000, cantidad)
+    anos = rng.integers(2000, 2024, cantidad)
+    categorias = np.where(pesos <= 5700, "Liviana", np.where(pesos <= 27000, "Mediana", "Pesada"))
+    fabricantes = np.full(cantidad, "Fabricante")
+    return np.column_stack([pesos, horas, anos]), categorias, fabricantes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de entrenamiento del bosque")
+    parser.add_argument("--muestras", type=int, default=20000)
+    parser.add_argument("--arboles", type=int, nargs="+", default=[25, 50, 100, 200])
+    parser.add_argument("--n-jobs", type=int, nargs="+", default=[1, -1])
+    args = parser.parse_args()
+
+    datos = datos_sinteticos(args.muestras)
+    X_consulta = datos[0][:1]
+
+    print(f"Muestras: {args.muestras}  Núcleos disponibles: {os.cpu_count()}")
+    print(f"{'árboles':>8} {'n_jobs':>6} {'ajuste s':>9} {'bosque MB':>10} "
+          f"{'precisión':>9} {'1 fila ms':>9}")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        os.chdir(directorio)
+        ia = ServicioModeloIA(None)
+        ia.preparar_datos_entrenamiento = lambda: datos
+        ia.guardar_modelo = lambda: None
+
+        for n_jobs in args.n_jobs:
+            for arboles in args.arboles:
+                r = ia.ejecutar_entrenamiento(n_estimators=arboles, n_jobs=n_jobs)
+                inicio = time.perf_counter()
+                for _ in range(50):
+                    ia.predecir_categorias_lote(X_consulta)
+                latencia = (time.perf_counter() - inicio) / 50 * 1000
+                print(f"{r['arboles']:>8} {n_jobs:>6} {r['tiempo_ajuste_s']:>9.2f} "
+                      f"{r['tamano_modelo_mb']:>10.2f} "
+                      f"{r['precision']:>9.2%} {latencia:>9.2f}")
+
+        # Warm start: añadir árboles sin reentrenar desde cero
+        ia.ejecutar_entrenamiento(n_estimators=50)
+        r = ia.ampliar_modelo(50)
+        print(f"warm start 50 -> {r['arboles']} árboles: {r['tiempo_ajuste_s']:.2f} s")
+        os.chdir(RAIZ)
+
+
+if __name__ == "__main__":
+    main()
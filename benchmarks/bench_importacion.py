@@ -0,0 +1,76 @@
+# bench_importacion.py - Filas por segundo: insertar_aeronave fila a fila vs importador por lotes
+#
+# Uso: python benchmarks/bench_importacion.py [--filas 100000] [--lote 1000]
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from categorias import categorizar_aeronave
+from database import DatabaseManager
+from importador import ImportadorAeronaves
+
+
+def generar_csv(ruta, filas, duplicadas=0.01):
+    """Escribir una flota sintética; una fracción de filas repite matrícula"""
+    hangares = ["Hangar A", "Hangar B", "Hangar C", "Hangar D"]
+    with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(["matricula", "modelo", "fabricante", "peso_mtow", "horas_vuelo", "hangar"])
+        for i in range(filas):
+            numero = random.randrange(i) if i and random.random() < duplicadas else i
+            escritor.writerow([f"IM-{numero:07d}", "Modelo", "Fabricante",
+                               round(random.uniform(800, 400000), 1),
+                               round(random.uniform(0, 30000), 1), hangares[i % 4]])
+
+
+def importar_fila_a_fila(db, ruta, limite):
+    """Ruta anterior: una llamada a insertar_aeronave (y un commit) por fila"""
+    hangares = {h[1]: h[0] for h in db.obtener_hangares()}
+    with open(ruta, newline="", encoding="utf-8") as archivo:
+        for i, fila in enumerate(csv.DictReader(archivo)):
+            if i >= limite:
+                break
+            peso = float(fila["peso_mtow"])
+            db.insertar_aeronave(fila["matricula"], fila["modelo"], fila["fabricante"], peso,
+                                 categorizar_aeronave(peso), float(fila["horas_vuelo"]),
+                                 hangares[fila["hangar"]])
+    return min(limite, i + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la importación masiva de flota")
+    parser.add_argument("--filas", type=int, default=100000)
+    parser.add_argument("--lote", type=int, default=1000)
+    parser.add_argument("--filas-lento", type=int, default=2000,
+                        help="filas a cargar con insertar_aeronave (la ruta lenta)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_csv = os.path.join(directorio, "flota.csv")
+        generar_csv(ruta_csv, args.filas)
+
+        db = DatabaseManager(os.path.join(directorio, "fila.db"))
+        inicio = time.perf_counter()
+        filas = importar_fila_a_fila(db, ruta_csv, args.filas_lento)
+        fila_a_fila = filas / (time.perf_counter() - inicio)
+        db.cerrar_conexion()
+
+        db = DatabaseManager(os.path.join(directorio, "lote.db"))
+        resultado = ImportadorAeronaves(db, tamano_lote=args.lote).importar(ruta_csv)
+        db.cerrar_conexion()
+
+    print(f"insertar_aeronave por fila: {fila_a_fila:12,.0f} filas/s ({filas:,} filas)")
+    print(f"importador por lotes:       {resultado.filas_por_segundo:12,.0f} filas/s "
+          f"({resultado.leidas:,} filas, {resultado.insertadas:,} registradas, "
+          f"{resultado.total_rechazos:,} rechazadas)")
+    print(f"aceleración:                {resultado.filas_por_segundo / fila_a_fila:12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# bench_mantenimiento_flota.py - Análisis predictivo aeronave por aeronave vs vectorizado para toda la flota
+#
+# Uso: python benchmarks/bench_mantenimiento_flota.py [--aeronaves 100000] [--muestra 2000]
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import numpy as np
+
+from database import DatabaseManager
+from servicio_modelo import ServicioModeloIA
+from bench_pool import poblar_flota
+
+
+def analisis_por_aeronave(db, aeronave_id):
+    """Ruta anterior: una consulta y aritmética escalar por aeronave"""
+    aeronave = db.obtener_aeronave_por_id(aeronave_id)
+    horas_vuelo = aeronave[6]
+    categoria = aeronave[5]
+    limite = {"Liviana": 100, "Mediana": 150, "Pesada": 200}.get(categoria, 150)
+    horas_restantes = limite - (horas_vuelo % limite)
+    if horas_restantes <= 10:
+        urgencia = "CRÍTICA"
+    elif horas_restantes <= 25:
+        urgencia = "ALTA"
+    elif horas_restantes <= 50:
+        urgencia = "MEDIA"
+    else:
+        urgencia = "BAJA"
+    costo_base = {"Liviana": 1500, "Mediana": 5000, "Pesada": 15000}
+    costo_estimado = costo_base.get(categoria, 5000) * (1 + horas_vuelo / 10000)
+    return horas_restantes, urgencia, costo_estimado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del análisis predictivo de la flota")
+    parser.add_argument("--aeronaves", type=int, default=100000)
+    parser.add_argument("--muestra", type=int, default=2000,
+                        help="aeronaves medidas con el bucle por aeronave (se extrapola)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        os.chdir(directorio)
+        db = DatabaseManager(os.path.join(directorio, "bench.db"))
+        poblar_flota(db, args.aeronaves)
+        ia = ServicioModeloIA(db)
+        with db.conexion() as conn:
+            ids = [fila[0] for fila in conn.execute("SELECT id FROM aeronaves")]
+
+        muestra = ids[:args.muestra]
+        inicio = time.perf_counter()
+        por_aeronave = {i: analisis_por_aeronave(db, i) for i in muestra}
+        t_aeronave = (time.perf_counter() - inicio) / len(muestra)
+
+        inicio = time.perf_counter()
+        puntaje = ia.puntuar_flota()
+        t_flota = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        prioridades = ia.priorizar_mantenimiento_flota(100)
+        t_top = time.perf_counter() - inicio
+
+        # Mismos resultados que el bucle escalar con los umbrales por defecto
+        posicion = {int(i): k for k, i in enumerate(puntaje['id'])}
+        for aeronave_id, (restantes, urgencia, costo) in por_aeronave.items():
+            k = posicion[aeronave_id]
+            assert np.isclose(puntaje['horas_restantes'][k], restantes)
+            assert np.isclose(puntaje['costo_estimado'][k], costo)
+        db.cerrar_conexion()
+        os.chdir(RAIZ)
+
+    n = len(ids)
+    print(f"Flota: {n} aeronaves")
+    print(f"Por aeronave (estimado): {t_aeronave * n:8.2f} s")
+    print(f"Vectorizado:             {t_flota:8.2f} s")
+    print(f"Aceleración:             {t_aeronave * n / t_flota:8.1f}x")
+    print(f"Top 100 priorizado:      {t_top:8.2f} s (primera: {prioridades[0][1]}, {prioridades[0][6]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# bench_planificador.py - Tiempo del planificador de mantenimientos sobre cargas sintéticas
+#
+# Uso: python benchmarks/bench_planificador.py [--demandas 5000] [--hangares 20] [--tecnicos 150]
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from database import DatabaseManager
+from planificador import PlanificadorMantenimiento, Demanda
+from bench_pool import poblar_flota
+
+ESPECIALIDADES = ["Motores", "Aviónica", "Estructural", "Sistemas Hidráulicos", "Instrumentos"]
+
+
+def poblar_recursos(db, hangares, tecnicos):
+    with db.conexion() as conn:
+        conn.executemany("INSERT INTO hangares (nombre, ubicacion, capacidad) VALUES (?, ?, ?)",
+                         [(f"Hangar BM-{i}", "Sintético", random.randint(2, 8)) for i in range(hangares)])
+        conn.executemany("INSERT INTO tecnicos (nombre, especialidad, licencia) VALUES (?, ?, ?)",
+                         [(f"Técnico {i}", ESPECIALIDADES[i % len(ESPECIALIDADES)], f"BM-{i:05d}")
+                          for i in range(tecnicos)])
+    db.cache.invalidar()
+
+
+def verificar_plan(planificador, resultado):
+    """Comprobar que ningún técnico, hangar ni avión quedó con turnos superpuestos"""
+    D = planificador.horizonte_dias
+    uso = {h: np.zeros(D, dtype=int) for h in planificador.hangar_ids.tolist()}
+    tecnico = {}
+    aeronave = {}
+    for a in resultado.asignaciones:
+        dias = slice(planificador._dia(a.fecha), planificador._dia(a.fecha) + a.demanda.duracion_dias)
+        uso[a.hangar_id][dias] += 1
+        for agenda in (tecnico.setdefault(a.tecnico_id, np.zeros(D, dtype=int)),
+                       aeronave.setdefault(a.demanda.aeronave_id, np.zeros(D, dtype=int))):
+            agenda[dias] += 1
+    capacidad = dict(zip(planificador.hangar_ids.tolist(), planificador.capacidad.tolist()))
+    assert all(uso[h].max() <= capacidad[h] for h in uso)
+    assert all(agenda.max() <= 1 for agenda in list(tecnico.values()) + list(aeronave.values()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del planificador de mantenimientos")
+    parser.add_argument("--demandas", type=int, default=5000)
+    parser.add_argument("--hangares", type=int, default=20)
+    parser.add_argument("--tecnicos", type=int, default=150)
+    parser.add_argument("--horizonte", type=int, default=60)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        db = DatabaseManager(os.path.join(directorio, "plan.db"))
+        poblar_flota(db, args.demandas)
+        poblar_recursos(db, args.hangares, args.tecnicos)
+        with db.conexion() as conn:
+            ids = [fila[0] for fila in conn.execute("SELECT id FROM aeronaves")]
+
+        demandas = [Demanda(random.choice(ids), duracion_dias=random.choice([1, 1, 2, 3]),
+                            plazo_dias=random.choice([2, 7, 14, 30]),
+                            especialidad=random.choice(ESPECIALIDADES + [None]), prioridad=i)
+                    for i in range(args.demandas)]
+
+        planificador = PlanificadorMantenimiento(db, horizonte_dias=args.horizonte)
+        resultado = planificador.planificar(demandas)
+        verificar_plan(planificador, resultado)
+
+        inicio = time.perf_counter()
+        planificador.guardar(resultado)
+        t_guardar = time.perf_counter() - inicio
+        db.cerrar_conexion()
+
+    print(f"Demandas: {args.demandas:,} | hangares: {args.hangares} | técnicos: {args.tecnicos} "
+          f"| horizonte: {args.horizonte} días")
+    print(resultado.resumen())
+    print(f"Demandas/s: {args.demandas / resultado.segundos:,.0f}")
+    print(f"Guardado del plan: {t_guardar:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# bench_pool.py - Consultas por segundo: conexión por llamada vs pool persistente
+#
+# Uso: python benchmarks/bench_pool.py [--aeronaves 100000] [--consultas 20000]
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+
+
+def poblar_flota(db, cantidad):
+    """Insertar una flota sintética en un solo lote"""
+    categorias = [("Liviana", 1200), ("Mediana", 15000), ("Pesada", 75000)]
+    filas = []
+    for i in range(cantidad):
+        categoria, peso = categorias[i % 3]
+        filas.append((f"BM-{i:06d}", "Modelo", "Fabricante", peso, categoria,
+                      random.uniform(0, 5000), 1 + i % 4, "2024-01-01"))
+    with db.conexion() as conn:
+        conn.executemany("""INSERT INTO aeronaves 
+                         (matricula, modelo, fabricante, peso_mtow, categoria, horas_vuelo, hangar_id, fecha_registro) 
+                         VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", filas)
+
+
+def consulta_sin_pool(db_name, aeronave_id):
+    """Ruta anterior: abrir y cerrar una conexión por cada consulta"""
+    conn = sqlite3.connect(db_name)
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM aeronaves WHERE id = ?", (aeronave_id,))
+    resultado = cursor.fetchone()
+    conn.close()
+    return resultado
+
+
+def medir(funcion, ids):
+    inicio = time.perf_counter()
+    for aeronave_id in ids:
+        funcion(aeronave_id)
+    return len(ids) / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del pool de conexiones")
+    parser.add_argument("--aeronaves", type=int, default=100000)
+    parser.add_argument("--consultas", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        db_name = os.path.join(directorio, "bench.db")
+        db = DatabaseManager(db_name)
+        poblar_flota(db, args.aeronaves)
+
+        random.seed(42)
+        ids = [random.randint(1, args.aeronaves) for _ in range(args.consultas)]
+
+        antes = medir(lambda i: consulta_sin_pool(db_name, i), ids)
+        despues = medir(db.obtener_aeronave_por_id, ids)
+        db.cerrar_conexion()
+
+    print(f"Flota: {args.aeronaves} aeronaves, {args.consultas} consultas por id")
+    print(f"Conexión por consulta: {antes:12,.0f} consultas/s")
+    print(f"Pool persistente:      {despues:12,.0f} consultas/s")
+    print(f"Aceleración:           {despues / antes:12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
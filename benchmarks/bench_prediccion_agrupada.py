@@ -0,0 +1,113 @@
+# bench_prediccion_agrupada.py - Predicciones concurrentes: una llamada por solicitud vs micro-lotes
+#
+# Uso: python benchmarks/bench_prediccion_agrupada.py [--clientes 64] [--solicitudes 50]
+#                                                     [--max-lote 64] [--espera-ms 5] [--distintas 500]
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import numpy as np
+
+from database import DatabaseManager
+from prediccion_agrupada import AgrupadorPredicciones
+from servicio_modelo import ServicioModeloIA
+
+
+def generar_entradas(rng, cantidad):
+    pesos = rng.uniform(500, 400000, cantidad).round(1)
+    horas = rng.uniform(0, 5000, cantidad).round(1)
+    anos = rng.integers(1990, 2025, cantidad)
+    return list(zip(pesos.tolist(), horas.tolist(), anos.tolist()))
+
+
+async def cargar(predecir, entradas_por_cliente):
+    """Cada cliente envía sus solicitudes de a una; devuelve (segundos, latencias)"""
+    latencias = []
+
+    async def cliente(entradas):
+        for fila in entradas:
+            inicio = time.perf_counter()
+            await predecir(*fila)
+            latencias.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente(e) for e in entradas_por_cliente))
+    return time.perf_counter() - inicio, latencias
+
+
+def informar(nombre, segundos, latencias, extra=""):
+    latencias = np.array(latencias) * 1000
+    print(f"{nombre:<26}{len(latencias) / segundos:>12,.0f}{np.percentile(latencias, 50):>10.2f}"
+          f"{np.percentile(latencias, 99):>10.2f}  {extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de predicción con micro-lotes")
+    parser.add_argument("--clientes", type=int, default=64)
+    parser.add_argument("--solicitudes", type=int, default=50, help="Solicitudes por cliente")
+    parser.add_argument("--max-lote", type=int, default=64)
+    parser.add_argument("--espera-ms", type=float, default=5.0)
+    parser.add_argument("--distintas", type=int, default=500,
+                        help="Aeronaves distintas en la prueba con repeticiones (caché)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        db = DatabaseManager(os.path.join(directorio, "bench.db"))
+        ia = ServicioModeloIA(db, os.path.join(directorio, "modelos"))
+        ia.ejecutar_entrenamiento(guardar=False)
+        ejecutor = ThreadPoolExecutor(4)
+
+        rng = np.random.default_rng(7)
+        total = args.clientes * args.solicitudes
+        unicas = generar_entradas(rng, total)
+        por_cliente = [unicas[i::args.clientes] for i in range(args.clientes)]
+        catalogo = generar_entradas(rng, args.distintas)
+        repetidas = [catalogo[i] for i in rng.zipf(1.3, total) % args.distintas]
+        repetidas_por_cliente = [repetidas[i::args.clientes] for i in range(args.clientes)]
+
+        async def por_llamada(*fila):
+            return await asyncio.get_running_loop().run_in_executor(
+                ejecutor, ia.predecir_categorias_lote, [fila])
+
+        async def correr():
+            print(f"{total:,} solicitudes de {args.clientes} clientes concurrentes "
+                  f"(max_lote={args.max_lote}, espera={args.espera_ms} ms)")
+            print(f"{'Modo':<26}{'pred/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+            informar("Una llamada por solicitud", *await cargar(por_llamada, por_cliente))
+
+            for nombre, entradas, tamano_cache in (("Micro-lotes sin caché", por_cliente, 0),
+                                                   ("Micro-lotes + caché LRU", repetidas_por_cliente, 10000)):
+                agrupador = AgrupadorPredicciones(ia, ejecutor, args.max_lote, args.espera_ms, tamano_cache)
+                agrupador.iniciar()
+                segundos, latencias = await cargar(agrupador.predecir, entradas)
+                metricas = agrupador.metricas()
+                informar(nombre, segundos, latencias,
+                         f"lote medio {metricas['tamano_medio_lote']}, "
+                         f"aciertos {metricas['tasa_aciertos']:.0%}, "
+                         f"espera p99 {metricas['espera_cola_ms']['p99']} ms")
+                await agrupador.cerrar()
+
+            # Los micro-lotes predicen lo mismo que la llamada individual (sobre la entrada redondeada)
+            agrupador = AgrupadorPredicciones(ia, ejecutor, args.max_lote, args.espera_ms)
+            agrupador.iniciar()
+            muestra = unicas[:200]
+            agrupadas = await agrupador.predecir_varias(muestra)
+            individuales = [ia.predecir_categoria(*agrupador.clave(*fila)) for fila in muestra]
+            assert [c for c, _ in agrupadas] == [c for c, _ in individuales]
+            assert np.allclose([p for _, p in agrupadas], [p for _, p in individuales])
+            await agrupador.cerrar()
+
+        asyncio.run(correr())
+        ejecutor.shutdown()
+        db.cerrar_conexion()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# bench_prediccion_lote.py - Predicción fila por fila vs predicción en lote
+#
+# Uso: python benchmarks/bench_prediccion_lote.py [--aeronaves 100000] [--muestra 2000]
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import numpy as np
+
+from database import DatabaseManager
+from servicio_modelo import ServicioModeloIA
+
+
+def generar_flota(cantidad, semilla=7):
+    rng = np.random.default_rng(semilla)
+    pesos = rng.uniform(500, 400000, cantidad)
+    horas = rng.uniform(0, 5000, cantidad)
+    anos = np.where(horas > 500, 2024 - (horas / 500).astype(int), 2020)
+    return np.column_stack([pesos, horas, anos])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de predicción en lote")
+    parser.add_argument("--aeronaves", type=int, default=100000)
+    parser.add_argument("--muestra", type=int, default=2000,
+                        help="filas medidas en el bucle por fila (se extrapola)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        os.chdir(directorio)
+        db = DatabaseManager(os.path.join(directorio, "bench.db"))
+        ia = ServicioModeloIA(db)
+        ia.ejecutar_entrenamiento()
+
+        X = generar_flota(args.aeronaves)
+
+        # Bucle por fila sobre una muestra
+        muestra = X[:args.muestra]
+        inicio = time.perf_counter()
+        por_fila = [ia.predecir_categoria(*fila)[0] for fila in muestra]
+        t_fila = (time.perf_counter() - inicio) / len(muestra)
+
+        # Lote completo
+        inicio = time.perf_counter()
+        categorias, _ = ia.predecir_categorias_lote(X)
+        t_lote = time.perf_counter() - inicio
+
+        assert list(categorias[:len(muestra)]) == por_fila
+
+        # Reclasificación de la flota completa escrita en la base
+        filas = [(f"BM-{i:06d}", "Modelo", "Fabricante", p, "Liviana", h, 1, "2024-01-01")
+                 for i, (p, h, _) in enumerate(X.tolist())]
+        with db.conexion() as conn:
+            conn.executemany("""INSERT INTO aeronaves 
+                             (matricula, modelo, fabricante, peso_mtow, categoria, horas_vuelo, hangar_id, fecha_registro) 
+                             VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", filas)
+        inicio = time.perf_counter()
+        resultado = ia.reclasificar_flota()
+        t_flota = time.perf_counter() - inicio
+        db.cerrar_conexion()
+        os.chdir(RAIZ)
+
+    n = args.aeronaves
+    print(f"Flota: {n} aeronaves")
+    print(f"Por fila (estimado): {t_fila * n:8.2f} s  ({1 / t_fila:10,.0f} aeronaves/s)")
+    print(f"En lote:             {t_lote:8.2f} s  ({n / t_lote:10,.0f} aeronaves/s)")
+    print(f"Aceleración:         {t_fila * n / t_lote:8.1f}x")
+    print(f"reclasificar_flota:  {t_flota:8.2f} s  ({resultado['cambios']} categorías actualizadas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# bench_prevision_piezas.py - Previsión de reposición: consulta por pieza vs matriz vectorizada
+#
+# Uso: python benchmarks/bench_prevision_piezas.py [--piezas 500] [--consumos 1000000] [--anios 3]
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from statistics import NormalDist
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from database import DatabaseManager
+from prevision_piezas import PrevisionPiezas
+
+
+def poblar_historial(db, piezas, consumos, anios, hoy):
+    """Piezas sintéticas y años de consumo (insertado directamente, sin descontar stock)"""
+    with db.conexion() as conn:
+        conn.executemany("""INSERT INTO piezas (nombre, descripcion, stock, precio, proveedor, 
+                         fecha_actualizacion, tiempo_entrega_dias) VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                         [(f"Pieza BM-{i}", "Sintética", random.randint(0, 200), 100.0, "Proveedor",
+                           hoy, random.choice([3, 7, 14, 30])) for i in range(piezas)])
+        ids = [fila[0] for fila in conn.execute("SELECT id FROM piezas")]
+        conn.execute("""INSERT INTO mantenimientos (aeronave_id, tipo, fecha_programada, tecnico_id, 
+                     fecha_creacion) VALUES (1, 'Preventivo', ?, 1, ?)""", (hoy, hoy))
+        # Algunas piezas se consumen mucho más que otras
+        pesos = np.random.default_rng(3).pareto(1.5, len(ids)) + 0.1
+        elegidas = random.choices(ids, weights=pesos, k=consumos)
+        inicio = datetime.strptime(hoy, "%Y-%m-%d") - timedelta(days=365 * anios)
+        conn.executemany("""INSERT INTO mantenimiento_piezas (mantenimiento_id, pieza_id, cantidad, fecha) 
+                         VALUES (1, ?, ?, ?)""",
+                         ((pieza_id, random.randint(1, 4),
+                           (inicio + timedelta(days=random.randrange(365 * anios))).strftime("%Y-%m-%d"))
+                          for pieza_id in elegidas))
+    db.cache.invalidar()
+    return ids
+
+
+def prevision_por_pieza(db, ids, ventana, hoy, nivel_servicio=0.95):
+    """Ruta ingenua: una consulta y un cálculo escalar por pieza"""
+    desde = (datetime.strptime(hoy, "%Y-%m-%d") - timedelta(days=ventana - 1)).strftime("%Y-%m-%d")
+    z = NormalDist().inv_cdf(nivel_servicio)
+    resultado = {}
+    with db.conexion() as conn:
+        for pieza_id in ids:
+            entrega, = conn.execute("SELECT tiempo_entrega_dias FROM piezas WHERE id = ?", (pieza_id,)).fetchone()
+            diario = [0.0] * ventana
+            for fecha, cantidad in conn.execute("""SELECT fecha, cantidad FROM mantenimiento_piezas 
+                                                WHERE pieza_id = ? AND fecha >= ? AND fecha <= ?""",
+                                                (pieza_id, desde, hoy)):
+                diario[(datetime.strptime(fecha, "%Y-%m-%d") - datetime.strptime(desde, "%Y-%m-%d")).days] += cantidad
+            media = sum(diario) / ventana
+            varianza = sum((x - media) ** 2 for x in diario) / (ventana - 1)
+            resultado[pieza_id] = -(-(media * entrega + z * varianza ** 0.5 * entrega ** 0.5) // 1)
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la previsión de reposición de piezas")
+    parser.add_argument("--piezas", type=int, default=500)
+    parser.add_argument("--consumos", type=int, default=1000000)
+    parser.add_argument("--anios", type=int, default=3)
+    parser.add_argument("--ventana", type=int, default=180)
+    args = parser.parse_args()
+    hoy = "2025-06-30"
+
+    with tempfile.TemporaryDirectory() as directorio:
+        db = DatabaseManager(os.path.join(directorio, "piezas.db"))
+        ids = poblar_historial(db, args.piezas, args.consumos, args.anios, hoy)
+
+        inicio = time.perf_counter()
+        ingenua = prevision_por_pieza(db, ids, args.ventana, hoy)
+        t_pieza = time.perf_counter() - inicio
+
+        prevision = PrevisionPiezas(db, ventana_dias=args.ventana)
+        inicio = time.perf_counter()
+        resultado = prevision.calcular(hoy)
+        t_matriz = time.perf_counter() - inicio
+
+        puntos = dict(zip(resultado['id'].tolist(), resultado['punto_pedido'].tolist()))
+        assert all(np.isclose(puntos[i], ingenua[i]) for i in ids)
+        db.cerrar_conexion()
+
+    print(f"Piezas: {args.piezas:,} | consumos: {args.consumos:,} en {args.anios} años | ventana: {args.ventana} días")
+    print(f"Consulta por pieza:   {t_pieza:8.3f} s")
+    print(f"Matriz vectorizada:   {t_matriz:8.3f} s")
+    print(f"Aceleración:          {t_pieza / t_matriz:8.1f}x")
+    print(f"Piezas a reponer:     {int(resultado['reponer'].sum()):,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# bench_reportes.py - Generación de reportes: figura nueva por reporte vs plantilla reutilizada vs procesos
+#
+# Uso: python benchmarks/bench_reportes.py [--reportes 100] [--procesos 4] [--formatos pdf,png]
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from reportes import GeneradorReportes, PlantillaReporte, generar_lote, solicitudes_lote, meses
+from bench_pool import poblar_flota
+from bench_costos import poblar_mantenimientos
+
+
+class GeneradorSinPlantilla(GeneradorReportes):
+    """Ruta anterior: construir la figura completa para cada reporte"""
+
+    @property
+    def plantilla(self):
+        return PlantillaReporte()
+
+
+def medir(generador, solicitudes):
+    inicio = time.perf_counter()
+    for solicitud in solicitudes:
+        generador.generar(solicitud)
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del generador de reportes")
+    parser.add_argument("--reportes", type=int, default=100)
+    parser.add_argument("--procesos", type=int, default=4)
+    parser.add_argument("--formatos", default="pdf,png")
+    parser.add_argument("--mantenimientos", type=int, default=50000)
+    args = parser.parse_args()
+    formatos = args.formatos.split(",")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        db_name = os.path.join(directorio, "reportes.db")
+        db = DatabaseManager(db_name)
+        poblar_flota(db, 2000)
+        poblar_mantenimientos(db, args.mantenimientos, 2000)
+        solicitudes = solicitudes_lote(db, "todos", meses("2020-01", "2025-12"))[:args.reportes]
+
+        salida = os.path.join(directorio, "salida")
+        sin_plantilla = medir(GeneradorSinPlantilla(db, salida, formatos), solicitudes)
+        con_plantilla = medir(GeneradorReportes(db, salida, formatos), solicitudes)
+        db.cerrar_conexion()
+
+        inicio = time.perf_counter()
+        generar_lote(db_name, solicitudes, salida, formatos, procesos=args.procesos)
+        en_procesos = time.perf_counter() - inicio
+
+        n = len(solicitudes)
+        print(f"{n} reportes ({', '.join(formatos)})")
+        print(f"Figura nueva por reporte:   {sin_plantilla:6.2f} s  ({n / sin_plantilla:5.1f} reportes/s)")
+        print(f"Plantilla reutilizada:      {con_plantilla:6.2f} s  ({n / con_plantilla:5.1f} reportes/s)")
+        print(f"{args.procesos} procesos con plantilla:  {en_procesos:6.2f} s  ({n / en_procesos:5.1f} reportes/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# bench_vuelos.py - Registro de vuelos: velocidad de anexado y tendencias desde resúmenes vs registro crudo
+#
+# Uso: python benchmarks/bench_vuelos.py [--aeronaves 500] [--vuelos 1000000]
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from bench_pool import poblar_flota
+
+
+def generar_vuelos(ids, cantidad):
+    for _ in range(cantidad):
+        yield (random.choice(ids), f"{random.randint(2022, 2025)}-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+               round(random.uniform(0.5, 9.0), 1), "LPB", "VVI")
+
+
+def tendencia_cruda(db, aeronave_id):
+    """Ruta sin resúmenes: agrupar el registro completo en cada consulta"""
+    with db.conexion() as conn:
+        return conn.execute("""SELECT substr(fecha, 1, 7), SUM(horas), COUNT(*) FROM registros_vuelo
+                            WHERE aeronave_id = ? GROUP BY 1 ORDER BY 1""", (aeronave_id,)).fetchall()
+
+
+def medir(funcion, ids):
+    inicio = time.perf_counter()
+    for aeronave_id in ids:
+        funcion(aeronave_id)
+    return (time.perf_counter() - inicio) / len(ids) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del registro de vuelos y sus resúmenes")
+    parser.add_argument("--aeronaves", type=int, default=500)
+    parser.add_argument("--vuelos", type=int, default=1000000)
+    parser.add_argument("--lote", type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        db = DatabaseManager(os.path.join(directorio, "vuelos.db"))
+        poblar_flota(db, args.aeronaves)
+        with db.conexion() as conn:
+            ids = [fila[0] for fila in conn.execute("SELECT id FROM aeronaves")]
+
+        vuelos = generar_vuelos(ids, args.vuelos)
+        inicio = time.perf_counter()
+        while True:
+            lote = [v for _, v in zip(range(args.lote), vuelos)]
+            if not lote:
+                break
+            db.registrar_vuelos(lote)
+        anexado = args.vuelos / (time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        db.consolidar_registros_vuelo()
+        consolidacion = time.perf_counter() - inicio
+
+        muestra = random.sample(ids, min(200, len(ids)))
+        crudo = medir(lambda i: tendencia_cruda(db, i), muestra)
+        resumen = medir(db.obtener_tendencia_aeronave, muestra)
+        db.cerrar_conexion()
+
+    print(f"anexado por lotes de {args.lote:,}: {anexado:12,.0f} vuelos/s")
+    print(f"consolidación inicial:        {consolidacion:12.2f} s")
+    print(f"tendencia desde registro:     {crudo:12.2f} ms/consulta")
+    print(f"tendencia desde resúmenes:    {resumen:12.2f} ms/consulta")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# plan_consultas.py - Verifica con EXPLAIN QUERY PLAN que las consultas usan índices
+#
+# Uso: python benchmarks/plan_consultas.py [ruta_db]
+# Sin argumentos crea una base temporal; con una ruta, migra esa base en el lugar.
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+
+# (descripción, consulta, parámetros, índice que debe aparecer en el plan)
+CONSULTAS_ESPERADAS = [
+    ("Mantenimientos por aeronave",
+     """SELECT m.*, t.nombre as tecnico_nombre 
+        FROM mantenimientos m 
+        JOIN tecnicos t ON m.tecnico_id = t.id 
+        WHERE m.aeronave_id = ? 
+        ORDER BY m.fecha_programada DESC""", (1,),
+     "idx_mantenimientos_aeronave_fecha"),
+    ("Historial ordenado por fecha",
+     """SELECT m.*, a.matricula, a.modelo, t.nombre as tecnico_nombre 
+        FROM mantenimientos m 
+        JOIN aeronaves a ON m.aeronave_id = a.id 
+        JOIN tecnicos t ON m.tecnico_id = t.id 
+        ORDER BY m.fecha_programada DESC""", (),
+     "idx_mantenimientos_fecha"),
+    ("Mantenimientos por estado",
+     "SELECT COUNT(*) FROM mantenimientos WHERE estado = ?", ("En Proceso",),
+     "idx_mantenimientos_estado"),
+    ("Alertas cambiadas desde una versión",
+     """SELECT al.aeronave_id, a.matricula, a.modelo, a.categoria,
+               al.horas_vuelo, al.horas_limite, al.activa
+        FROM alertas_mantenimiento al
+        LEFT JOIN aeronaves a ON a.id = al.aeronave_id
+        WHERE al.version > ? AND al.version <= ?
+          AND (? > 0 OR al.activa = 1)
+        ORDER BY al.version""", (10, 20, 10),
+     "idx_alertas_mantenimiento_version"),
+    ("Umbral de horas por categoría y modelo",
+     """SELECT horas_limite FROM umbrales_mantenimiento
+        WHERE categoria = ? AND modelo = ?""", ("Pesada", ""),
+     "sqlite_autoindex_umbrales_mantenimiento_1"),
+    ("Agenda de un técnico",
+     """SELECT fecha_programada FROM mantenimientos 
+        WHERE tecnico_id = ? AND estado NOT IN ('Completado', 'Cancelado')
+          AND fecha_programada < ?
+          AND date(fecha_programada, '+' || duracion_dias || ' days') > ?""", (1, "2025-02-01", "2025-01-01"),
+     "idx_mantenimientos_tecnico_fecha"),
+    ("Ocupación de un hangar",
+     """SELECT fecha_programada, duracion_dias FROM mantenimientos 
+        WHERE hangar_id = ? AND estado NOT IN ('Completado', 'Cancelado')
+          AND fecha_programada < ?
+          AND date(fecha_programada, '+' || duracion_dias || ' days') > ?""", (1, "2025-02-01", "2025-01-01"),
+     "idx_mantenimientos_hangar_fecha"),
+    ("Piezas por mantenimiento",
+     "SELECT * FROM mantenimiento_piezas WHERE mantenimiento_id = ?", (1,),
+     "idx_mantenimiento_piezas_mantenimiento"),
+]
+
+
+def plan_consulta(conn, consulta, parametros):
+    """Devolver las líneas de detalle de EXPLAIN QUERY PLAN"""
+    return [fila[3] for fila in conn.execute("EXPLAIN QUERY PLAN " + consulta, parametros)]
+
+
+def verificar(db):
+    errores = 0
+    with db.conexion() as conn:
+        for descripcion, consulta, parametros, indice in CONSULTAS_ESPERADAS:
+            plan = plan_consulta(conn, consulta, parametros)
+            usa_indice = any(indice in linea for linea in plan)
+            # Un SCAN sólo se admite si recorre el índice esperado (ORDER BY)
+            escaneos = [l for l in plan if l.startswith("SCAN") and indice not in l]
+            correcto = usa_indice and not escaneos
+            errores += not correcto
+            print(f"[{'OK' if correcto else 'FALLA'}] {descripcion}")
+            for linea in plan:
+                print(f"       {linea}")
+    return errores
+
+
+def main():
+    if len(sys.argv) > 1:
+        db = DatabaseManager(sys.argv[1])
+        errores = verificar(db)
+        db.cerrar_conexion()
+    else:
+        with tempfile.TemporaryDirectory() as directorio:
+            db = DatabaseManager(os.path.join(directorio, "planes.db"))
+            errores = verificar(db)
+            db.cerrar_conexion()
+    sys.exit(1 if errores else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# bosque_compilado.py - Inferencia del bosque aleatorio sobre arreglos planos de numpy (sin sklearn)
+import os
+import tempfile
+import numpy as np
+
+ARCHIVO_COMPILADO = 'modelo_compilado_actual.npz'
+VERSION_FORMATO_COMPILADO = 1
+
+class BosqueCompilado:
+    """Bosque aleatorio exportado a arreglos planos para predecir sin sklearn.
+
+    Los nodos de todos los árboles van en arreglos únicos (característica,
+    umbral, hijo izquierdo y derecho con índices globales, y la fracción de
+    cada clase en el nodo); raices indica dónde empieza cada árbol. Las hojas
+    apuntan a sí mismas con umbral infinito, de modo que el recorrido avanza
+    todas las filas por todos los árboles a la vez durante 'profundidad'
+    pasos sin ramas por fila.
+
+    Reproduce exactamente RandomForestClassifier.predict_proba: escala con
+    la media y el desvío del StandardScaler en float64, compara en float32
+    como sklearn y suma los árboles en el mismo orden antes de dividir por
+    su cantidad.
+    """
+
+    TAMANO_BLOQUE = 4096      # Filas por paso del recorrido (acota la memoria temporal)
+
+    def __init__(self, media, escala, caracteristica, umbral, izquierdo, derecho, valores, raices,
+                 profundidad, categorias):
+        self.media = media
+        self.escala = escala
+        # Índices como intp: numpy no tiene que convertirlos en cada indexación
+        self.caracteristica = caracteristica.astype(np.intp)
+        self.umbral = umbral
+        self.izquierdo = izquierdo.astype(np.intp)
+        self.derecho = derecho.astype(np.intp)
+        self.valores = valores
+        self.raices = raices.astype(np.intp)
+        self.profundidad = int(profundidad)
+        self.categorias = categorias
+        # hijos[2 * nodo + (x > umbral)]: un solo acceso elige la rama
+        self.hijos = np.column_stack([self.izquierdo, self.derecho]).ravel()
+
+    @property
+    def arboles(self):
+        return len(self.raices)
+
+    @property
+    def nodos(self):
+        return len(self.umbral)
+
+    @classmethod
+    def desde_sklearn(cls, modelo, scaler, label_encoder_categoria):
+        """Exportar un RandomForestClassifier ajustado (y su escalador y codificador)"""
+        caracteristicas, umbrales, izquierdos, derechos, valores, raices = [], [], [], [], [], []
+        desplazamiento = 0
+        for estimador in modelo.estimators_:
+            arbol = estimador.tree_
+            indices = np.arange(arbol.node_count)
+            hoja = arbol.children_left < 0
+            raices.append(desplazamiento)
+            caracteristicas.append(np.where(hoja, 0, arbol.feature))
+            umbrales.append(np.where(hoja, np.inf, arbol.threshold))
+            izquierdos.append(np.where(hoja, indices, arbol.children_left) + desplazamiento)
+            derechos.append(np.where(hoja, indices, arbol.children_right) + desplazamiento)
+            valores.append(arbol.value[:, 0, :modelo.n_classes_])
+            desplazamiento += arbol.node_count
+
+        return cls(
+            media=np.asarray(scaler.mean_, dtype=np.float64),
+            escala=np.asarray(scaler.scale_, dtype=np.float64),
+            caracteristica=np.concatenate(caracteristicas).astype(np.int32),
+            umbral=np.concatenate(umbrales).astype(np.float64),
+            izquierdo=np.concatenate(izquierdos).astype(np.int32),
+            derecho=np.concatenate(derechos).astype(np.int32),
+            valores=np.ascontiguousarray(np.concatenate(valores), dtype=np.float64),
+            raices=np.array(raices, dtype=np.int32),
+            profundidad=max(e.tree_.max_depth for e in modelo.estimators_),
+            categorias=np.asarray(label_encoder_categoria.inverse_transform(modelo.classes_)).astype(str)
+        )
+
+    def guardar(self, ruta):
+        """Escribir el bosque en un .npz (reemplazo atómico)"""
+        directorio = os.path.dirname(os.path.abspath(ruta))
+        descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix='.npz')
+        with os.fdopen(descriptor, 'wb') as f:
+            np.savez(f, version_formato=VERSION_FORMATO_COMPILADO, media=self.media, escala=self.escala,
+                     caracteristica=self.caracteristica, umbral=self.umbral, izquierdo=self.izquierdo,
+                     derecho=self.derecho, valores=self.valores, raices=self.raices,
+                     profundidad=self.profundidad, categorias=self.categorias)
+        os.replace(temporal, ruta)
+
+    @classmethod
+    def cargar(cls, ruta):
+        with np.load(ruta, allow_pickle=False) as datos:
+            if int(datos['version_formato']) > VERSION_FORMATO_COMPILADO:
+                raise ValueError("El modelo compilado fue guardado por una versión más nueva del sistema")
+            return cls(**{clave: datos[clave] for clave in datos.files if clave != 'version_formato'})
+
+    def _hojas(self, X):
+        """Índice global de la hoja alcanzada por cada fila en cada árbol: (filas, árboles)"""
+        nodo = np.broadcast_to(self.raices, (len(X), self.arboles)).copy()
+        base = (np.arange(len(X)) * X.shape[1])[:, None]
+        X = X.ravel()
+        for _ in range(self.profundidad):
+            derecha = X[base + self.caracteristica[nodo]] > self.umbral[nodo]
+            nodo = self.hijos[2 * nodo + derecha]
+        return nodo
+
+    def predict_proba(self, X):
+        """Probabilidades por clase para X sin escalar (peso_mtow, horas_vuelo, año)"""
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.media))
+        # Misma aritmética que StandardScaler.transform y la conversión a float32 del bosque
+        X = np.ascontiguousarray((X - self.media) / self.escala, dtype=np.float32)
+        probabilidades = np.empty((len(X), self.valores.shape[1]))
+        for inicio in range(0, len(X), self.TAMANO_BLOQUE):
+            hojas = self._hojas(X[inicio:inicio + self.TAMANO_BLOQUE])
+            # Sumar árbol por árbol en orden, como la acumulación de sklearn
+            np.add.reduce(self.valores[hojas.T], axis=0, out=probabilidades[inicio:inicio + len(hojas)])
+        probabilidades /= self.arboles
+        return probabilidades
+
+    def predecir_categorias_lote(self, X):
+        """(categorias, confianzas) igual que ServicioModeloIA.predecir_categorias_lote"""
+        probabilidades = self.predict_proba(X)
+        indices = probabilidades.argmax(axis=1)
+        return self.categorias[indices].astype(object), probabilidades[np.arange(len(indices)), indices]
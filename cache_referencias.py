@@ -0,0 +1,64 @@
+# cache_referencias.py - Caché en memoria para tablas de referencia pequeñas
+import threading
+import time
+from collections import Counter
+
+class CacheReferencias:
+    """Caché de lectura por tabla con TTL, invalidación explícita y contadores.
+
+    obtener(tabla, cargar) devuelve la copia en memoria si no expiró; si no,
+    llama a cargar() (la consulta real) y guarda el resultado. Las escrituras
+    sobre una tabla deben llamar a invalidar(tabla). Con obtener(..., version=v)
+    la entrada vale mientras la versión de los datos siga siendo v (sin TTL),
+    para resultados cuya validez la lleva la propia base.
+    """
+
+    def __init__(self, ttl_por_tabla, ttl_por_defecto=60.0):
+        self.ttl_por_tabla = dict(ttl_por_tabla)
+        self.ttl_por_defecto = ttl_por_defecto
+        self.aciertos = Counter()
+        self.fallos = Counter()
+        self._datos = {}             # tabla -> (instante de carga, filas, versión)
+        self._generacion = Counter()  # Evita guardar cargas hechas antes de invalidar
+        self._lock = threading.Lock()
+
+    def obtener(self, tabla, cargar, version=None):
+        """Devolver las filas de la tabla desde memoria o cargándolas"""
+        ttl = self.ttl_por_tabla.get(tabla, self.ttl_por_defecto)
+        with self._lock:
+            entrada = self._datos.get(tabla)
+            if entrada is not None and (entrada[2] == version if version is not None
+                                        else time.monotonic() - entrada[0] < ttl):
+                self.aciertos[tabla] += 1
+                return list(entrada[1])
+            self.fallos[tabla] += 1
+            generacion = self._generacion[tabla]
+
+        filas = cargar()
+
+        with self._lock:
+            if self._generacion[tabla] == generacion:
+                self._datos[tabla] = (time.monotonic(), filas, version)
+        return list(filas)
+
+    def invalidar(self, *tablas):
+        """Descartar las tablas indicadas (o todas si no se indica ninguna)"""
+        with self._lock:
+            for tabla in tablas or list(self._datos):
+                self._datos.pop(tabla, None)
+                self._generacion[tabla] += 1
+
+    def estadisticas(self):
+        """Aciertos, fallos, TTL y edad de cada tabla en caché"""
+        ahora = time.monotonic()
+        with self._lock:
+            tablas = set(self.ttl_por_tabla) | set(self.aciertos) | set(self.fallos)
+            return {
+                tabla: {
+                    'aciertos': self.aciertos[tabla],
+                    'fallos': self.fallos[tabla],
+                    'ttl': self.ttl_por_tabla.get(tabla, self.ttl_por_defecto),
+                    'edad': ahora - self._datos[tabla][0] if tabla in self._datos else None
+                }
+                for tabla in sorted(tablas)
+            }
@@ -0,0 +1,43 @@
+# carga_diferida.py - Importación diferida de módulos pesados (numpy, sklearn, matplotlib)
+import importlib
+import threading
+
+class ModuloDiferido:
+    """Representa un módulo que se importa recién en el primer acceso a un atributo"""
+
+    def __init__(self, nombre):
+        self._nombre = nombre
+        self._modulo = None
+        self._lock = threading.Lock()
+
+    @property
+    def cargado(self):
+        return self._modulo is not None
+
+    def cargar(self):
+        """Importar el módulo real (una sola vez, seguro entre hilos)"""
+        if self._modulo is None:
+            with self._lock:
+                if self._modulo is None:
+                    self._modulo = importlib.import_module(self._nombre)
+        return self._modulo
+
+    def __getattr__(self, atributo):
+        return getattr(self.cargar(), atributo)
+
+    def __repr__(self):
+        estado = "cargado" if self.cargado else "diferido"
+        return f"<ModuloDiferido {self._nombre} ({estado})>"
+
+def precalentar(*modulos):
+    """Importar módulos diferidos en un hilo de fondo para que el primer uso sea inmediato"""
+    def cargar_todos():
+        for modulo in modulos:
+            try:
+                modulo.cargar()
+            except Exception as e:
+                print(f"Error al precargar {modulo!r}: {e}")
+
+    hilo = threading.Thread(target=cargar_todos, name="sgma-precarga", daemon=True)
+    hilo.start()
+    return hilo
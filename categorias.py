@@ -0,0 +1,22 @@
+# categorias.py - Reglas de categorización de aeronaves por peso MTOW
+CATEGORIAS = ("Liviana", "Mediana", "Pesada")
+
+# Límites superiores de MTOW (kg) para cada categoría
+LIMITE_LIVIANA = 5700
+LIMITE_MEDIANA = 27000
+
+# Horas de vuelo entre mantenimientos por categoría
+INTERVALOS_MANTENIMIENTO = {
+    "Liviana": 100,
+    "Mediana": 150,
+    "Pesada": 200,
+}
+
+def categorizar_aeronave(peso_mtow):
+    """Categorizar aeronave según su peso MTOW"""
+    if peso_mtow <= LIMITE_LIVIANA:
+        return "Liviana"
+    elif peso_mtow <= LIMITE_MEDIANA:
+        return "Mediana"
+    else:
+        return "Pesada"
@@ -1,338 +1,999 @@
 # Base de Datos SQLite
 import sqlite3
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
+from pool_conexiones import PoolConexiones
+from migraciones import aplicar_migraciones, limite_horas_sql
+from cache_referencias import CacheReferencias
+
+# Vistas con paginación por clave (keyset). Cada columna visible se asocia a
+# una expresión SQL fija: sólo estas columnas se aceptan para ordenar o filtrar.
+VISTAS_PAGINADAS = {
+    'aeronaves': {
+        'desde': "aeronaves a LEFT JOIN hangares h ON a.hangar_id = h.id",
+        'clave': "a.id",
+        'columnas': {
+            'id': "a.id",
+            'matricula': "a.matricula",
+            'modelo': "a.modelo",
+            'fabricante': "a.fabricante",
+            'peso_mtow': "a.peso_mtow",
+            'categoria': "a.categoria",
+            'horas_vuelo': "a.horas_vuelo",
+            'hangar': "COALESCE(h.nombre, '')"
+        }
+    },
+    'mantenimientos': {
+        'desde': """mantenimientos m 
+                    JOIN aeronaves a ON m.aeronave_id = a.id 
+                    JOIN tecnicos t ON m.tecnico_id = t.id""",
+        'clave': "m.id",
+        'columnas': {
+            'id': "m.id",
+            'matricula': "a.matricula",
+            'modelo': "a.modelo",
+            'tipo': "m.tipo",
+            'fecha_programada': "m.fecha_programada",
+            'tecnico': "t.nombre",
+            'estado': "COALESCE(m.estado, '')",
+            'costo': "COALESCE(m.costo, 0)"
+        }
+    }
+}
+
+# Estados de mantenimiento que ya no ocupan técnico ni hangar
+ESTADOS_FINALIZADOS = ('Completado', 'Cancelado')
+
+# Mantenimiento activo que solapa el intervalo [inicio, fin): parámetros (fin, inicio)
+CONDICION_SOLAPE = f"""estado NOT IN {ESTADOS_FINALIZADOS}
+    AND fecha_programada < ?
+    AND date(fecha_programada, '+' || duracion_dias || ' days') > ?"""
+
+# Agrupaciones del reporte de costos: (expresión de la clave, uniones necesarias)
+AGRUPACIONES_COSTOS = {
+    'tipo': ("m.tipo", ""),
+    'mes': ("substr(m.fecha_programada, 1, 7)", ""),
+    'aeronave': ("COALESCE(a.matricula, 'Sin aeronave')",
+                 "LEFT JOIN aeronaves a ON a.id = m.aeronave_id"),
+    'categoria': ("COALESCE(a.categoria, 'Sin categoría')",
+                  "LEFT JOIN aeronaves a ON a.id = m.aeronave_id"),
+    'hangar': ("COALESCE(h.nombre, 'Sin hangar')",
+               """LEFT JOIN aeronaves a ON a.id = m.aeronave_id
+                  LEFT JOIN hangares h ON h.id = COALESCE(m.hangar_id, a.hangar_id)""")
+}
 
 class DatabaseManager:
-    def __init__(self, db_name="sgma_aeronaves.db"):
+    def __init__(self, db_name="sgma_aeronaves.db", tamano_pool=5):
         self.db_name = db_name
+        self.pool = PoolConexiones(db_name, tamano_maximo=tamano_pool)
+        # Tablas de referencia pequeñas que cambian poco: TTL en segundos
+        self.cache = CacheReferencias({'hangares': 300, 'tecnicos': 300, 'piezas': 60})
         self.crear_tablas()
+        self.migrar_esquema()
         self.insertar_datos_iniciales()
     
     def crear_conexion(self):
-        """Crear conexión a la base de datos"""
+        """Crear conexión independiente a la base de datos (fuera del pool)"""
         return sqlite3.connect(self.db_name)
     
+    def conexion(self):
+        """Prestar una conexión del pool (usar con 'with'; confirma al salir)"""
+        return self.pool.conexion()
+    
     def crear_tablas(self):
         """Crear todas las tablas necesarias"""
-        conn = self.crear_conexion()
-        cursor = conn.cursor()
-        
-        # Tabla de aeronaves
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS aeronaves (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                matricula TEXT UNIQUE NOT NULL,
-                modelo TEXT NOT NULL,
-                fabricante TEXT NOT NULL,
-                peso_mtow REAL NOT NULL,
-                categoria TEXT NOT NULL,
-                horas_vuelo REAL NOT NULL,
-                hangar_id INTEGER,
-                fecha_registro TEXT NOT NULL,
-                FOREIGN KEY (hangar_id) REFERENCES hangares (id)
-            )
-        ''')
-        
-        # Tabla de hangares
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS hangares (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nombre TEXT NOT NULL,
-                ubicacion TEXT NOT NULL,
-                capacidad INTEGER NOT NULL,
-                ocupacion INTEGER DEFAULT 0
-            )
-        ''')
-        
-        # Tabla de técnicos
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tecnicos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nombre TEXT NOT NULL,
-                especialidad TEXT NOT NULL,
-                licencia TEXT UNIQUE NOT NULL,
-                activo BOOLEAN DEFAULT TRUE
-            )
-        ''')
-        
-        # Tabla de mantenimientos
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS mantenimientos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                aeronave_id INTEGER NOT NULL,
-                tipo TEXT NOT NULL,
-                fecha_programada TEXT NOT NULL,
-                tecnico_id INTEGER NOT NULL,
-                descripcion TEXT,
-                estado TEXT DEFAULT 'Programado',
-                fecha_creacion TEXT NOT NULL,
-                costo REAL DEFAULT 0,
-                FOREIGN KEY (aeronave_id) REFERENCES aeronaves (id),
-                FOREIGN KEY (tecnico_id) REFERENCES tecnicos (id)
-            )
-        ''')
-        
-        # Tabla de piezas
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS piezas (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nombre TEXT NOT NULL,
-                descripcion TEXT,
-                stock INTEGER NOT NULL DEFAULT 0,
-                precio REAL NOT NULL,
-                proveedor TEXT,
-                fecha_actualizacion TEXT NOT NULL
-            )
-        ''')
-        
-        # Tabla de uso de piezas en mantenimientos
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS mantenimiento_piezas (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                mantenimiento_id INTEGER NOT NULL,
-                pieza_id INTEGER NOT NULL,
-                cantidad INTEGER NOT NULL,
-                FOREIGN KEY (mantenimiento_id) REFERENCES mantenimientos (id),
-                FOREIGN KEY (pieza_id) REFERENCES piezas (id)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            
+            # Tabla de aeronaves
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS aeronaves (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    matricula TEXT UNIQUE NOT NULL,
+                    modelo TEXT NOT NULL,
+                    fabricante TEXT NOT NULL,
+                    peso_mtow REAL NOT NULL,
+                    categoria TEXT NOT NULL,
+                    horas_vuelo REAL NOT NULL,
+                    hangar_id INTEGER,
+                    fecha_registro TEXT NOT NULL,
+                    FOREIGN KEY (hangar_id) REFERENCES hangares (id)
+                )
+            ''')
+            
+            # Tabla de hangares
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS hangares (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    nombre TEXT NOT NULL,
+                    ubicacion TEXT NOT NULL,
+                    capacidad INTEGER NOT NULL,
+                    ocupacion INTEGER DEFAULT 0
+                )
+            ''')
+            
+            # Tabla de técnicos
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS tecnicos (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    nombre TEXT NOT NULL,
+                    especialidad TEXT NOT NULL,
+                    licencia TEXT UNIQUE NOT NULL,
+                    activo BOOLEAN DEFAULT TRUE
+                )
+            ''')
+            
+            # Tabla de mantenimientos
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS mantenimientos (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    aeronave_id INTEGER NOT NULL,
+                    tipo TEXT NOT NULL,
+                    fecha_programada TEXT NOT NULL,
+                    tecnico_id INTEGER NOT NULL,
+                    descripcion TEXT,
+                    estado TEXT DEFAULT 'Programado',
+                    fecha_creacion TEXT NOT NULL,
+                    costo REAL DEFAULT 0,
+                    FOREIGN KEY (aeronave_id) REFERENCES aeronaves (id),
+                    FOREIGN KEY (tecnico_id) REFERENCES tecnicos (id)
+                )
+            ''')
+            
+            # Tabla de piezas
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS piezas (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    nombre TEXT NOT NULL,
+                    descripcion TEXT,
+                    stock INTEGER NOT NULL DEFAULT 0,
+                    precio REAL NOT NULL,
+                    proveedor TEXT,
+                    fecha_actualizacion TEXT NOT NULL
+                )
+            ''')
+            
+            # Tabla de uso de piezas en mantenimientos
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS mantenimiento_piezas (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    mantenimiento_id INTEGER NOT NULL,
+                    pieza_id INTEGER NOT NULL,
+                    cantidad INTEGER NOT NULL,
+                    FOREIGN KEY (mantenimiento_id) REFERENCES mantenimientos (id),
+                    FOREIGN KEY (pieza_id) REFERENCES piezas (id)
+                )
+            ''')
+    
+    def migrar_esquema(self):
+        """Aplicar migraciones pendientes (índices y cambios de esquema)"""
+        with self.conexion() as conn:
+            return aplicar_migraciones(conn)
     
     def insertar_datos_iniciales(self):
         """Insertar datos iniciales si la base está vacía"""
-        conn = self.crear_conexion()
-        cursor = conn.cursor()
-        
-        # Verificar si ya hay datos
-        cursor.execute("SELECT COUNT(*) FROM hangares")
-        if cursor.fetchone()[0] == 0:
-            # Insertar hangares
-            hangares_iniciales = [
-                ("Hangar A", "El Alto", 5),
-                ("Hangar B", "Santa Cruz", 3),
-                ("Hangar C", "Cochabamba", 4),
-                ("Hangar D", "Tarija", 2)
-            ]
-            cursor.executemany("INSERT INTO hangares (nombre, ubicacion, capacidad) VALUES (?, ?, ?)", 
-                             hangares_iniciales)
-            
-            # Insertar técnicos
-            tecnicos_iniciales = [
-                ("Carlos Mendoza", "Motores", "AMT-001"),
-                ("Ana Rodriguez", "Aviónica", "AMT-002"),
-                ("Luis Vargas", "Estructural", "AMT-003"),
-                ("Maria Gutierrez", "Sistemas Hidráulicos", "AMT-004"),
-                ("Pedro Quispe", "Instrumentos", "AMT-005")
-            ]
-            cursor.executemany("INSERT INTO tecnicos (nombre, especialidad, licencia) VALUES (?, ?, ?)", 
-                             tecnicos_iniciales)
-            
-            # Insertar piezas
-            piezas_iniciales = [
-                ("Filtro de Aceite", "Filtro para sistema de lubricación", 25, 150.0, "AeroPartes SA"),
-                ("Batería", "Batería de 24V para sistemas eléctricos", 8, 800.0, "PowerAir Ltd"),
-                ("Neumático Principal", "Neumático para tren principal", 12, 1200.0, "TireAero Inc"),
-                ("Válvula Hidráulica", "Válvula para sistema hidráulico", 15, 350.0, "HydroTech"),
-                ("Sensor de Temperatura", "Sensor para monitoreo de motores", 30, 250.0, "SensorAir")
-            ]
-            fecha_actual = datetime.now().strftime("%Y-%m-%d")
-            cursor.executemany("INSERT INTO piezas (nombre, descripcion, stock, precio, proveedor, fecha_actualizacion) VALUES (?, ?, ?, ?, ?, ?)", 
-                             [(p[0], p[1], p[2], p[3], p[4], fecha_actual) for p in piezas_iniciales])
+        with self.conexion() as conn:
+            cursor = conn.cursor()
             
-            # Insertar aeronaves de ejemplo
-            aeronaves_ejemplo = [
-                ("CP-2501", "Boeing 737-800", "Boeing", 79000, "Pesada", 1250.5, 1),
-                ("CP-2789", "Airbus A320", "Airbus", 73500, "Pesada", 890.2, 2),
-                ("CP-1456", "Cessna 172", "Cessna", 1157, "Liviana", 320.8, 3)
-            ]
-            for aeronave in aeronaves_ejemplo:
-                cursor.execute("""INSERT INTO aeronaves 
-                               (matricula, modelo, fabricante, peso_mtow, categoria, horas_vuelo, hangar_id, fecha_registro) 
-                               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", 
-                               (*aeronave, fecha_actual))
+            # Verificar si ya hay datos
+            cursor.execute("SELECT COUNT(*) FROM hangares")
+            if cursor.fetchone()[0] == 0:
+                # Insertar hangares
+                hangares_iniciales = [
+                    ("Hangar A", "El Alto", 5),
+                    ("Hangar B", "Santa Cruz", 3),
+                    ("Hangar C", "Cochabamba", 4),
+                    ("Hangar D", "Tarija", 2)
+                ]
+                cursor.executemany("INSERT INTO hangares (nombre, ubicacion, capacidad) VALUES (?, ?, ?)", 
+                                 hangares_iniciales)
+                
+                # Insertar técnicos
+                tecnicos_iniciales = [
+                    ("Carlos Mendoza", "Motores", "AMT-001"),
+                    ("Ana Rodriguez", "Aviónica", "AMT-002"),
+                    ("Luis Vargas", "Estructural", "AMT-003"),
+                    ("Maria Gutierrez", "Sistemas Hidráulicos", "AMT-004"),
+                    ("Pedro Quispe", "Instrumentos", "AMT-005")
+                ]
+                cursor.executemany("INSERT INTO tecnicos (nombre, especialidad, licencia) VALUES (?, ?, ?)", 
+                                 tecnicos_iniciales)
+                
+                # Insertar piezas
+                piezas_iniciales = [
+                    ("Filtro de Aceite", "Filtro para sistema de lubricación", 25, 150.0, "AeroPartes SA"),
+                    ("Batería", "Batería de 24V para sistemas eléctricos", 8, 800.0, "PowerAir Ltd"),
+                    ("Neumático Principal", "Neumático para tren principal", 12, 1200.0, "TireAero Inc"),
+                    ("Válvula Hidráulica", "Válvula para sistema hidráulico", 15, 350.0, "HydroTech"),
+                    ("Sensor de Temperatura", "Sensor para monitoreo de motores", 30, 250.0, "SensorAir")
+                ]
+                fecha_actual = datetime.now().strftime("%Y-%m-%d")
+                cursor.executemany("INSERT INTO piezas (nombre, descripcion, stock, precio, proveedor, fecha_actualizacion) VALUES (?, ?, ?, ?, ?, ?)", 
+                                 [(p[0], p[1], p[2], p[3], p[4], fecha_actual) for p in piezas_iniciales])
+                
+                # Insertar aeronaves de ejemplo
+                aeronaves_ejemplo = [
+                    ("CP-2501", "Boeing 737-800", "Boeing", 79000, "Pesada", 1250.5, 1),
+                    ("CP-2789", "Airbus A320", "Airbus", 73500, "Pesada", 890.2, 2),
+                    ("CP-1456", "Cessna 172", "Cessna", 1157, "Liviana", 320.8, 3)
+                ]
+                self.insertar_aeronaves_lote([(*a, fecha_actual) for a in aeronaves_ejemplo])
         
-        conn.commit()
-        conn.close()
+        self.cache.invalidar()
     
     # Métodos para aeronaves
     def insertar_aeronave(self, matricula, modelo, fabricante, peso_mtow, categoria, horas_vuelo, hangar_id):
         """Insertar nueva aeronave"""
-        conn = self.crear_conexion()
-        cursor = conn.cursor()
         fecha_actual = datetime.now().strftime("%Y-%m-%d")
         
         try:
-            cursor.execute("""INSERT INTO aeronaves 
-                           (matricula, modelo, fabricante, peso_mtow, categoria, horas_vuelo, hangar_id, fecha_registro) 
-                           VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", 
-                           (matricula, modelo, fabricante, peso_mtow, categoria, horas_vuelo, hangar_id, fecha_actual))
-            conn.commit()
+            with self.conexion() as conn:
+                conn.execute("""INSERT INTO aeronaves 
+                             (matricula, modelo, fabricante, peso_mtow, categoria, horas_vuelo, hangar_id, fecha_registro) 
+                             VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", 
+                             (matricula, modelo, fabricante, peso_mtow, categoria, horas_vuelo, hangar_id, fecha_actual))
             return True
         except sqlite3.IntegrityError:
             return False
-        finally:
-            conn.close()
+    
+    def obtener_aeronaves_por_ids(self, aeronave_ids):
+        """Obtener varias aeronaves por ID en una consulta: {id: fila}"""
+        aeronave_ids = list(aeronave_ids)
+        if not aeronave_ids:
+            return {}
+        marcadores = ", ".join("?" * len(aeronave_ids))
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT * FROM aeronaves WHERE id IN ({marcadores})", aeronave_ids)
+            resultado = {fila[0]: fila for fila in cursor.fetchall()}
+        return resultado
+    
+    def insertar_aeronaves_lote(self, filas):
+        """Insertar muchas aeronaves con una sola sentencia preparada.
+        
+        filas: tuplas (matricula, modelo, fabricante, peso_mtow, categoria,
+        horas_vuelo, hangar_id, fecha_registro). Dentro de un bloque
+        self.conexion() del llamador forma parte de su transacción; lanza
+        sqlite3.IntegrityError si alguna matrícula ya existe.
+        """
+        with self.conexion() as conn:
+            conn.executemany("""INSERT INTO aeronaves 
+                             (matricula, modelo, fabricante, peso_mtow, categoria, horas_vuelo, hangar_id, fecha_registro) 
+                             VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", filas)
+        return len(filas)
+    
+    def matriculas_existentes(self, matriculas):
+        """Devolver el subconjunto de matrículas que ya están registradas.
+        
+        La consulta se divide en tramos de 500 para no superar el límite de
+        parámetros de SQLite con lotes grandes.
+        """
+        matriculas = list(matriculas)
+        resultado = set()
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            for inicio in range(0, len(matriculas), 500):
+                tramo = matriculas[inicio:inicio + 500]
+                marcadores = ", ".join("?" * len(tramo))
+                cursor.execute(f"SELECT matricula FROM aeronaves WHERE matricula IN ({marcadores})", tramo)
+                resultado.update(fila[0] for fila in cursor.fetchall())
+        return resultado
     
     def obtener_aeronaves(self):
         """Obtener todas las aeronaves"""
-        conn = self.crear_conexion()
-        cursor = conn.cursor()
-        cursor.execute("""SELECT a.*, h.nombre as hangar_nombre 
-                         FROM aeronaves a 
-                         LEFT JOIN hangares h ON a.hangar_id = h.id""")
-        resultado = cursor.fetchall()
-        conn.close()
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""SELECT a.*, h.nombre as hangar_nombre 
+                             FROM aeronaves a 
+                             LEFT JOIN hangares h ON a.hangar_id = h.id""")
+            resultado = cursor.fetchall()
         return resultado
     
     def obtener_aeronave_por_id(self, aeronave_id):
         """Obtener aeronave específica por ID"""
-        conn = self.crear_conexion()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM aeronaves WHERE id = ?", (aeronave_id,))
-        resultado = cursor.fetchone()
-        conn.close()
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM aeronaves WHERE id = ?", (aeronave_id,))
+            resultado = cursor.fetchone()
+        return resultado
+    
+    def obtener_datos_clasificacion(self):
+        """Obtener id, peso MTOW, horas de vuelo y categoría de todas las aeronaves"""
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, peso_mtow, horas_vuelo, categoria FROM aeronaves")
+            resultado = cursor.fetchall()
+        return resultado
+    
+    def iterar_datos_entrenamiento(self, tamano_bloque=10000):
+        """Recorrer los datos de entrenamiento por bloques.
+        
+        Genera primero la cantidad de aeronaves y después listas de hasta
+        tamano_bloque filas (peso_mtow, horas_vuelo, categoria, fabricante),
+        con 10000 kg y 100 h en lugar de pesos u horas nulos o cero. Cada
+        bloque es una consulta corta por rango de id (keyset) y la conexión
+        vuelve al pool antes de cada yield, así que las escrituras del mismo
+        hilo entre bloques no quedan dentro de una transacción de lectura.
+        Sólo se recorren las aeronaves existentes al contar; las insertadas
+        después se ignoran.
+        """
+        with self.conexion() as conn:
+            total, tope = conn.execute("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM aeronaves").fetchone()
+        yield total
+        
+        ultimo = 0
+        while True:
+            with self.conexion() as conn:
+                bloque = conn.execute("""SELECT id, COALESCE(NULLIF(peso_mtow, 0), 10000),
+                                               COALESCE(NULLIF(horas_vuelo, 0), 100),
+                                               categoria, fabricante
+                                        FROM aeronaves WHERE id > ? AND id <= ?
+                                        ORDER BY id LIMIT ?""", (ultimo, tope, tamano_bloque)).fetchall()
+            if not bloque:
+                break
+            ultimo = bloque[-1][0]
+            yield [fila[1:] for fila in bloque]
+    
+    def actualizar_categorias(self, cambios):
+        """Actualizar categorías en lote: cambios = [(categoria, aeronave_id), ...]"""
+        with self.conexion() as conn:
+            conn.executemany("UPDATE aeronaves SET categoria = ? WHERE id = ?", cambios)
+        return len(cambios)
+    
+    # Métodos de paginación (keyset) para tablas grandes
+    def _condiciones_filtro(self, definicion, filtros):
+        """Armar condiciones WHERE para filtros {columna: texto}"""
+        condiciones, parametros = [], []
+        for columna, texto in (filtros or {}).items():
+            if texto in (None, ""):
+                continue
+            condiciones.append(f"{definicion['columnas'][columna]} LIKE ?")
+            parametros.append(f"%{texto}%")
+        return condiciones, parametros
+    
+    def contar_filas_vista(self, vista, filtros=None):
+        """Contar filas de una vista paginada aplicando filtros"""
+        definicion = VISTAS_PAGINADAS[vista]
+        condiciones, parametros = self._condiciones_filtro(definicion, filtros)
+        where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT COUNT(*) FROM {definicion['desde']} {where}", parametros)
+            resultado = cursor.fetchone()[0]
+        return resultado
+    
+    def obtener_pagina_vista(self, vista, orden='id', descendente=False, filtros=None,
+                             despues_de=None, antes_de=None, desplazamiento=0, limite=100):
+        """Obtener una página de una vista ordenada por (orden, clave).
+        
+        despues_de / antes_de reciben la tupla (valor_orden, id) de la última /
+        primera fila ya mostrada y continúan desde ahí sin OFFSET. Sin cursor se
+        usa desplazamiento (saltos directos de la barra de desplazamiento).
+        Las filas se devuelven siempre en el orden solicitado.
+        """
+        definicion = VISTAS_PAGINADAS[vista]
+        columnas = definicion['columnas']
+        expr_orden = columnas[orden]
+        clave = definicion['clave']
+        condiciones, parametros = self._condiciones_filtro(definicion, filtros)
+        
+        # Leer hacia atrás invierte el sentido del orden y luego la lista
+        invertir = antes_de is not None
+        sentido_desc = descendente != invertir
+        if despues_de is not None or antes_de is not None:
+            comparador = "<" if sentido_desc else ">"
+            condiciones.append(f"({expr_orden}, {clave}) {comparador} (?, ?)")
+            parametros.extend(despues_de if despues_de is not None else antes_de)
+            desplazamiento = 0
+        
+        where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        sentido = "DESC" if sentido_desc else "ASC"
+        consulta = f"""SELECT {', '.join(columnas.values())} 
+                       FROM {definicion['desde']} {where} 
+                       ORDER BY {expr_orden} {sentido}, {clave} {sentido} 
+                       LIMIT ? OFFSET ?"""
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            cursor.execute(consulta, parametros + [limite, desplazamiento])
+            resultado = cursor.fetchall()
+        if invertir:
+            resultado.reverse()
         return resultado
     
     # Métodos para hangares
     def obtener_hangares(self):
-        """Obtener todos los hangares"""
-        conn = self.crear_conexion()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM hangares")
-        resultado = cursor.fetchall()
-        conn.close()
+        """Obtener todos los hangares (desde la caché de referencia)"""
+        return self.cache.obtener('hangares', self._leer_hangares)
+    
+    def _leer_hangares(self):
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM hangares ORDER BY id")
+            resultado = cursor.fetchall()
         return resultado
     
     def obtener_hangar_por_nombre(self, nombre):
         """Obtener hangar por nombre"""
-        conn = self.crear_conexion()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM hangares WHERE nombre = ?", (nombre,))
-        resultado = cursor.fetchone()
-        conn.close()
-        return resultado
+        for hangar in self.obtener_hangares():
+            if hangar[1] == nombre:
+                return hangar
+        return None
     
     # Métodos para técnicos
     def obtener_tecnicos(self):
         """Obtener todos los técnicos activos"""
-        conn = self.crear_conexion()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM tecnicos WHERE activo = TRUE")
-        resultado = cursor.fetchall()
-        conn.close()
+        return [t for t in self._obtener_todos_tecnicos() if t[4] == 1]
+    
+    def _obtener_todos_tecnicos(self):
+        return self.cache.obtener('tecnicos', self._leer_tecnicos)
+    
+    def _leer_tecnicos(self):
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM tecnicos ORDER BY id")
+            resultado = cursor.fetchall()
         return resultado
     
     def obtener_tecnico_por_nombre(self, nombre):
-        """Obtener técnico por nombre"""
-        conn = self.crear_conexion()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM tecnicos WHERE nombre LIKE ?", (f"%{nombre}%",))
-        resultado = cursor.fetchone()
-        conn.close()
-        return resultado
+        """Obtener técnico por nombre (coincidencia parcial, sin distinguir mayúsculas)"""
+        buscado = nombre.lower()
+        for tecnico in self._obtener_todos_tecnicos():
+            if buscado in tecnico[1].lower():
+                return tecnico
+        return None
     
     # Métodos para mantenimientos
-    def insertar_mantenimiento(self, aeronave_id, tipo, fecha_programada, tecnico_id, descripcion, costo=0):
-        """Insertar nuevo mantenimiento"""
-        conn = self.crear_conexion()
-        cursor = conn.cursor()
-        fecha_actual = datetime.now().strftime("%Y-%m-%d %H:%M")
+    def insertar_mantenimiento(self, aeronave_id, tipo, fecha_programada, tecnico_id, descripcion, costo=0,
+                               hangar_id=None, duracion_dias=1):
+        """Insertar nuevo mantenimiento.
         
-        cursor.execute("""INSERT INTO mantenimientos 
-                       (aeronave_id, tipo, fecha_programada, tecnico_id, descripcion, fecha_creacion, costo) 
-                       VALUES (?, ?, ?, ?, ?, ?, ?)""", 
-                       (aeronave_id, tipo, fecha_programada, tecnico_id, descripcion, fecha_actual, costo))
-        conn.commit()
-        conn.close()
+        Lanza ValueError si la fecha no es válida, si el técnico ya tiene otro
+        mantenimiento en esos días o si el hangar no tiene lugar libre.
+        """
+        inicio = self._validar_fecha(fecha_programada)
+        with self.conexion() as conn:
+            if not conn.in_transaction:
+                # Verificar e insertar sin que otro escritor ocupe el lugar en medio
+                conn.execute("BEGIN IMMEDIATE")
+            self._verificar_conflictos(conn, tecnico_id, hangar_id, inicio, duracion_dias)
+            
+            cursor = conn.cursor()
+            fecha_actual = datetime.now().strftime("%Y-%m-%d %H:%M")
+            
+            cursor.execute("""INSERT INTO mantenimientos 
+                           (aeronave_id, tipo, fecha_programada, tecnico_id, descripcion, fecha_creacion, costo,
+                            hangar_id, duracion_dias) 
+                           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""", 
+                           (aeronave_id, tipo, inicio, tecnico_id, descripcion, fecha_actual, costo,
+                            hangar_id, duracion_dias))
+            if hangar_id is not None:
+                self.actualizar_ocupacion_hangares()
         return True
     
+    def insertar_mantenimientos_lote(self, filas):
+        """Insertar mantenimientos ya planificados, todos o ninguno.
+        
+        filas: tuplas (aeronave_id, tipo, fecha_programada, tecnico_id, descripcion,
+        costo, hangar_id, duracion_dias). Cada fila se verifica contra lo ya
+        programado (incluidas las filas anteriores del lote); si otro usuario
+        ocupó el técnico o el hangar después de planificar, lanza ValueError y
+        no se inserta nada.
+        """
+        fecha_actual = datetime.now().strftime("%Y-%m-%d %H:%M")
+        with self.conexion() as conn:
+            if not conn.in_transaction:
+                # Verificar e insertar el plan completo sin escritores en medio
+                conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.cursor()
+            for fila in filas:
+                aeronave_id, _, fecha, tecnico_id, _, _, hangar_id, duracion_dias = fila
+                try:
+                    self._verificar_conflictos(conn, tecnico_id, hangar_id, self._validar_fecha(fecha),
+                                               duracion_dias)
+                except ValueError as e:
+                    raise ValueError(f"Conflicto al programar la aeronave {aeronave_id} el {fecha}: {e}")
+                cursor.execute("""INSERT INTO mantenimientos 
+                               (aeronave_id, tipo, fecha_programada, tecnico_id, descripcion, costo,
+                                hangar_id, duracion_dias, fecha_creacion) 
+                               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""", (*fila, fecha_actual))
+            self.actualizar_ocupacion_hangares()
+        return len(filas)
+    
+    def _validar_fecha(self, fecha):
+        try:
+            return datetime.strptime(fecha, "%Y-%m-%d").strftime("%Y-%m-%d")
+        except (TypeError, ValueError):
+            raise ValueError(f"Fecha no válida (use AAAA-MM-DD): {fecha}")
+    
+    def _verificar_conflictos(self, conn, tecnico_id, hangar_id, inicio, duracion_dias):
+        """Lanzar ValueError si el técnico o el hangar no están libres en [inicio, inicio + duración)"""
+        if duracion_dias < 1:
+            raise ValueError("La duración debe ser de al menos un día")
+        fin = (datetime.strptime(inicio, "%Y-%m-%d") + timedelta(days=duracion_dias)).strftime("%Y-%m-%d")
+        cursor = conn.cursor()
+        
+        cursor.execute(f"""SELECT fecha_programada FROM mantenimientos 
+                         WHERE tecnico_id = ? AND {CONDICION_SOLAPE}
+                         LIMIT 1""", (tecnico_id, fin, inicio))
+        conflicto = cursor.fetchone()
+        if conflicto:
+            raise ValueError(f"El técnico ya tiene un mantenimiento programado el {conflicto[0]}")
+        
+        if hangar_id is None:
+            return
+        cursor.execute("SELECT nombre, capacidad FROM hangares WHERE id = ?", (hangar_id,))
+        hangar = cursor.fetchone()
+        if hangar is None:
+            raise ValueError(f"No existe el hangar con id {hangar_id}")
+        cursor.execute(f"""SELECT fecha_programada, duracion_dias FROM mantenimientos 
+                         WHERE hangar_id = ? AND {CONDICION_SOLAPE}""", (hangar_id, fin, inicio))
+        # Ocupación de cada día del intervalo pedido
+        ocupacion = [0] * duracion_dias
+        dia_inicio = datetime.strptime(inicio, "%Y-%m-%d")
+        for fecha, duracion in cursor.fetchall():
+            desde = (datetime.strptime(fecha, "%Y-%m-%d") - dia_inicio).days
+            for dia in range(max(0, desde), min(duracion_dias, desde + duracion)):
+                ocupacion[dia] += 1
+        if max(ocupacion) >= hangar[1]:
+            dia = ocupacion.index(max(ocupacion))
+            raise ValueError(f"{hangar[0]} no tiene capacidad libre el "
+                             f"{(dia_inicio + timedelta(days=dia)).strftime('%Y-%m-%d')}")
+    
+    def obtener_mantenimientos_activos(self, desde, hasta):
+        """Mantenimientos no finalizados que ocupan algún día de [desde, hasta).
+        
+        Devuelve filas (aeronave_id, tecnico_id, hangar_id, fecha_programada, duracion_dias).
+        """
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""SELECT aeronave_id, tecnico_id, hangar_id, fecha_programada, duracion_dias
+                             FROM mantenimientos WHERE {CONDICION_SOLAPE}""", (hasta, desde))
+            resultado = cursor.fetchall()
+        return resultado
+    
+    def actualizar_ocupacion_hangares(self, fecha=None):
+        """Recalcular hangares.ocupacion como los mantenimientos en curso en la fecha (hoy por defecto)"""
+        fecha = fecha or datetime.now().strftime("%Y-%m-%d")
+        manana = (datetime.strptime(fecha, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+        with self.conexion() as conn:
+            conn.execute(f"""UPDATE hangares SET ocupacion = (
+                             SELECT COUNT(*) FROM mantenimientos 
+                             WHERE hangar_id = hangares.id AND {CONDICION_SOLAPE})""", (manana, fecha))
+        self.cache.invalidar('hangares')
+    
     def obtener_mantenimientos(self):
         """Obtener todos los mantenimientos con información relacionada"""
-        conn = self.crear_conexion()
-        cursor = conn.cursor()
-        cursor.execute("""SELECT m.*, a.matricula, a.modelo, t.nombre as tecnico_nombre 
-                         FROM mantenimientos m 
-                         JOIN aeronaves a ON m.aeronave_id = a.id 
-                         JOIN tecnicos t ON m.tecnico_id = t.id 
-                         ORDER BY m.fecha_programada DESC""")
-        resultado = cursor.fetchall()
-        conn.close()
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""SELECT m.*, a.matricula, a.modelo, t.nombre as tecnico_nombre 
+                             FROM mantenimientos m 
+                             JOIN aeronaves a ON m.aeronave_id = a.id 
+                             JOIN tecnicos t ON m.tecnico_id = t.id 
+                             ORDER BY m.fecha_programada DESC""")
+            resultado = cursor.fetchall()
         return resultado
     
     def obtener_mantenimientos_por_aeronave(self, aeronave_id):
         """Obtener mantenimientos de una aeronave específica"""
-        conn = self.crear_conexion()
-        cursor = conn.cursor()
-        cursor.execute("""SELECT m.*, t.nombre as tecnico_nombre 
-                         FROM mantenimientos m 
-                         JOIN tecnicos t ON m.tecnico_id = t.id 
-                         WHERE m.aeronave_id = ? 
-                         ORDER BY m.fecha_programada DESC""", (aeronave_id,))
-        resultado = cursor.fetchall()
-        conn.close()
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""SELECT m.*, t.nombre as tecnico_nombre 
+                             FROM mantenimientos m 
+                             JOIN tecnicos t ON m.tecnico_id = t.id 
+                             WHERE m.aeronave_id = ? 
+                             ORDER BY m.fecha_programada DESC""", (aeronave_id,))
+            resultado = cursor.fetchall()
         return resultado
     
     # Métodos para piezas
     def obtener_piezas(self):
-        """Obtener todas las piezas"""
-        conn = self.crear_conexion()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM piezas ORDER BY nombre")
-        resultado = cursor.fetchall()
-        conn.close()
+        """Obtener todas las piezas (desde la caché de referencia)"""
+        return self.cache.obtener('piezas', self._leer_piezas)
+    
+    def _leer_piezas(self):
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM piezas ORDER BY nombre")
+            resultado = cursor.fetchall()
         return resultado
     
     def actualizar_stock_pieza(self, pieza_id, nueva_cantidad):
         """Actualizar stock de una pieza"""
-        conn = self.crear_conexion()
-        cursor = conn.cursor()
-        fecha_actual = datetime.now().strftime("%Y-%m-%d")
-        cursor.execute("UPDATE piezas SET stock = ?, fecha_actualizacion = ? WHERE id = ?", 
-                      (nueva_cantidad, fecha_actual, pieza_id))
-        conn.commit()
-        conn.close()
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            fecha_actual = datetime.now().strftime("%Y-%m-%d")
+            cursor.execute("UPDATE piezas SET stock = ?, fecha_actualizacion = ? WHERE id = ?", 
+                          (nueva_cantidad, fecha_actual, pieza_id))
+        self.cache.invalidar('piezas')
         return True
     
+    def registrar_consumo_piezas(self, mantenimiento_id, consumos, fecha=None):
+        """Registrar piezas usadas en un mantenimiento descontando su stock.
+        
+        consumos: pares (pieza_id, cantidad). Todo ocurre en una transacción:
+        si alguna pieza no tiene stock suficiente se lanza ValueError y no se
+        descuenta ni registra nada. El descuento es condicional
+        (stock >= cantidad) para que dos consumos simultáneos no dejen stock
+        negativo.
+        """
+        fecha = fecha or datetime.now().strftime("%Y-%m-%d")
+        cantidades = {}
+        for pieza_id, cantidad in consumos:
+            if cantidad <= 0:
+                raise ValueError("La cantidad consumida debe ser mayor que cero")
+            cantidades[pieza_id] = cantidades.get(pieza_id, 0) + cantidad
+        
+        try:
+            with self.conexion() as conn:
+                if not conn.in_transaction:
+                    conn.execute("BEGIN IMMEDIATE")
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1 FROM mantenimientos WHERE id = ?", (mantenimiento_id,))
+                if cursor.fetchone() is None:
+                    raise ValueError(f"No existe el mantenimiento con id {mantenimiento_id}")
+                
+                for pieza_id, cantidad in cantidades.items():
+                    cursor.execute("""UPDATE piezas SET stock = stock - ?, fecha_actualizacion = ? 
+                                   WHERE id = ? AND stock >= ?""", (cantidad, fecha, pieza_id, cantidad))
+                    if cursor.rowcount == 0:
+                        cursor.execute("SELECT nombre, stock FROM piezas WHERE id = ?", (pieza_id,))
+                        pieza = cursor.fetchone()
+                        if pieza is None:
+                            raise ValueError(f"No existe la pieza con id {pieza_id}")
+                        raise ValueError(f"Stock insuficiente de {pieza[0]}: hay {pieza[1]}, se piden {cantidad}")
+                
+                cursor.executemany("""INSERT INTO mantenimiento_piezas (mantenimiento_id, pieza_id, cantidad, fecha) 
+                                   VALUES (?, ?, ?, ?)""",
+                                   [(mantenimiento_id, pieza_id, cantidad, fecha)
+                                    for pieza_id, cantidad in cantidades.items()])
+        finally:
+            self.cache.invalidar('piezas')
+        return True
+    
+    def obtener_consumo_mantenimiento(self, mantenimiento_id):
+        """Piezas usadas en un mantenimiento: [(pieza_id, nombre, cantidad, fecha)]"""
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""SELECT mp.pieza_id, p.nombre, mp.cantidad, mp.fecha 
+                           FROM mantenimiento_piezas mp 
+                           JOIN piezas p ON p.id = mp.pieza_id 
+                           WHERE mp.mantenimiento_id = ?""", (mantenimiento_id,))
+            resultado = cursor.fetchall()
+        return resultado
+    
+    def obtener_consumo_diario_piezas(self, desde, hasta=None):
+        """Consumo total por pieza y día en [desde, hasta]: [(pieza_id, fecha, cantidad)]"""
+        hasta = hasta or datetime.now().strftime("%Y-%m-%d")
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""SELECT pieza_id, fecha, SUM(cantidad) FROM mantenimiento_piezas 
+                           WHERE fecha >= ? AND fecha <= ? 
+                           GROUP BY fecha, pieza_id""", (desde, hasta))
+            resultado = cursor.fetchall()
+        return resultado
+    
     # Métodos para alertas
     def obtener_aeronaves_con_alertas(self):
-        """Obtener aeronaves que requieren mantenimiento (más de cierta cantidad de horas)"""
-        conn = self.crear_conexion()
-        cursor = conn.cursor()
-        cursor.execute("""SELECT * FROM aeronaves 
-                         WHERE (categoria = 'Liviana' AND horas_vuelo > 100) 
-                         OR (categoria = 'Mediana' AND horas_vuelo > 150) 
-                         OR (categoria = 'Pesada' AND horas_vuelo > 200)""")
-        resultado = cursor.fetchall()
-        conn.close()
+        """Obtener aeronaves que superan el umbral de horas de su categoría o modelo"""
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""SELECT a.* FROM alertas_mantenimiento al
+                             JOIN aeronaves a ON a.id = al.aeronave_id
+                             WHERE al.activa = 1""")
+            resultado = cursor.fetchall()
         return resultado
     
-    # Métodos para estadísticas
-    def obtener_estadisticas_generales(self):
-        """Obtener estadísticas generales del sistema"""
-        conn = self.crear_conexion()
-        cursor = conn.cursor()
+    def obtener_datos_mantenimiento_flota(self, aeronave_ids=None):
+        """Datos para el análisis predictivo de toda la flota en una consulta.
         
-        estadisticas = {}
+        Devuelve filas (id, categoria, horas_vuelo, horas_limite) donde
+        horas_limite es el umbral configurado (el del modelo si existe, si no el
+        de la categoría; None si no hay ninguno).
+        """
+        consulta = """SELECT a.id, a.categoria, a.horas_vuelo,
+                             COALESCE(um.horas_limite, uc.horas_limite)
+                      FROM aeronaves a
+                      LEFT JOIN umbrales_mantenimiento um
+                             ON um.categoria = a.categoria AND um.modelo = a.modelo
+                      LEFT JOIN umbrales_mantenimiento uc
+                             ON uc.categoria = a.categoria AND uc.modelo = ''"""
+        parametros = ()
+        if aeronave_ids is not None:
+            parametros = list(aeronave_ids)
+            consulta += f" WHERE a.id IN ({', '.join('?' * len(parametros))})"
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            cursor.execute(consulta, parametros)
+            resultado = cursor.fetchall()
+        return resultado
+    
+    def obtener_alertas_cambiadas(self, desde_version=0):
+        """Obtener las alertas que cambiaron después de desde_version.
         
-        # Total aeronaves por categoría
-        cursor.execute("SELECT categoria, COUNT(*) FROM aeronaves GROUP BY categoria")
-        estadisticas['aeronaves_por_categoria'] = dict(cursor.fetchall())
+        Devuelve (version_actual, cambios) donde cada cambio es
+        (aeronave_id, matricula, modelo, categoria, horas_vuelo, horas_limite, activa).
+        activa = 0 indica que la alerta desapareció y debe quitarse de la vista.
+        Con desde_version=0 se obtienen sólo las alertas activas.
+        """
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT version FROM alertas_version")
+            version = cursor.fetchone()[0]
+            cursor.execute("""SELECT al.aeronave_id, a.matricula, a.modelo, a.categoria,
+                                    al.horas_vuelo, al.horas_limite, al.activa
+                             FROM alertas_mantenimiento al
+                             LEFT JOIN aeronaves a ON a.id = al.aeronave_id
+                             WHERE al.version > ? AND al.version <= ?
+                               AND (? > 0 OR al.activa = 1)
+                             ORDER BY al.version""", (desde_version, version, desde_version))
+            cambios = cursor.fetchall()
+        return version, cambios
+    
+    # Métodos para umbrales de mantenimiento
+    def obtener_umbrales(self):
+        """Obtener umbrales de horas (modelo = '' aplica a toda la categoría)"""
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""SELECT categoria, modelo, horas_limite FROM umbrales_mantenimiento
+                             ORDER BY categoria, modelo""")
+            resultado = cursor.fetchall()
+        return resultado
+    
+    def establecer_umbral(self, categoria, horas_limite, modelo=''):
+        """Crear o cambiar el umbral de una categoría (o de un modelo concreto)"""
+        with self.conexion() as conn:
+            conn.execute("""INSERT INTO umbrales_mantenimiento (categoria, modelo, horas_limite)
+                         VALUES (?, ?, ?)
+                         ON CONFLICT (categoria, modelo) DO UPDATE SET horas_limite = excluded.horas_limite""",
+                         (categoria, modelo, horas_limite))
+            self._recalcular_alertas(conn, categoria)
+        return True
+    
+    def eliminar_umbral(self, categoria, modelo):
+        """Quitar el umbral específico de un modelo (vuelve a regir el de la categoría)"""
+        with self.conexion() as conn:
+            conn.execute("DELETE FROM umbrales_mantenimiento WHERE categoria = ? AND modelo = ?",
+                         (categoria, modelo))
+            self._recalcular_alertas(conn, categoria)
+        return True
+    
+    def _recalcular_alertas(self, conn, categoria):
+        """Reevaluar las alertas de una categoría tras cambiar sus umbrales"""
+        limite = limite_horas_sql("a")
+        conn.execute("UPDATE alertas_version SET version = version + 1")
+        conn.execute(f"""INSERT INTO alertas_mantenimiento (aeronave_id, horas_limite, horas_vuelo, activa, version)
+                     SELECT a.id, {limite}, a.horas_vuelo, COALESCE(a.horas_vuelo > {limite}, 0),
+                            (SELECT version FROM alertas_version)
+                     FROM aeronaves a
+                     LEFT JOIN alertas_mantenimiento al ON al.aeronave_id = a.id
+                     WHERE a.categoria = ?
+                       AND (COALESCE(a.horas_vuelo > {limite}, 0) OR al.activa = 1)
+                     ON CONFLICT (aeronave_id) DO UPDATE SET
+                         horas_limite = excluded.horas_limite,
+                         horas_vuelo = excluded.horas_vuelo,
+                         activa = excluded.activa,
+                         version = excluded.version""", (categoria,))
+    
+    # Métodos para registro de vuelos
+    def registrar_vuelo(self, aeronave_id, horas, fecha=None, origen=None, destino=None):
+        """Registrar un vuelo y sumar sus horas a la aeronave"""
+        fecha = fecha or datetime.now().strftime("%Y-%m-%d")
+        return self.registrar_vuelos([(aeronave_id, fecha, horas, origen, destino)])
+    
+    def registrar_vuelos(self, registros):
+        """Anexar muchos vuelos en una transacción.
         
-        # Mantenimientos por estado
-        cursor.execute("SELECT estado, COUNT(*) FROM mantenimientos GROUP BY estado")
-        estadisticas['mantenimientos_por_estado'] = dict(cursor.fetchall())
+        registros: tuplas (aeronave_id, fecha 'YYYY-MM-DD', horas, origen, destino).
+        Cada vuelo guarda el hangar actual de su aeronave (0 = sin hangar).
+        horas_vuelo de cada aeronave se incrementa una sola vez por lote con la
+        suma de sus vuelos. Lanza ValueError si alguna aeronave no existe.
+        """
+        registros = list(registros)
+        horas_por_aeronave = {}
+        for aeronave_id, _, horas, _, _ in registros:
+            horas_por_aeronave[aeronave_id] = horas_por_aeronave.get(aeronave_id, 0.0) + horas
         
-        # Costos totales
-        cursor.execute("SELECT SUM(costo) FROM mantenimientos")
-        resultado = cursor.fetchone()
-        estadisticas['costo_total_mantenimientos'] = resultado[0] if resultado[0] else 0
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""INSERT INTO registros_vuelo (aeronave_id, fecha, horas, origen, destino, hangar_id) 
+                               VALUES (?1, ?2, ?3, ?4, ?5,
+                                       COALESCE((SELECT hangar_id FROM aeronaves WHERE id = ?1), 0))""", registros)
+            for aeronave_id, horas in horas_por_aeronave.items():
+                cursor.execute("UPDATE aeronaves SET horas_vuelo = horas_vuelo + ? WHERE id = ?",
+                               (horas, aeronave_id))
+                if cursor.rowcount == 0:
+                    raise ValueError(f"No existe la aeronave con id {aeronave_id}")
+        return len(registros)
+    
+    def consolidar_registros_vuelo(self):
+        """Sumar a los resúmenes diarios y mensuales los vuelos aún no consolidados.
+        
+        Sólo lee los registros posteriores a la marca guardada, por lo que el
+        costo depende de los vuelos nuevos y no del historial completo. Las
+        horas se suman al hangar registrado en cada vuelo.
+        Devuelve la cantidad de registros consolidados.
+        """
+        with self.conexion() as conn:
+            if not conn.in_transaction:
+                # Reservar la escritura desde el inicio: la marca y el máximo
+                # deben leerse sin que otro escritor agregue vuelos en medio
+                conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.cursor()
+            cursor.execute("SELECT ultimo_id FROM marcas_consolidacion WHERE nombre = 'registros_vuelo'")
+            desde = cursor.fetchone()[0]
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM registros_vuelo")
+            hasta = cursor.fetchone()[0]
+            if hasta <= desde:
+                return 0
+            
+            for tabla, periodo, columna in (("resumen_vuelo_diario", "r.fecha", "fecha"),
+                                            ("resumen_vuelo_mensual", "substr(r.fecha, 1, 7)", "mes")):
+                cursor.execute(f"""INSERT INTO {tabla} (aeronave_id, {columna}, hangar_id, horas, vuelos)
+                               SELECT r.aeronave_id, {periodo}, r.hangar_id, SUM(r.horas), COUNT(*)
+                               FROM registros_vuelo r
+                               WHERE r.id > ? AND r.id <= ?
+                               GROUP BY r.aeronave_id, {periodo}, r.hangar_id
+                               ON CONFLICT (aeronave_id, {columna}, hangar_id) DO UPDATE SET
+                                   horas = horas + excluded.horas,
+                                   vuelos = vuelos + excluded.vuelos""", (desde, hasta))
+            
+            cursor.execute("UPDATE marcas_consolidacion SET ultimo_id = ? WHERE nombre = 'registros_vuelo'",
+                           (hasta,))
+            cursor.execute("SELECT COUNT(*) FROM registros_vuelo WHERE id > ? AND id <= ?", (desde, hasta))
+            consolidados = cursor.fetchone()[0]
+        return consolidados
+    
+    def _tendencia_utilizacion(self, columna_filtro, valor, periodo, desde, hasta):
+        """Sólo lectura: resúmenes más los vuelos posteriores a la última
+        consolidación (que se hace periódicamente), en una misma consulta"""
+        tabla, columna, expresion = {'dia': ("resumen_vuelo_diario", "fecha", "fecha"),
+                                     'mes': ("resumen_vuelo_mensual", "mes", "substr(fecha, 1, 7)")}[periodo]
+        
+        def filtro(campo):
+            condiciones = [f"{columna_filtro} = ?"]
+            parametros = [valor]
+            if desde:
+                condiciones.append(f"{campo} >= ?")
+                parametros.append(desde)
+            if hasta:
+                condiciones.append(f"{campo} <= ?")
+                parametros.append(hasta)
+            return " AND ".join(condiciones), parametros
+        
+        condiciones_resumen, parametros_resumen = filtro(columna)
+        condiciones_registro, parametros_registro = filtro(expresion)
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""SELECT periodo, SUM(horas), SUM(vuelos) FROM (
+                                 SELECT {columna} AS periodo, horas, vuelos FROM {tabla}
+                                 WHERE {condiciones_resumen}
+                                 UNION ALL
+                                 SELECT {expresion}, horas, 1 FROM registros_vuelo
+                                 WHERE id > (SELECT ultimo_id FROM marcas_consolidacion
+                                             WHERE nombre = 'registros_vuelo')
+                                   AND {condiciones_registro})
+                             GROUP BY periodo ORDER BY periodo""",
+                           parametros_resumen + parametros_registro)
+            resultado = cursor.fetchall()
+        return resultado
+    
+    def obtener_tendencia_aeronave(self, aeronave_id, periodo='mes', desde=None, hasta=None):
+        """Horas y vuelos por día o mes de una aeronave: [(periodo, horas, vuelos)]"""
+        return self._tendencia_utilizacion("aeronave_id", aeronave_id, periodo, desde, hasta)
+    
+    def obtener_tendencia_hangar(self, hangar_id, periodo='mes', desde=None, hasta=None):
+        """Horas y vuelos por día o mes volados desde un hangar: [(periodo, horas, vuelos)]"""
+        return self._tendencia_utilizacion("hangar_id", hangar_id, periodo, desde, hasta)
+    
+    # Métodos para estadísticas
+    def _filtro_mantenimientos(self, hangar_id=None, desde=None, hasta=None):
+        """Condiciones sobre mantenimientos m de un hangar y rango de fechas [desde, hasta].
         
-        conn.close()
+        El hangar es el del mantenimiento o, si no tiene, el de la aeronave
+        (que requiere la unión con aeronaves a).
+        """
+        condiciones = ["1 = 1"]
+        parametros = []
+        if hangar_id is not None:
+            condiciones.append("COALESCE(m.hangar_id, a.hangar_id) = ?")
+            parametros.append(hangar_id)
+        if desde:
+            condiciones.append("m.fecha_programada >= ?")
+            parametros.append(desde)
+        if hasta:
+            condiciones.append("m.fecha_programada <= ?")
+            parametros.append(hasta)
+        return " AND ".join(condiciones), parametros
+    
+    def obtener_estadisticas_generales(self, hangar_id=None, desde=None, hasta=None):
+        """Obtener estadísticas generales del sistema, o de un hangar y período"""
+        filtro, parametros = self._filtro_mantenimientos(hangar_id, desde, hasta)
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            
+            estadisticas = {}
+            
+            # Total aeronaves por categoría
+            if hangar_id is None:
+                cursor.execute("SELECT categoria, COUNT(*) FROM aeronaves GROUP BY categoria")
+            else:
+                cursor.execute("SELECT categoria, COUNT(*) FROM aeronaves WHERE hangar_id = ? GROUP BY categoria",
+                               (hangar_id,))
+            estadisticas['aeronaves_por_categoria'] = dict(cursor.fetchall())
+            
+            # Mantenimientos por estado
+            cursor.execute(f"""SELECT m.estado, COUNT(*) FROM mantenimientos m 
+                             LEFT JOIN aeronaves a ON a.id = m.aeronave_id 
+                             WHERE {filtro} GROUP BY m.estado""", parametros)
+            estadisticas['mantenimientos_por_estado'] = dict(cursor.fetchall())
+            
+            # Costos totales
+            cursor.execute(f"""SELECT SUM(m.costo) FROM mantenimientos m 
+                             LEFT JOIN aeronaves a ON a.id = m.aeronave_id 
+                             WHERE {filtro}""", parametros)
+            resultado = cursor.fetchone()
+            estadisticas['costo_total_mantenimientos'] = resultado[0] if resultado[0] else 0
         return estadisticas
     
+    def obtener_costos(self, agrupacion='tipo', hangar_id=None, desde=None, hasta=None):
+        """Costos de mantenimiento agrupados: [(clave, total, cantidad, promedio)].
+        
+        agrupacion: 'tipo', 'mes', 'aeronave', 'categoria' o 'hangar' (el del
+        mantenimiento o, si no tiene, el de la aeronave). Los cancelados no
+        cuentan. Sin filtros de hangar o fechas el resultado queda en caché
+        hasta que cambie costos_version, que los triggers incrementan con cada
+        escritura que lo afecta.
+        """
+        if agrupacion not in AGRUPACIONES_COSTOS:
+            raise ValueError(f"Agrupación de costos no válida: {agrupacion}")
+        if hangar_id is not None or desde or hasta:
+            return self._leer_costos(agrupacion, hangar_id, desde, hasta)
+        with self.conexion() as conn:
+            version = conn.execute("SELECT version FROM costos_version").fetchone()[0]
+        return self.cache.obtener(f"costos_{agrupacion}",
+                                  lambda: self._leer_costos(agrupacion), version=version)
+    
+    def _leer_costos(self, agrupacion, hangar_id=None, desde=None, hasta=None):
+        clave, uniones = AGRUPACIONES_COSTOS[agrupacion]
+        if hangar_id is not None and not uniones:
+            uniones = "LEFT JOIN aeronaves a ON a.id = m.aeronave_id"
+        filtro, parametros = self._filtro_mantenimientos(hangar_id, desde, hasta)
+        orden = "clave" if agrupacion == 'mes' else "total DESC, clave"
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""SELECT {clave} AS clave, SUM(COALESCE(m.costo, 0)) AS total,
+                                      COUNT(*), AVG(COALESCE(m.costo, 0))
+                               FROM mantenimientos m {uniones}
+                               WHERE COALESCE(m.estado, '') != 'Cancelado' AND {filtro}
+                               GROUP BY clave ORDER BY {orden}""", parametros)
+            resultado = cursor.fetchall()
+        return resultado
+    
+    def obtener_costos_por_tipo(self):
+        """Costo total por tipo de mantenimiento: [(tipo, total)]"""
+        return [(tipo, total) for tipo, total, _, _ in self.obtener_costos('tipo')]
+    
+    def obtener_resumen_dashboard(self):
+        """Obtener los contadores del dashboard en una sola consulta agregada"""
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""SELECT 
+                                 (SELECT COUNT(*) FROM aeronaves),
+                                 (SELECT COUNT(*) FROM mantenimientos WHERE estado = 'En Proceso'),
+                                 (SELECT COUNT(*) FROM tecnicos WHERE activo = TRUE),
+                                 (SELECT COUNT(*) FROM hangares)""")
+            resultado = cursor.fetchone()
+        return {
+            'total_aeronaves': resultado[0],
+            'mantenimientos_activos': resultado[1],
+            'total_tecnicos': resultado[2],
+            'total_hangares': resultado[3]
+        }
+    
+    def estadisticas_cache(self):
+        """Aciertos y fallos de la caché de tablas de referencia"""
+        return self.cache.estadisticas()
+    
     def cerrar_conexion(self):
-        """Cerrar conexión (no es necesario con context managers, pero útil para cleanup)"""
-        pass
\ No newline at end of file
+        """Cerrar las conexiones persistentes del pool (cleanup al salir)"""
+        self.pool.cerrar()
@@ -0,0 +1,293 @@
+# evaluacion_modelos.py - Validación cruzada y comparación de clasificadores de categoría
+#
+# Uso: python evaluacion_modelos.py [--db sgma_aeronaves.db] [--pliegues 5] [--procesos N]
+#                                   [--modelos reglas bosque bosque_compilado gradient_boosting]
+#                                   [--precision-minima 0.95] [--salida informe.json]
+#
+# Cada modelo se ajusta y evalúa en los mismos pliegues estratificados (semilla
+# fija), repartidos entre procesos. Por pliegue se mide exactitud, reporte por
+# clase, tiempo de ajuste (sin trazar memoria), memoria pico (en un ajuste
+# aparte), tamaño en disco y latencia de predicción en lote y por fila. El
+# informe recomienda el modelo más rápido por fila entre los que alcanzan la
+# exactitud mínima.
+import abc
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import joblib
+import numpy as np
+import sklearn
+from sklearn.ensemble import GradientBoostingClassifier, HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.metrics import accuracy_score, classification_report
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+from bosque_compilado import BosqueCompilado
+from categorias import LIMITE_LIVIANA, LIMITE_MEDIANA
+from database import DatabaseManager
+from servicio_modelo import ServicioModeloIA
+
+SEMILLA = 42
+FILAS_LATENCIA = 200      # Predicciones de una fila medidas por pliegue
+
+class ModeloReglas:
+    """Límites de MTOW de categorias.categorizar_aeronave, sin ajuste"""
+
+    def ajustar(self, X, y, clases):
+        self.codigos = {clase: codigo for codigo, clase in enumerate(clases)}
+
+    def predecir(self, X):
+        peso = np.asarray(X)[:, 0]
+        codigo = lambda categoria: self.codigos.get(categoria, -1)   # -1: categoría ausente en los datos
+        return np.where(peso <= LIMITE_LIVIANA, codigo("Liviana"),
+                        np.where(peso <= LIMITE_MEDIANA, codigo("Mediana"), codigo("Pesada")))
+
+    def guardar(self, ruta):
+        joblib.dump((LIMITE_LIVIANA, LIMITE_MEDIANA), ruta)
+
+class ModeloSklearn(abc.ABC):
+    """Estimador de sklearn sobre las características escaladas, como en ServicioModeloIA"""
+
+    @abc.abstractmethod
+    def crear(self):
+        """Estimador sin ajustar"""
+
+    def ajustar(self, X, y, clases):
+        self.scaler = StandardScaler().fit(X)
+        self.modelo = self.crear().fit(self.scaler.transform(X), y)
+
+    def predecir(self, X):
+        return self.modelo.predict(self.scaler.transform(X))
+
+    def guardar(self, ruta):
+        joblib.dump((self.scaler, self.modelo), ruta)
+
+class ModeloBosque(ModeloSklearn):
+    """Misma configuración que el modelo de producción (un solo núcleo)"""
+
+    def crear(self):
+        return RandomForestClassifier(n_estimators=100, max_depth=10, random_state=SEMILLA,
+                                      class_weight='balanced', n_jobs=1)
+
+class ModeloBosqueCompilado(ModeloBosque):
+    """El bosque de producción predicho con BosqueCompilado (sin sklearn)"""
+
+    def ajustar(self, X, y, clases):
+        super().ajustar(X, y, clases)
+        self.compilado = BosqueCompilado.desde_sklearn(self.modelo, self.scaler, LabelEncoder().fit(clases))
+
+    def predecir(self, X):
+        return self.modelo.classes_[self.compilado.predict_proba(X).argmax(axis=1)]
+
+    def guardar(self, ruta):
+        self.compilado.guardar(ruta)
+
+class ModeloGradientBoosting(ModeloSklearn):
+    def crear(self):
+        return GradientBoostingClassifier(n_estimators=100, max_depth=3, random_state=SEMILLA)
+
+class ModeloHistGradientBoosting(ModeloSklearn):
+    def crear(self):
+        return HistGradientBoostingClassifier(max_iter=100, random_state=SEMILLA)
+
+MODELOS = {
+    'reglas': ModeloReglas,
+    'bosque': ModeloBosque,
+    'bosque_compilado': ModeloBosqueCompilado,
+    'gradient_boosting': ModeloGradientBoosting,
+    'hist_gradient_boosting': ModeloHistGradientBoosting
+}
+
+# Datos compartidos por las tareas de un proceso de trabajo
+_datos_proceso = None
+
+def _iniciar_proceso(X, y, clases):
+    global _datos_proceso
+    _datos_proceso = (X, y, clases)
+
+def evaluar_pliegue(nombre, pliegue, entrenamiento, prueba):
+    """Ajustar el modelo en un pliegue y devolver sus métricas"""
+    X, y, clases = _datos_proceso
+    modelo = MODELOS[nombre]()
+
+    inicio = time.perf_counter()
+    modelo.ajustar(X[entrenamiento], y[entrenamiento], clases)
+    tiempo_ajuste = time.perf_counter() - inicio
+
+    # La memoria se mide en un segundo ajuste: trazarla frena cada modelo en
+    # distinta medida y sesgaría la comparación de tiempos
+    tracemalloc.start()
+    try:
+        MODELOS[nombre]().ajustar(X[entrenamiento], y[entrenamiento], clases)
+        memoria_pico = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    X_prueba, y_prueba = X[prueba], y[prueba]
+    inicio = time.perf_counter()
+    y_pred = modelo.predecir(X_prueba)
+    tiempo_lote = time.perf_counter() - inicio
+
+    latencias = []
+    for fila in X_prueba[np.arange(FILAS_LATENCIA) % len(X_prueba)]:
+        inicio = time.perf_counter()
+        modelo.predecir(fila[None, :])
+        latencias.append(time.perf_counter() - inicio)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "modelo")
+        modelo.guardar(ruta)
+        tamano = os.path.getsize(ruta)
+
+    reporte = classification_report(y_prueba, y_pred, labels=np.arange(len(clases)), target_names=list(clases),
+                                    output_dict=True, zero_division=0)
+    return {
+        'modelo': nombre,
+        'pliegue': pliegue,
+        'exactitud': accuracy_score(y_prueba, y_pred),
+        'f1_macro': reporte['macro avg']['f1-score'],
+        'reporte_clases': {clase: reporte[clase] for clase in clases},
+        'tiempo_ajuste_s': tiempo_ajuste,
+        'memoria_pico_mb': memoria_pico / 2**20,
+        'tamano_mb': tamano / 2**20,
+        'lote_us_por_fila': tiempo_lote / len(X_prueba) * 1e6,
+        'fila_p50_ms': float(np.percentile(latencias, 50)) * 1000,
+        'fila_p99_ms': float(np.percentile(latencias, 99)) * 1000
+    }
+
+def evaluar(X, y, modelos=tuple(MODELOS), pliegues=5, procesos=None, progreso=None):
+    """Validación cruzada de cada modelo en los mismos pliegues; devuelve los resultados por pliegue.
+
+    y son las categorías como texto. procesos=1 evalúa en el proceso actual.
+    progreso(fraccion, mensaje) se llama tras cada pliegue terminado.
+    """
+    desconocidos = set(modelos) - set(MODELOS)
+    if desconocidos:
+        raise ValueError(f"Modelos desconocidos: {', '.join(sorted(desconocidos))} "
+                         f"(disponibles: {', '.join(MODELOS)})")
+    codificador = LabelEncoder()
+    y_codificado = codificador.fit_transform(y)
+    clases = [str(c) for c in codificador.classes_]
+    if min(np.bincount(y_codificado)) < pliegues:
+        raise ValueError(f"Cada categoría necesita al menos {pliegues} aeronaves para {pliegues} pliegues")
+
+    division = StratifiedKFold(n_splits=pliegues, shuffle=True, random_state=SEMILLA)
+    tareas = [(nombre, pliegue, entrenamiento, prueba)
+              for pliegue, (entrenamiento, prueba) in enumerate(division.split(X, y_codificado))
+              for nombre in modelos]
+
+    if procesos == 1:
+        _iniciar_proceso(X, y_codificado, clases)
+        resultados = (evaluar_pliegue(*tarea) for tarea in tareas)
+        ejecutor = None
+    else:
+        ejecutor = ProcessPoolExecutor(procesos or os.cpu_count() or 1, initializer=_iniciar_proceso,
+                                       initargs=(X, y_codificado, clases))
+        resultados = ejecutor.map(evaluar_pliegue, *zip(*tareas))
+    try:
+        lista = []
+        for n, resultado in enumerate(resultados, 1):
+            lista.append(resultado)
+            if progreso is not None:
+                progreso(n / len(tareas), f"{resultado['modelo']} pliegue {resultado['pliegue'] + 1}")
+        return lista
+    finally:
+        if ejecutor is not None:
+            ejecutor.shutdown(cancel_futures=True)
+
+# Columnas del resumen: (clave, encabezado, formato)
+COLUMNAS_RESUMEN = [
+    ('exactitud', 'Exactitud', '{:.2%}'),
+    ('f1_macro', 'F1 macro', '{:.3f}'),
+    ('tiempo_ajuste_s', 'Ajuste s', '{:.3f}'),
+    ('fila_p50_ms', 'Fila p50 ms', '{:.3f}'),
+    ('fila_p99_ms', 'Fila p99 ms', '{:.3f}'),
+    ('lote_us_por_fila', 'Lote µs/fila', '{:.2f}'),
+    ('tamano_mb', 'Disco MB', '{:.3f}'),
+    ('memoria_pico_mb', 'Memoria MB', '{:.1f}')
+]
+
+def resumir(resultados, precision_minima=0.95):
+    """Media y desvío por modelo, y el modelo recomendado.
+
+    Se recomienda el de menor latencia por fila (p50) entre los que alcanzan
+    precision_minima de exactitud media; a igual latencia, el más pequeño.
+    """
+    resumen = {}
+    for nombre in dict.fromkeys(r['modelo'] for r in resultados):
+        propios = [r for r in resultados if r['modelo'] == nombre]
+        resumen[nombre] = {clave: {'media': float(np.mean([r[clave] for r in propios])),
+                                   'desvio': float(np.std([r[clave] for r in propios]))}
+                           for clave, _, _ in COLUMNAS_RESUMEN}
+    aptos = [n for n, m in resumen.items() if m['exactitud']['media'] >= precision_minima]
+    recomendado = min(aptos, key=lambda n: (resumen[n]['fila_p50_ms']['media'], resumen[n]['tamano_mb']['media']),
+                      default=None)
+    return resumen, recomendado
+
+def informe(X, resultados, pliegues, precision_minima, fuente):
+    """Informe reproducible: configuración, entorno, resultados por pliegue y resumen"""
+    resumen, recomendado = resumir(resultados, precision_minima)
+    return {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'fuente': fuente,
+        'muestras': len(X),
+        'pliegues': pliegues,
+        'semilla': SEMILLA,
+        'precision_minima': precision_minima,
+        'entorno': {'python': platform.python_version(), 'numpy': np.__version__,
+                    'sklearn': sklearn.__version__, 'cpus': os.cpu_count(), 'plataforma': platform.platform()},
+        'resumen': resumen,
+        'recomendado': recomendado,
+        'pliegues_detalle': resultados
+    }
+
+def escribir_tabla(datos, salida=sys.stdout):
+    print(f"{datos['muestras']:,} muestras | {datos['pliegues']} pliegues | semilla {datos['semilla']} | "
+          f"sklearn {datos['entorno']['sklearn']} | {datos['entorno']['cpus']} CPU", file=salida)
+    ancho = max(len(n) for n in datos['resumen']) + 2
+    print(f"{'Modelo':<{ancho}}" + "".join(f"{titulo:>14}" for _, titulo, _ in COLUMNAS_RESUMEN), file=salida)
+    for nombre, metricas in datos['resumen'].items():
+        print(f"{nombre:<{ancho}}" + "".join(f"{formato.format(metricas[clave]['media']):>14}"
+                                            for clave, _, formato in COLUMNAS_RESUMEN), file=salida)
+    if datos['recomendado']:
+        print(f"Recomendado (exactitud >= {datos['precision_minima']:.0%}, menor latencia por fila): "
+              f"{datos['recomendado']}", file=salida)
+    else:
+        print(f"Ningún modelo alcanza {datos['precision_minima']:.0%} de exactitud", file=salida)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validación cruzada y comparación de modelos de categoría")
+    parser.add_argument("--db", default="sgma_aeronaves.db")
+    parser.add_argument("--modelos", nargs="+", default=list(MODELOS), choices=list(MODELOS))
+    parser.add_argument("--pliegues", type=int, default=5)
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos de trabajo (por defecto, uno por CPU)")
+    parser.add_argument("--max-filas", type=int, help="Evaluar con una muestra de N aeronaves")
+    parser.add_argument("--precision-minima", type=float, default=0.95)
+    parser.add_argument("--salida", help="Guardar el informe completo en JSON")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.db)
+    servicio = ServicioModeloIA(db)
+    servicio.max_filas_entrenamiento = args.max_filas
+    X, y, _ = servicio.preparar_datos_entrenamiento()
+    db.cerrar_conexion()
+
+    resultados = evaluar(X, y, args.modelos, args.pliegues, args.procesos,
+                         progreso=lambda fraccion, mensaje: print(f"\r[{fraccion:4.0%}] {mensaje:<40}", end="",
+                                                                  file=sys.stderr, flush=True))
+    print(file=sys.stderr)
+    datos = informe(X, resultados, args.pliegues, args.precision_minima, args.db)
+    escribir_tabla(datos)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(datos, f, ensure_ascii=False, indent=2)
+        print(f"Informe: {args.salida}")
+
+if __name__ == "__main__":
+    main()
@@ -1,327 +1,34 @@
 # ia_aeronaves.py - Sistema de IA para clasificación y predicción de aeronaves
 import tkinter as tk
 from tkinter import ttk, messagebox
-import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, classification_report
-import joblib
-import os
-from datetime import datetime
+from servicio_modelo import ServicioModeloIA, NIVELES_URGENCIA
 
-class SistemaIAAeronaves:
-    def __init__(self, parent):
-        self.parent = parent
-        self.modelo = None
-        self.scaler = StandardScaler()
-        self.label_encoder_categoria = LabelEncoder()
-        self.label_encoder_fabricante = LabelEncoder()
-        self.fabricantes_conocidos = []
-        self.modelo_entrenado = False
-        
-        # Crear directorio para modelos si no existe
-        if not os.path.exists('modelos_ia'):
-            os.makedirs('modelos_ia')
+class SistemaIAAeronaves(ServicioModeloIA):
+    """Adaptador de ServicioModeloIA para la aplicación Tk.
     
-    def preparar_datos_entrenamiento(self):
-        """Preparar datos de aeronaves existentes para entrenamiento"""
-        aeronaves = self.parent.db.obtener_aeronaves()
-        
-        if len(aeronaves) < 10:
-            # Si hay pocos datos, agregar datos sintéticos para entrenamiento
-            datos_sinteticos = self.generar_datos_sinteticos()
-            return datos_sinteticos
-        
-        # Preparar datos reales
-        X = []
-        y = []
-        fabricantes = []
-        
-        for aeronave in aeronaves:
-            # Características: peso_mtow, horas_vuelo, año_fabricacion_estimado
-            peso_mtow = aeronave[4] if aeronave[4] else 10000
-            horas_vuelo = aeronave[6] if aeronave[6] else 100
-            
-            # Estimar año de fabricación basado en horas de vuelo (aproximación)
-            ano_estimado = 2024 - int(horas_vuelo / 500) if horas_vuelo > 500 else 2020
-            
-            X.append([peso_mtow, horas_vuelo, ano_estimado])
-            y.append(aeronave[5])  # categoría
-            fabricantes.append(aeronave[3])  # fabricante
-        
-        return np.array(X), np.array(y), np.array(fabricantes)
+    Lee los datos de parent.db y agrega los métodos que muestran resultados
+    en cuadros de diálogo; todo el trabajo lo hace el servicio.
+    """
     
-    def generar_datos_sinteticos(self):
-        """Generar datos sintéticos para entrenamiento inicial"""
-        np.random.seed(42)
-        
-        # Datos para aeronaves livianas
-        livianas = []
-        for _ in range(50):
-            peso = np.random.uniform(500, 5700)
-            horas = np.random.uniform(50, 1000)
-            ano = np.random.randint(2010, 2024)
-            livianas.append([peso, horas, ano, "Liviana", 
-                           np.random.choice(["Cessna", "Piper", "Beechcraft"])])
-        
-        # Datos para aeronaves medianas
-        medianas = []
-        for _ in range(40):
-            peso = np.random.uniform(5701, 27000)
-            horas = np.random.uniform(200, 2000)
-            ano = np.random.randint(2005, 2023)
-            medianas.append([peso, horas, ano, "Mediana", 
-                           np.random.choice(["Embraer", "Bombardier", "ATR"])])
-        
-        # Datos para aeronaves pesadas
-        pesadas = []
-        for _ in range(30):
-            peso = np.random.uniform(27001, 400000)
-            horas = np.random.uniform(500, 5000)
-            ano = np.random.randint(2000, 2022)
-            pesadas.append([peso, horas, ano, "Pesada", 
-                          np.random.choice(["Boeing", "Airbus", "McDonnell Douglas"])])
-        
-        # Combinar todos los datos
-        todos_datos = livianas + medianas + pesadas
-        np.random.shuffle(todos_datos)
-        
-        X = np.array([[d[0], d[1], d[2]] for d in todos_datos])
-        y = np.array([d[3] for d in todos_datos])
-        fabricantes = np.array([d[4] for d in todos_datos])
-        
-        return X, y, fabricantes
+    def __init__(self, parent):
+        super().__init__(parent.db)
+        self.parent = parent
     
     def entrenar_modelo(self):
         """Entrenar el modelo de clasificación"""
         try:
-            # Obtener datos
-            X, y, fabricantes = self.preparar_datos_entrenamiento()
-            
-            if len(X) == 0:
-                messagebox.showerror("Error", "No hay datos suficientes para entrenar")
-                return False
-            
-            # Normalizar características
-            X_scaled = self.scaler.fit_transform(X)
-            
-            # Codificar etiquetas
-            y_encoded = self.label_encoder_categoria.fit_transform(y)
-            self.label_encoder_fabricante.fit(fabricantes)
-            self.fabricantes_conocidos = list(self.label_encoder_fabricante.classes_)
-            
-            # Dividir datos
-            X_train, X_test, y_train, y_test = train_test_split(
-                X_scaled, y_encoded, test_size=0.2, random_state=42, stratify=y_encoded
-            )
-            
-            # Entrenar modelo
-            self.modelo = RandomForestClassifier(
-                n_estimators=100,
-                max_depth=10,
-                random_state=42,
-                class_weight='balanced'
-            )
-            
-            self.modelo.fit(X_train, y_train)
-            
-            # Evaluar modelo
-            y_pred = self.modelo.predict(X_test)
-            accuracy = accuracy_score(y_test, y_pred)
-            
-            # Guardar modelo
-            self.guardar_modelo()
-            self.modelo_entrenado = True
+            resultado = self.ejecutar_entrenamiento()
             
             messagebox.showinfo("Éxito", 
                               f"Modelo entrenado exitosamente!\n"
-                              f"Precisión: {accuracy:.2%}\n"
-                              f"Datos de entrenamiento: {len(X)} aeronaves")
+                              f"Precisión: {resultado['precision']:.2%}\n"
+                              f"Datos de entrenamiento: {resultado['total_datos']} aeronaves")
             
             return True
             
         except Exception as e:
             messagebox.showerror("Error", f"Error al entrenar modelo: {str(e)}")
             return False
-    
-    def predecir_categoria(self, peso_mtow, horas_vuelo, ano_fabricacion=None):
-        """Predecir categoría de aeronave usando IA"""
-        if not self.modelo_entrenado:
-            if not self.cargar_modelo():
-                return None, 0.0
-        
-        try:
-            # Preparar datos de entrada
-            if ano_fabricacion is None:
-                ano_fabricacion = 2020  # Valor por defecto
-            
-            X_input = np.array([[peso_mtow, horas_vuelo, ano_fabricacion]])
-            X_input_scaled = self.scaler.transform(X_input)
-            
-            # Hacer predicción
-            prediccion = self.modelo.predict(X_input_scaled)[0]
-            probabilidades = self.modelo.predict_proba(X_input_scaled)[0]
-            
-            # Decodificar resultado
-            categoria_predicha = self.label_encoder_categoria.inverse_transform([prediccion])[0]
-            confianza = max(probabilidades)
-            
-            return categoria_predicha, confianza
-            
-        except Exception as e:
-            print(f"Error en predicción: {e}")
-            return None, 0.0
-    
-    def sugerir_fabricante(self, peso_mtow, categoria):
-        """Sugerir fabricante basado en peso y categoría"""
-        sugerencias = {
-            "Liviana": {
-                "peso_bajo": ["Cessna", "Piper", "Diamond"],
-                "peso_alto": ["Beechcraft", "Mooney", "Cirrus"]
-            },
-            "Mediana": {
-                "peso_bajo": ["Embraer", "ATR", "Bombardier"],
-                "peso_alto": ["Saab", "Fokker", "BAe"]
-            },
-            "Pesada": {
-                "peso_bajo": ["Boeing", "Airbus", "Embraer"],
-                "peso_alto": ["Boeing", "Airbus", "McDonnell Douglas"]
-            }
-        }
-        
-        if categoria in sugerencias:
-            if categoria == "Liviana":
-                subcategoria = "peso_bajo" if peso_mtow < 3000 else "peso_alto"
-            elif categoria == "Mediana":
-                subcategoria = "peso_bajo" if peso_mtow < 15000 else "peso_alto"
-            else:  # Pesada
-                subcategoria = "peso_bajo" if peso_mtow < 100000 else "peso_alto"
-            
-            return sugerencias[categoria][subcategoria]
-        
-        return ["Boeing", "Airbus", "Cessna"]
-    
-    def analizar_mantenimiento_predictivo(self, aeronave_id):
-        """Análisis predictivo para mantenimiento"""
-        aeronave = self.parent.db.obtener_aeronave_por_id(aeronave_id)
-        if not aeronave:
-            return None
-        
-        peso_mtow = aeronave[4]
-        horas_vuelo = aeronave[6]
-        categoria = aeronave[5]
-        
-        # Algoritmo simple de predicción de mantenimiento
-        limites_mantenimiento = {
-            "Liviana": 100,
-            "Mediana": 150,
-            "Pesada": 200
-        }
-        
-        limite = limites_mantenimiento.get(categoria, 150)
-        horas_restantes = limite - (horas_vuelo % limite)
-        
-        # Calcular urgencia
-        if horas_restantes <= 10:
-            urgencia = "CRÍTICA"
-            color = "#e74c3c"
-        elif horas_restantes <= 25:
-            urgencia = "ALTA"
-            color = "#f39c12"
-        elif horas_restantes <= 50:
-            urgencia = "MEDIA"
-            color = "#f1c40f"
-        else:
-            urgencia = "BAJA"
-            color = "#2ecc71"
-        
-        # Predicción de costos (estimación basada en categoría y horas)
-        costo_base = {
-            "Liviana": 1500,
-            "Mediana": 5000,
-            "Pesada": 15000
-        }
-        
-        factor_horas = 1 + (horas_vuelo / 10000)  # Mayor costo con más horas
-        costo_estimado = costo_base.get(categoria, 5000) * factor_horas
-        
-        return {
-            "horas_restantes": horas_restantes,
-            "urgencia": urgencia,
-            "color": color,
-            "costo_estimado": costo_estimado,
-            "recomendaciones": self.generar_recomendaciones(categoria, horas_vuelo)
-        }
-    
-    def generar_recomendaciones(self, categoria, horas_vuelo):
-        """Generar recomendaciones de mantenimiento"""
-        recomendaciones = []
-        
-        if categoria == "Liviana":
-            if horas_vuelo > 500:
-                recomendaciones.append("Revisar sistema de combustible")
-                recomendaciones.append("Inspección de hélice")
-            if horas_vuelo > 1000:
-                recomendaciones.append("Overhaul del motor")
-        
-        elif categoria == "Mediana":
-            if horas_vuelo > 1000:
-                recomendaciones.append("Inspección de sistemas hidráulicos")
-                recomendaciones.append("Revisión de aviónica")
-            if horas_vuelo > 2000:
-                recomendaciones.append("Mantenimiento mayor de motores")
-        
-        else:  # Pesada
-            if horas_vuelo > 2000:
-                recomendaciones.append("Inspección estructural completa")
-                recomendaciones.append("Revisión de sistemas de navegación")
-            if horas_vuelo > 4000:
-                recomendaciones.append("Overhaul completo requerido")
-        
-        if not recomendaciones:
-            recomendaciones.append("Mantenimiento preventivo estándar")
-        
-        return recomendaciones
-    
-    def guardar_modelo(self):
-        """Guardar modelo entrenado"""
-        try:
-            fecha = datetime.now().strftime("%Y%m%d_%H%M")
-            
-            # Guardar modelo principal
-            joblib.dump(self.modelo, f'modelos_ia/modelo_aeronaves_{fecha}.pkl')
-            
-            # Guardar scaler y encoders
-            joblib.dump(self.scaler, f'modelos_ia/scaler_{fecha}.pkl')
-            joblib.dump(self.label_encoder_categoria, f'modelos_ia/encoder_categoria_{fecha}.pkl')
-            joblib.dump(self.label_encoder_fabricante, f'modelos_ia/encoder_fabricante_{fecha}.pkl')
-            
-            # Guardar modelo actual (sobrescribir)
-            joblib.dump(self.modelo, 'modelos_ia/modelo_actual.pkl')
-            joblib.dump(self.scaler, 'modelos_ia/scaler_actual.pkl')
-            joblib.dump(self.label_encoder_categoria, 'modelos_ia/encoder_categoria_actual.pkl')
-            joblib.dump(self.label_encoder_fabricante, 'modelos_ia/encoder_fabricante_actual.pkl')
-            
-        except Exception as e:
-            print(f"Error al guardar modelo: {e}")
-    
-    def cargar_modelo(self):
-        """Cargar modelo previamente entrenado"""
-        try:
-            if os.path.exists('modelos_ia/modelo_actual.pkl'):
-                self.modelo = joblib.load('modelos_ia/modelo_actual.pkl')
-                self.scaler = joblib.load('modelos_ia/scaler_actual.pkl')
-                self.label_encoder_categoria = joblib.load('modelos_ia/encoder_categoria_actual.pkl')
-                self.label_encoder_fabricante = joblib.load('modelos_ia/encoder_fabricante_actual.pkl')
-                self.fabricantes_conocidos = list(self.label_encoder_fabricante.classes_)
-                self.modelo_entrenado = True
-                return True
-            else:
-                return False
-        except Exception as e:
-            print(f"Error al cargar modelo: {e}")
-            return False
 
 class VentanaIAAeronaves(tk.Toplevel):
     def __init__(self, parent):
@@ -331,7 +38,9 @@ class VentanaIAAeronaves(tk.Toplevel):
         self.geometry("900x700")
         self.configure(bg='#ecf0f1')
         
-        self.ia_sistema = SistemaIAAeronaves(parent)
+        # El mismo sistema que usa el resto de la aplicación para predecir
+        self.ia_sistema = parent.ia_sistema
+        self.tarea_entrenamiento = None
         
         # Variables
         self.var_peso = tk.StringVar()
@@ -340,8 +49,15 @@ class VentanaIAAeronaves(tk.Toplevel):
         
         self.crear_interfaz()
         
-        # Intentar cargar modelo existente
-        if self.ia_sistema.cargar_modelo():
+        # Intentar cargar modelo existente (en segundo plano) si aún no está cargado
+        if self.ia_sistema.modelo_entrenado:
+            self._modelo_cargado(True)
+        else:
+            self.parent.tareas.enviar(self.ia_sistema.cargar_para_prediccion,
+                                      al_terminar=self._modelo_cargado)
+    
+    def _modelo_cargado(self, cargado):
+        if cargado and not self.tarea_entrenamiento:
             self.lbl_estado.config(text="✅ Modelo cargado", fg="#2ecc71")
     
     def crear_interfaz(self):
@@ -396,14 +112,31 @@ class VentanaIAAeronaves(tk.Toplevel):
         tk.Label(parent, text=info_text, font=('Arial', 11), 
                 bg='#ecf0f1', fg='#2c3e50', justify='left').pack(pady=20)
         
-        # Botón de entrenamiento
-        tk.Button(parent, text="🚀 Entrenar Modelo de IA", 
+        # Botones de entrenamiento
+        botones_frame = tk.Frame(parent, bg='#ecf0f1')
+        botones_frame.pack(pady=20)
+        
+        tk.Button(botones_frame, text="🚀 Entrenar Modelo de IA", 
                  command=self.entrenar_modelo,
                  bg='#3498db', fg='white', font=('Arial', 14, 'bold'),
-                 width=25, height=2).pack(pady=20)
+                 width=25, height=2).pack(side='left', padx=10)
+        self.btn_cancelar = tk.Button(botones_frame, text="Cancelar", 
+                                     command=self.cancelar_entrenamiento, state='disabled',
+                                     bg='#e74c3c', fg='white', font=('Arial', 12), height=2)
+        self.btn_cancelar.pack(side='left', padx=10)
+        
+        acciones_frame = tk.Frame(parent, bg='#ecf0f1')
+        acciones_frame.pack(pady=5)
+        
+        tk.Button(acciones_frame, text="➕ Añadir 25 árboles", 
+                 command=self.ampliar_modelo,
+                 bg='#16a085', fg='white', font=('Arial', 12)).pack(side='left', padx=10)
+        tk.Button(acciones_frame, text="🔁 Reclasificar toda la flota", 
+                 command=self.reclasificar_flota,
+                 bg='#9b59b6', fg='white', font=('Arial', 12)).pack(side='left', padx=10)
         
         # Progreso
-        self.progress = ttk.Progressbar(parent, mode='indeterminate')
+        self.progress = ttk.Progressbar(parent, mode='determinate', maximum=1.0)
         self.progress.pack(pady=10, padx=50, fill='x')
     
     def crear_tab_prediccion(self, parent):
@@ -443,39 +176,108 @@ class VentanaIAAeronaves(tk.Toplevel):
         
         tk.Label(select_frame, text="Seleccionar Aeronave:", bg='#ecf0f1').pack()
         
-        aeronaves = self.parent.db.obtener_aeronaves()
-        aeronave_values = [f"{a[0]}|{a[1]} - {a[2]}" for a in aeronaves]
-        
-        self.combo_aeronave = ttk.Combobox(select_frame, values=aeronave_values, width=40)
+        self.combo_aeronave = ttk.Combobox(select_frame, width=40)
         self.combo_aeronave.pack(pady=10)
+        self.parent.tareas.enviar(
+            self.parent.db.obtener_aeronaves,
+            al_terminar=lambda aeronaves: self.combo_aeronave.config(
+                values=[f"{a[0]}|{a[1]} - {a[2]}" for a in aeronaves]))
         
         tk.Button(select_frame, text="📊 Analizar", 
                  command=self.analizar_mantenimiento,
                  bg='#f39c12', fg='white', font=('Arial', 12)).pack(pady=10)
+        tk.Button(select_frame, text="📋 Priorizar toda la flota", 
+                 command=self.priorizar_flota,
+                 bg='#8e44ad', fg='white', font=('Arial', 12)).pack(pady=5)
         
         # Frame para resultados del análisis
         self.analisis_frame = tk.Frame(parent, bg='#ecf0f1')
         self.analisis_frame.pack(fill='both', expand=True, pady=20)
     
     def entrenar_modelo(self):
-        """Entrenar el modelo de IA"""
-        self.progress.start()
-        self.lbl_estado.config(text="🔄 Entrenando modelo...", fg="#f39c12")
-        self.update()
-        
-        # Entrenar en hilo separado (simulado con after)
-        self.after(100, self._entrenar_async)
+        """Entrenar el modelo de IA en segundo plano"""
+        self._iniciar_entrenamiento(
+            lambda tarea: self.ia_sistema.ejecutar_entrenamiento(progreso=tarea.reportar_progreso))
+    
+    def ampliar_modelo(self):
+        """Añadir árboles al modelo actual con los datos vigentes (warm start)"""
+        self._iniciar_entrenamiento(
+            lambda tarea: self.ia_sistema.ampliar_modelo(25, progreso=tarea.reportar_progreso))
     
-    def _entrenar_async(self):
-        """Función asíncrona para entrenamiento"""
-        success = self.ia_sistema.entrenar_modelo()
+    def _iniciar_entrenamiento(self, trabajo):
+        if self.tarea_entrenamiento is not None:
+            return
         
-        self.progress.stop()
+        self.progress['value'] = 0
+        self.lbl_estado.config(text="🔄 Entrenando modelo...", fg="#f39c12")
+        self.btn_cancelar.config(state='normal')
+        
+        self.tarea_entrenamiento = self.parent.tareas.enviar(
+            trabajo,
+            con_progreso=True,
+            al_progreso=self._progreso_entrenamiento,
+            al_terminar=self._entrenamiento_terminado,
+            al_error=self._entrenamiento_fallido
+        )
+    
+    def cancelar_entrenamiento(self):
+        """Cancelar el entrenamiento en curso (se descarta el modelo parcial)"""
+        if self.tarea_entrenamiento is None:
+            return
+        self.tarea_entrenamiento.cancelar()
+        self._fin_entrenamiento()
+        self.lbl_estado.config(text="⏹ Entrenamiento cancelado", fg="#7f8c8d")
+    
+    def _progreso_entrenamiento(self, fraccion, mensaje):
+        self.progress['value'] = fraccion
+        self.lbl_estado.config(text=f"🔄 {mensaje}...", fg="#f39c12")
+    
+    def _fin_entrenamiento(self):
+        self.tarea_entrenamiento = None
+        self.btn_cancelar.config(state='disabled')
+    
+    def _entrenamiento_terminado(self, resultado):
+        self._fin_entrenamiento()
+        self.progress['value'] = 1.0
+        self.lbl_estado.config(text="✅ Modelo entrenado exitosamente", fg="#2ecc71")
+        por_clase = "".join(f"  {clase}: precisión {r['precision']:.0%}, sensibilidad {r['recall']:.0%}\n"
+                            for clase, r in resultado['reporte_clases'].items())
+        messagebox.showinfo("Éxito", 
+                          f"Modelo entrenado exitosamente!\n"
+                          f"Precisión: {resultado['precision']:.2%}\n"
+                          f"{por_clase}"
+                          f"Datos de entrenamiento: {resultado['total_datos']} aeronaves\n"
+                          f"Árboles: {resultado['arboles']}\n"
+                          f"Tiempo de ajuste: {resultado['tiempo_ajuste_s']:.2f} s\n"
+                          f"Tamaño del bosque: {resultado['tamano_modelo_mb']:.2f} MB",
+                          parent=self)
+    
+    def _entrenamiento_fallido(self, error):
+        self._fin_entrenamiento()
+        self.progress['value'] = 0
+        self.lbl_estado.config(text="❌ Error en entrenamiento", fg="#e74c3c")
+        messagebox.showerror("Error", f"Error al entrenar modelo: {str(error)}", parent=self)
+    
+    def reclasificar_flota(self):
+        """Reclasificar todas las aeronaves con el modelo actual"""
+        if not messagebox.askyesno("Reclasificar flota",
+                                   "¿Reemplazar la categoría de todas las aeronaves "
+                                   "por la predicha por el modelo de IA?", parent=self):
+            return
         
-        if success:
-            self.lbl_estado.config(text="✅ Modelo entrenado exitosamente", fg="#2ecc71")
-        else:
-            self.lbl_estado.config(text="❌ Error en entrenamiento", fg="#e74c3c")
+        self.lbl_estado.config(text="🔄 Reclasificando flota...", fg="#f39c12")
+        self.parent.tareas.enviar(
+            self.ia_sistema.reclasificar_flota,
+            al_terminar=self._flota_reclasificada,
+            al_error=lambda error: messagebox.showerror(
+                "Error", f"Error al reclasificar: {error}", parent=self)
+        )
+    
+    def _flota_reclasificada(self, resultado):
+        self.lbl_estado.config(text="✅ Flota reclasificada", fg="#2ecc71")
+        messagebox.showinfo("Reclasificar flota",
+                          f"Aeronaves analizadas: {resultado['total']}\n"
+                          f"Categorías actualizadas: {resultado['cambios']}", parent=self)
     
     def hacer_prediccion(self):
         """Realizar predicción con IA"""
@@ -483,45 +285,91 @@ class VentanaIAAeronaves(tk.Toplevel):
             peso = float(self.var_peso.get())
             horas = float(self.var_horas.get())
             ano = int(self.var_ano.get()) if self.var_ano.get() else 2020
-            
-            categoria, confianza = self.ia_sistema.predecir_categoria(peso, horas, ano)
-            
-            if categoria:
-                # Limpiar resultados anteriores
-                for widget in self.resultado_frame.winfo_children():
-                    widget.destroy()
-                
-                # Mostrar resultado
-                resultado_title = tk.Label(self.resultado_frame, text="🎯 Resultado de la Predicción", 
-                                         font=('Arial', 14, 'bold'), bg='#ecf0f1')
-                resultado_title.pack(pady=10)
-                
-                # Categoría predicha
-                color_categoria = {"Liviana": "#3498db", "Mediana": "#f39c12", "Pesada": "#e74c3c"}
-                categoria_label = tk.Label(self.resultado_frame, 
-                                         text=f"Categoría: {categoria}", 
-                                         font=('Arial', 16, 'bold'),
-                                         bg=color_categoria.get(categoria, "#95a5a6"),
-                                         fg='white')
-                categoria_label.pack(pady=5)
-                
-                # Confianza
-                confianza_label = tk.Label(self.resultado_frame, 
-                                         text=f"Confianza: {confianza:.1%}", 
-                                         font=('Arial', 12), bg='#ecf0f1')
-                confianza_label.pack(pady=5)
-                
-                # Sugerencias de fabricante
-                fabricantes_sugeridos = self.ia_sistema.sugerir_fabricante(peso, categoria)
-                sugerencias_text = "Fabricantes sugeridos: " + ", ".join(fabricantes_sugeridos)
-                tk.Label(self.resultado_frame, text=sugerencias_text, 
-                        font=('Arial', 11), bg='#ecf0f1', fg='#7f8c8d').pack(pady=5)
-                
-            else:
-                messagebox.showerror("Error", "No se pudo realizar la predicción")
-                
         except ValueError:
             messagebox.showerror("Error", "Por favor ingresa valores numéricos válidos")
+            return
+        
+        self.parent.tareas.enviar(
+            self.ia_sistema.predecir_categoria, peso, horas, ano,
+            al_terminar=lambda resultado: self._mostrar_prediccion(peso, *resultado)
+        )
+    
+    def _mostrar_prediccion(self, peso, categoria, confianza):
+        """Mostrar el resultado de la predicción"""
+        if categoria:
+            # Limpiar resultados anteriores
+            for widget in self.resultado_frame.winfo_children():
+                widget.destroy()
+            
+            # Mostrar resultado
+            resultado_title = tk.Label(self.resultado_frame, text="🎯 Resultado de la Predicción", 
+                                     font=('Arial', 14, 'bold'), bg='#ecf0f1')
+            resultado_title.pack(pady=10)
+            
+            # Categoría predicha
+            color_categoria = {"Liviana": "#3498db", "Mediana": "#f39c12", "Pesada": "#e74c3c"}
+            categoria_label = tk.Label(self.resultado_frame, 
+                                     text=f"Categoría: {categoria}", 
+                                     font=('Arial', 16, 'bold'),
+                                     bg=color_categoria.get(categoria, "#95a5a6"),
+                                     fg='white')
+            categoria_label.pack(pady=5)
+            
+            # Confianza
+            confianza_label = tk.Label(self.resultado_frame, 
+                                     text=f"Confianza: {confianza:.1%}", 
+                                     font=('Arial', 12), bg='#ecf0f1')
+            confianza_label.pack(pady=5)
+            
+            # Sugerencias de fabricante
+            fabricantes_sugeridos = self.ia_sistema.sugerir_fabricante(peso, categoria)
+            sugerencias_text = "Fabricantes sugeridos: " + ", ".join(fabricantes_sugeridos)
+            tk.Label(self.resultado_frame, text=sugerencias_text, 
+                    font=('Arial', 11), bg='#ecf0f1', fg='#7f8c8d').pack(pady=5)
+            
+        else:
+            messagebox.showerror("Error", "No se pudo realizar la predicción", parent=self)
+    
+    def priorizar_flota(self):
+        """Mostrar las aeronaves ordenadas por urgencia de mantenimiento"""
+        for widget in self.analisis_frame.winfo_children():
+            widget.destroy()
+        tk.Label(self.analisis_frame, text="🔄 Analizando la flota...", 
+                font=('Arial', 12), bg='#ecf0f1').pack(pady=10)
+        self.parent.tareas.enviar(
+            self.ia_sistema.priorizar_mantenimiento_flota, 500,
+            al_terminar=self._mostrar_prioridades,
+            al_error=lambda error: messagebox.showerror(
+                "Error", f"Error en análisis: {error}", parent=self)
+        )
+    
+    def _mostrar_prioridades(self, prioridades):
+        for widget in self.analisis_frame.winfo_children():
+            widget.destroy()
+        
+        tk.Label(self.analisis_frame, text="📋 Prioridad de Mantenimiento de la Flota", 
+                font=('Arial', 14, 'bold'), bg='#ecf0f1').pack(pady=10)
+        
+        columnas = ("Matrícula", "Modelo", "Categoría", "Horas Vuelo", 
+                    "Horas Restantes", "Urgencia", "Costo Estimado")
+        tabla_frame = tk.Frame(self.analisis_frame)
+        tabla_frame.pack(fill='both', expand=True, padx=20)
+        tree = ttk.Treeview(tabla_frame, columns=columnas, show='headings')
+        for col in columnas:
+            tree.heading(col, text=col)
+            tree.column(col, width=110, anchor='center')
+        for _, urgencia, color in NIVELES_URGENCIA:
+            tree.tag_configure(urgencia, foreground=color)
+        
+        for _, matricula, modelo, categoria, horas, restantes, urgencia, costo in prioridades:
+            tree.insert('', 'end', tags=(urgencia,), values=(
+                matricula, modelo, categoria, f"{horas:,.1f} h", f"{restantes:.1f} h",
+                urgencia, f"Bs {costo:,.2f}"))
+        
+        scrollbar = ttk.Scrollbar(tabla_frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side='left', fill='both', expand=True)
+        scrollbar.pack(side='right', fill='y')
     
     def analizar_mantenimiento(self):
         """Realizar análisis predictivo de mantenimiento"""
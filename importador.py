@@ -0,0 +1,222 @@
+# importador.py - Importación masiva de flota desde CSV o JSON Lines
+import csv
+import json
+import math
+import os
+import sqlite3
+import time
+from datetime import datetime
+from categorias import categorizar_aeronave
+
+CAMPOS_OBLIGATORIOS = ("matricula", "modelo", "fabricante", "peso_mtow")
+FORMATOS_POR_EXTENSION = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "jsonl"}
+
+class ErrorValidacion(ValueError):
+    """Fila del archivo que no puede registrarse"""
+
+class ResultadoImportacion:
+    """Totales de una importación y detalle de las filas rechazadas"""
+
+    def __init__(self, max_rechazos=1000):
+        self.leidas = 0
+        self.insertadas = 0
+        self.total_rechazos = 0
+        self.rechazos = []            # (línea, matrícula, motivo), hasta max_rechazos
+        self.max_rechazos = max_rechazos
+        self.segundos = 0.0
+        self.completa = False
+
+    def rechazar(self, linea, matricula, motivo):
+        self.total_rechazos += 1
+        if len(self.rechazos) < self.max_rechazos:
+            self.rechazos.append((linea, matricula, motivo))
+
+    @property
+    def filas_por_segundo(self):
+        return self.leidas / self.segundos if self.segundos else 0.0
+
+    def resumen(self):
+        return (f"Filas leídas: {self.leidas:,}\n"
+                f"Aeronaves registradas: {self.insertadas:,}\n"
+                f"Filas rechazadas: {self.total_rechazos:,}\n"
+                f"Tiempo: {self.segundos:.2f} s ({self.filas_por_segundo:,.0f} filas/s)")
+
+def leer_csv(archivo):
+    """Generar (línea, registro) desde un CSV con encabezados"""
+    lector = csv.DictReader(archivo)
+    for registro in lector:
+        yield lector.line_num, registro
+
+def leer_jsonl(archivo):
+    """Generar (línea, registro) desde un archivo con un objeto JSON por línea.
+
+    Un .json con un arreglo o un objeto repartido en varias líneas no es JSON
+    Lines: se detiene la importación en lugar de rechazar cada línea.
+    """
+    primera = True
+    for linea, texto in enumerate(archivo, 1):
+        if not texto.strip():
+            continue
+        if primera:
+            primera = False
+            inicio = texto.strip()
+            if inicio.startswith("[") or inicio == "{":
+                raise ValueError("El archivo es JSON con formato de arreglo o en varias líneas; "
+                                 "use JSON Lines (un objeto JSON por línea)")
+        try:
+            registro = json.loads(texto)
+        except json.JSONDecodeError as e:
+            yield linea, ErrorValidacion(f"JSON inválido: {e.msg}")
+            continue
+        if not isinstance(registro, dict):
+            registro = ErrorValidacion("Se esperaba un objeto JSON")
+        yield linea, registro
+
+LECTORES = {"csv": leer_csv, "jsonl": leer_jsonl}
+
+class ImportadorAeronaves:
+    """Carga masiva de aeronaves en lotes, con memoria constante.
+
+    El archivo se recorre con un generador; las filas válidas se acumulan en
+    lotes de tamano_lote que se insertan con executemany en una transacción
+    por lote. Las matrículas duplicadas (en la base o dentro del lote) se
+    rechazan fila por fila sin detener la importación.
+    """
+
+    def __init__(self, db, tamano_lote=1000):
+        self.db = db
+        self.tamano_lote = tamano_lote
+
+    def importar(self, ruta, formato=None, progreso=None):
+        """Importar el archivo y devolver un ResultadoImportacion.
+
+        progreso(fraccion, mensaje) se llama tras cada lote; si lanza una
+        excepción (p. ej. TareaCancelada) la importación se detiene y los
+        lotes ya confirmados se conservan.
+        """
+        formato = formato or FORMATOS_POR_EXTENSION.get(os.path.splitext(ruta)[1].lower())
+        if formato not in LECTORES:
+            raise ValueError(f"Formato de importación no soportado: {ruta}")
+
+        hangares = self.db.obtener_hangares()
+        self._hangares_por_nombre = {h[1].lower(): h[0] for h in hangares}
+        self._hangares_ids = {h[0] for h in hangares}
+        self._fecha = datetime.now().strftime("%Y-%m-%d")
+
+        resultado = ResultadoImportacion()
+        tamano_archivo = os.path.getsize(ruta) or 1
+        inicio = time.perf_counter()
+
+        with open(ruta, newline="", encoding="utf-8-sig") as archivo:
+            lote = []
+            for linea, registro in LECTORES[formato](archivo):
+                resultado.leidas += 1
+                try:
+                    lote.append((linea, self.validar(registro)))
+                except ErrorValidacion as e:
+                    resultado.rechazar(linea, self._matricula(registro), str(e))
+                    continue
+
+                if len(lote) >= self.tamano_lote:
+                    self._cargar_lote(lote, resultado)
+                    lote = []
+                    resultado.segundos = time.perf_counter() - inicio
+                    if progreso is not None:
+                        progreso(min(1.0, archivo.buffer.tell() / tamano_archivo),
+                                 f"{resultado.leidas:,} filas ({resultado.filas_por_segundo:,.0f}/s)")
+            if lote:
+                self._cargar_lote(lote, resultado)
+
+        resultado.segundos = time.perf_counter() - inicio
+        resultado.completa = True
+        if progreso is not None:
+            progreso(1.0, f"{resultado.leidas:,} filas ({resultado.filas_por_segundo:,.0f}/s)")
+        return resultado
+
+    def validar(self, registro):
+        """Convertir un registro del archivo en la tupla a insertar"""
+        if isinstance(registro, Exception):
+            raise registro
+        registro = {str(k).strip().lower(): v for k, v in registro.items() if k is not None}
+
+        valores = {}
+        for campo in CAMPOS_OBLIGATORIOS:
+            valor = registro.get(campo)
+            valor = str(valor).strip() if valor is not None else ""
+            if not valor:
+                raise ErrorValidacion(f"Falta el campo '{campo}'")
+            valores[campo] = valor
+
+        peso_mtow = self._numero(valores["peso_mtow"], "peso_mtow")
+        if peso_mtow <= 0:
+            raise ErrorValidacion("peso_mtow debe ser mayor que cero")
+
+        horas = registro.get("horas_vuelo")
+        horas_vuelo = self._numero(horas, "horas_vuelo") if str(horas or "").strip() else 0.0
+        if horas_vuelo < 0:
+            raise ErrorValidacion("horas_vuelo no puede ser negativo")
+
+        return (valores["matricula"], valores["modelo"], valores["fabricante"], peso_mtow,
+                categorizar_aeronave(peso_mtow), horas_vuelo, self._hangar(registro), self._fecha)
+
+    def _numero(self, valor, campo):
+        try:
+            numero = float(valor)
+        except (TypeError, ValueError):
+            raise ErrorValidacion(f"{campo} no es un número válido: {valor!r}")
+        if not math.isfinite(numero):
+            # float() acepta "nan" e "inf"; SQLite guardaría NaN como NULL
+            raise ErrorValidacion(f"{campo} no es un número válido: {valor!r}")
+        return numero
+
+    def _hangar(self, registro):
+        """Resolver el hangar por id o por nombre ('Hangar A' o 'Hangar A - El Alto')"""
+        hangar_id = str(registro.get("hangar_id") or "").strip()
+        if hangar_id:
+            try:
+                hangar_id = int(float(hangar_id))
+            except ValueError:
+                raise ErrorValidacion(f"hangar_id no válido: {hangar_id!r}")
+            if hangar_id not in self._hangares_ids:
+                raise ErrorValidacion(f"No existe el hangar con id {hangar_id}")
+            return hangar_id
+
+        nombre = str(registro.get("hangar") or "").strip()
+        if not nombre:
+            return None
+        hangar_id = self._hangares_por_nombre.get(nombre.split(" - ")[0].strip().lower())
+        if hangar_id is None:
+            raise ErrorValidacion(f"Hangar no válido: {nombre}")
+        return hangar_id
+
+    def _matricula(self, registro):
+        if isinstance(registro, dict):
+            for clave, valor in registro.items():
+                if str(clave).strip().lower() == "matricula":
+                    return str(valor or "").strip()
+        return ""
+
+    def _cargar_lote(self, lote, resultado):
+        """Insertar un lote rechazando matrículas repetidas o ya registradas"""
+        existentes = self.db.matriculas_existentes({fila[0] for _, fila in lote})
+        filas = []
+        for linea, fila in lote:
+            if fila[0] in existentes:
+                resultado.rechazar(linea, fila[0], "Matrícula ya existe en el sistema")
+                continue
+            existentes.add(fila[0])
+            filas.append((linea, fila))
+
+        try:
+            resultado.insertadas += self.db.insertar_aeronaves_lote([fila for _, fila in filas])
+        except sqlite3.IntegrityError:
+            # Otra conexión registró alguna matrícula entre la verificación y la carga
+            with self.db.conexion():
+                for linea, fila in filas:
+                    try:
+                        resultado.insertadas += self.db.insertar_aeronaves_lote([fila])
+                    except sqlite3.IntegrityError as e:
+                        if "UNIQUE" in str(e):
+                            resultado.rechazar(linea, fila[0], "Matrícula ya existe en el sistema")
+                        else:
+                            resultado.rechazar(linea, fila[0], f"No se pudo registrar: {e}")
@@ -1,14 +1,23 @@
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 from database import DatabaseManager
-from ventana_aeronaves import VentanaRegistroAeronave, VentanaListaAeronaves
-from ventana_mantenimiento import VentanaProgramarMantenimiento, VentanaHistorialTecnico, VentanaAlertas
+from ventana_aeronaves import VentanaRegistroAeronave, VentanaListaAeronaves, VentanaImportarFlota, VentanaRegistroVuelos
+from ventana_mantenimiento import VentanaProgramarMantenimiento, VentanaHistorialTecnico, VentanaAlertas, VentanaPlanificador
 from ventana_gestion import VentanaGestionHangares, VentanaGestionTecnicos, VentanaInventarioPiezas
-from ventana_reportes import VentanaEstadisticas, VentanaReporteCostos
-from ia_aeronaves import VentanaIAAeronaves, SistemaIAAeronaves
+from tareas import EjecutorTareas
+from carga_diferida import ModuloDiferido, precalentar
+from categorias import categorizar_aeronave
+
+# Módulos pesados (numpy, sklearn, joblib, matplotlib): se importan en el primer uso
+ia_aeronaves = ModuloDiferido('ia_aeronaves')
+ventana_reportes = ModuloDiferido('ventana_reportes')
 
 class SGMA(tk.Tk):
-    def __init__(self):
+    # Cada cuánto se consolidan los vuelos nuevos en los resúmenes de utilización
+    INTERVALO_CONSOLIDACION_MS = 5 * 60 * 1000
+    
+    def __init__(self, precargar_modulos=True):
         super().__init__()
         self.title("Sistema de Gestión de Mantenimiento de Aeronaves - Bolivia by lizbeth + IA")
         self.geometry('1000x800')
@@ -17,13 +26,36 @@ class SGMA(tk.Tk):
         # Inicializar base de datos
         self.db = DatabaseManager()
         
-        # Inicializar sistema de IA
-        self.ia_sistema = SistemaIAAeronaves(self)
+        # Ejecutor compartido para trabajo en segundo plano (BD e IA)
+        self.tareas = EjecutorTareas(self)
+        
+        # Sistema de IA: se crea en el primer uso (ver propiedad ia_sistema)
+        self._ia_sistema = None
+        self._lock_ia = threading.Lock()
         
         # Crear interfaz
         self.crear_menu()
         self.crear_interfaz_principal()
         
+        # Importar IA y reportes en segundo plano una vez visible la ventana
+        if precargar_modulos:
+            self.after(500, lambda: precalentar(ia_aeronaves, ventana_reportes))
+        
+        # Mantener al día los resúmenes de horas de vuelo
+        self.after(self.INTERVALO_CONSOLIDACION_MS, self.consolidar_vuelos)
+        
+        # Liberar conexiones de la base de datos al cerrar
+        self.protocol("WM_DELETE_WINDOW", self.cerrar_aplicacion)
+        
+    @property
+    def ia_sistema(self):
+        """Sistema de IA compartido, creado en el primer uso"""
+        if self._ia_sistema is None:
+            with self._lock_ia:
+                if self._ia_sistema is None:
+                    self._ia_sistema = ia_aeronaves.SistemaIAAeronaves(self)
+        return self._ia_sistema
+    
     def crear_menu(self):
         """Crear barra de menú principal"""
         self.barra_menu = tk.Menu(self)
@@ -33,6 +65,8 @@ class SGMA(tk.Tk):
         self.barra_menu.add_cascade(label='Aeronaves', menu=menu_aeronaves)
         menu_aeronaves.add_command(label='Registrar Aeronave', command=self.abrir_registro_aeronave)
         menu_aeronaves.add_command(label='Lista de Aeronaves', command=self.abrir_lista_aeronaves)
+        menu_aeronaves.add_command(label='Importar Flota (CSV/JSON)', command=self.abrir_importar_flota)
+        menu_aeronaves.add_command(label='Registro de Vuelos', command=self.abrir_registro_vuelos)
         menu_aeronaves.add_separator()
         menu_aeronaves.add_command(label='Categorías por Peso', command=self.mostrar_categorias)
         
@@ -42,6 +76,7 @@ class SGMA(tk.Tk):
         menu_mantenimiento.add_command(label='Programar Mantenimiento', command=self.abrir_programar_mantenimiento)
         menu_mantenimiento.add_command(label='Historial Técnico', command=self.abrir_historial_tecnico)
         menu_mantenimiento.add_command(label='Alertas de Revisión', command=self.abrir_alertas)
+        menu_mantenimiento.add_command(label='Planificar Mantenimientos', command=self.abrir_planificador)
         
         # Menú Gestión
         menu_gestion = tk.Menu(self.barra_menu, tearoff=0)
@@ -92,15 +127,12 @@ class SGMA(tk.Tk):
         stats_frame.pack(pady=20)
         
         # Obtener estadísticas de la base de datos
-        total_aeronaves = len(self.db.obtener_aeronaves())
-        mantenimientos_activos = len([m for m in self.db.obtener_mantenimientos() if m[6] == 'En Proceso'])
-        total_tecnicos = len(self.db.obtener_tecnicos())
-        total_hangares = len(self.db.obtener_hangares())
+        resumen = self.db.obtener_resumen_dashboard()
         
-        self.crear_stat_box(stats_frame, "Aeronaves Registradas", str(total_aeronaves), "#3498db", 0, 0)
-        self.crear_stat_box(stats_frame, "Mantenimientos Activos", str(mantenimientos_activos), "#e74c3c", 0, 1)
-        self.crear_stat_box(stats_frame, "Técnicos Disponibles", str(total_tecnicos), "#2ecc71", 0, 2)
-        self.crear_stat_box(stats_frame, "Hangares Operativos", str(total_hangares), "#f39c12", 0, 3)
+        self.crear_stat_box(stats_frame, "Aeronaves Registradas", str(resumen['total_aeronaves']), "#3498db", 0, 0)
+        self.crear_stat_box(stats_frame, "Mantenimientos Activos", str(resumen['mantenimientos_activos']), "#e74c3c", 0, 1)
+        self.crear_stat_box(stats_frame, "Técnicos Disponibles", str(resumen['total_tecnicos']), "#2ecc71", 0, 2)
+        self.crear_stat_box(stats_frame, "Hangares Operativos", str(resumen['total_hangares']), "#f39c12", 0, 3)
         
         # Accesos rápidos
         accesos_frame = tk.Frame(main_frame, bg='#2c3e50')
@@ -134,12 +166,7 @@ class SGMA(tk.Tk):
     
     def categorizar_aeronave(self, peso_mtow):
         """Categorizar aeronave según su peso MTOW"""
-        if peso_mtow <= 5700:
-            return "Liviana"
-        elif peso_mtow <= 27000:
-            return "Mediana"
-        else:
-            return "Pesada"
+        return categorizar_aeronave(peso_mtow)
     
     def mostrar_categorias(self):
         """Mostrar información sobre categorías de aeronaves"""
@@ -167,6 +194,12 @@ class SGMA(tk.Tk):
     def abrir_lista_aeronaves(self):
         VentanaListaAeronaves(self)
     
+    def abrir_importar_flota(self):
+        VentanaImportarFlota(self)
+    
+    def abrir_registro_vuelos(self):
+        VentanaRegistroVuelos(self)
+    
     def abrir_programar_mantenimiento(self):
         VentanaProgramarMantenimiento(self)
     
@@ -176,6 +209,9 @@ class SGMA(tk.Tk):
     def abrir_alertas(self):
         VentanaAlertas(self)
     
+    def abrir_planificador(self):
+        VentanaPlanificador(self)
+    
     def abrir_gestion_hangares(self):
         VentanaGestionHangares(self)
     
@@ -186,21 +222,36 @@ class SGMA(tk.Tk):
         VentanaInventarioPiezas(self)
     
     def abrir_estadisticas(self):
-        VentanaEstadisticas(self)
+        ventana_reportes.VentanaEstadisticas(self)
     
     def abrir_reporte_costos(self):
-        VentanaReporteCostos(self)
+        ventana_reportes.VentanaReporteCostos(self)
     
     def abrir_ia_aeronaves(self):
-        VentanaIAAeronaves(self)
+        ia_aeronaves.VentanaIAAeronaves(self)
     
     def entrenar_modelo_ia(self):
-        """Entrenar el modelo de IA y mostrar resultados"""
-        resultado = self.ia_sistema.entrenar_modelo()
-        if resultado:
-            messagebox.showinfo("Entrenamiento IA", "Modelo de IA entrenado exitosamente")
-        else:
-            messagebox.showerror("Entrenamiento IA", "Error al entrenar el modelo de IA")
+        """Entrenar el modelo de IA en segundo plano y mostrar resultados"""
+        self.tareas.enviar(
+            self.ia_sistema.ejecutar_entrenamiento,
+            al_terminar=lambda resultado: messagebox.showinfo(
+                "Entrenamiento IA",
+                f"Modelo de IA entrenado exitosamente\n"
+                f"Precisión: {resultado['precision']:.2%}"),
+            al_error=lambda error: messagebox.showerror(
+                "Entrenamiento IA", f"Error al entrenar el modelo de IA: {error}")
+        )
+
+    def consolidar_vuelos(self):
+        """Sumar los vuelos nuevos a los resúmenes diarios y mensuales"""
+        self.tareas.enviar(self.db.consolidar_registros_vuelo)
+        self.after(self.INTERVALO_CONSOLIDACION_MS, self.consolidar_vuelos)
+    
+    def cerrar_aplicacion(self):
+        """Cerrar la aplicación liberando recursos"""
+        self.tareas.cerrar()
+        self.db.cerrar_conexion()
+        self.destroy()
 
 if __name__ == "__main__":
     app = SGMA()
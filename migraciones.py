@@ -0,0 +1,275 @@
+# migraciones.py - Migraciones versionadas del esquema de la base de datos
+#
+# La versión del esquema se guarda en PRAGMA user_version. Cada migración se
+# aplica una sola vez, en orden y dentro de su propia transacción, de modo que
+# una base existente (sgma_aeronaves.db) se actualiza en el lugar al abrirla.
+from categorias import INTERVALOS_MANTENIMIENTO
+
+
+def limite_horas_sql(aeronave):
+    """Expresión SQL del umbral de horas aplicable a una fila de aeronaves.
+
+    Un umbral por modelo tiene prioridad sobre el de su categoría (modelo = '').
+    aeronave es el alias de la fila: 'NEW' dentro de un trigger o 'a' en un SELECT.
+    """
+    return f"""COALESCE(
+        (SELECT horas_limite FROM umbrales_mantenimiento
+          WHERE categoria = {aeronave}.categoria AND modelo = {aeronave}.modelo),
+        (SELECT horas_limite FROM umbrales_mantenimiento
+          WHERE categoria = {aeronave}.categoria AND modelo = ''))"""
+
+
+def _sentencias_motor_alertas():
+    """Tablas y triggers que mantienen materializada la tabla de alertas.
+
+    alertas_mantenimiento guarda una fila por aeronave que tiene o tuvo una
+    alerta; activa = 0 es una lápida (la alerta se resolvió o la aeronave se
+    eliminó). Cada cambio toma un número nuevo de alertas_version, de modo que
+    un cliente puede pedir sólo lo cambiado desde la última versión que vio.
+    """
+    limite_new = limite_horas_sql("NEW")
+    upsert_new = f"""
+            UPDATE alertas_version SET version = version + 1;
+            INSERT INTO alertas_mantenimiento (aeronave_id, horas_limite, horas_vuelo, activa, version)
+            VALUES (NEW.id, {limite_new}, NEW.horas_vuelo,
+                    COALESCE(NEW.horas_vuelo > {limite_new}, 0),
+                    (SELECT version FROM alertas_version))
+            ON CONFLICT (aeronave_id) DO UPDATE SET
+                horas_limite = excluded.horas_limite,
+                horas_vuelo = excluded.horas_vuelo,
+                activa = excluded.activa,
+                version = excluded.version;"""
+    # Sólo se escribe si la aeronave entra en alerta o ya tenía una activa
+    afecta_alertas = f"""(COALESCE(NEW.horas_vuelo > {limite_new}, 0)
+              OR EXISTS (SELECT 1 FROM alertas_mantenimiento
+                          WHERE aeronave_id = NEW.id AND activa = 1))"""
+    defaults = ", ".join(f"('{categoria}', '', {horas})"
+                         for categoria, horas in INTERVALOS_MANTENIMIENTO.items())
+    return [
+        """CREATE TABLE IF NOT EXISTS umbrales_mantenimiento (
+               id INTEGER PRIMARY KEY AUTOINCREMENT,
+               categoria TEXT NOT NULL,
+               modelo TEXT NOT NULL DEFAULT '',
+               horas_limite REAL NOT NULL,
+               UNIQUE (categoria, modelo)
+           )""",
+        f"INSERT OR IGNORE INTO umbrales_mantenimiento (categoria, modelo, horas_limite) VALUES {defaults}",
+        """CREATE TABLE IF NOT EXISTS alertas_version (
+               id INTEGER PRIMARY KEY CHECK (id = 1),
+               version INTEGER NOT NULL
+           )""",
+        "INSERT OR IGNORE INTO alertas_version (id, version) VALUES (1, 1)",
+        """CREATE TABLE IF NOT EXISTS alertas_mantenimiento (
+               aeronave_id INTEGER PRIMARY KEY,
+               horas_limite REAL,
+               horas_vuelo REAL NOT NULL,
+               activa INTEGER NOT NULL,
+               version INTEGER NOT NULL
+           )""",
+        """CREATE INDEX IF NOT EXISTS idx_alertas_mantenimiento_version
+           ON alertas_mantenimiento (version)""",
+        # Estado inicial a partir de la flota existente
+        f"""INSERT OR IGNORE INTO alertas_mantenimiento (aeronave_id, horas_limite, horas_vuelo, activa, version)
+            SELECT a.id, {limite_horas_sql("a")}, a.horas_vuelo, 1, 1
+            FROM aeronaves a
+            WHERE a.horas_vuelo > {limite_horas_sql("a")}""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_alertas_aeronave_insertada
+            AFTER INSERT ON aeronaves
+            WHEN {afecta_alertas}
+            BEGIN{upsert_new}
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_alertas_aeronave_actualizada
+            AFTER UPDATE OF horas_vuelo, categoria, modelo ON aeronaves
+            WHEN (NEW.horas_vuelo IS NOT OLD.horas_vuelo
+                  OR NEW.categoria IS NOT OLD.categoria
+                  OR NEW.modelo IS NOT OLD.modelo)
+             AND {afecta_alertas}
+            BEGIN{upsert_new}
+            END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_alertas_aeronave_eliminada
+            AFTER DELETE ON aeronaves
+            WHEN EXISTS (SELECT 1 FROM alertas_mantenimiento
+                          WHERE aeronave_id = OLD.id AND activa = 1)
+            BEGIN
+                UPDATE alertas_version SET version = version + 1;
+                UPDATE alertas_mantenimiento
+                   SET activa = 0, version = (SELECT version FROM alertas_version)
+                 WHERE aeronave_id = OLD.id;
+            END""",
+    ]
+
+
+def _sentencias_version_costos():
+    """Contador que cambia con cada escritura que afecta los reportes de costos.
+
+    Los reportes agrupan mantenimientos por tipo, mes, aeronave, categoría y
+    hangar, por lo que también cuentan los cambios de matrícula, categoría y
+    hangar de las aeronaves y de nombre de los hangares.
+    """
+    incrementar = "BEGIN UPDATE costos_version SET version = version + 1; END"
+    return [
+        """CREATE TABLE IF NOT EXISTS costos_version (
+               id INTEGER PRIMARY KEY CHECK (id = 1),
+               version INTEGER NOT NULL
+           )""",
+        "INSERT OR IGNORE INTO costos_version (id, version) VALUES (1, 0)",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_costos_mantenimiento_insert
+            AFTER INSERT ON mantenimientos {incrementar}""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_costos_mantenimiento_update
+            AFTER UPDATE OF tipo, fecha_programada, estado, costo, aeronave_id, hangar_id
+            ON mantenimientos {incrementar}""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_costos_mantenimiento_delete
+            AFTER DELETE ON mantenimientos {incrementar}""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_costos_aeronave_update
+            AFTER UPDATE OF matricula, categoria, hangar_id ON aeronaves {incrementar}""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_costos_hangar_update
+            AFTER UPDATE OF nombre ON hangares {incrementar}""",
+    ]
+
+
+def _sentencias_resumenes_por_hangar():
+    """Hangar de cada vuelo y resúmenes separados por hangar.
+
+    El hangar se fija al anexar el vuelo, de modo que mover una aeronave no
+    reasigna las horas ya voladas. Los vuelos anteriores toman el hangar
+    actual de su aeronave (el único dato disponible) y los resúmenes se
+    reconstruyen desde el registro, que nunca se modifica.
+    """
+    sentencias = [
+        "ALTER TABLE registros_vuelo ADD COLUMN hangar_id INTEGER NOT NULL DEFAULT 0",
+        """UPDATE registros_vuelo SET hangar_id = COALESCE(
+               (SELECT a.hangar_id FROM aeronaves a WHERE a.id = registros_vuelo.aeronave_id), 0)""",
+    ]
+    for tabla, columna, periodo in (("resumen_vuelo_diario", "fecha", "fecha"),
+                                    ("resumen_vuelo_mensual", "mes", "substr(fecha, 1, 7)")):
+        sentencias += [
+            f"DROP TABLE IF EXISTS {tabla}",
+            f"""CREATE TABLE {tabla} (
+                   aeronave_id INTEGER NOT NULL,
+                   {columna} TEXT NOT NULL,
+                   hangar_id INTEGER NOT NULL,
+                   horas REAL NOT NULL,
+                   vuelos INTEGER NOT NULL,
+                   PRIMARY KEY (aeronave_id, {columna}, hangar_id)
+               ) WITHOUT ROWID""",
+            f"""CREATE INDEX IF NOT EXISTS idx_{tabla}_hangar
+                ON {tabla} (hangar_id, {columna})""",
+            f"""INSERT INTO {tabla} (aeronave_id, {columna}, hangar_id, horas, vuelos)
+                SELECT aeronave_id, {periodo}, hangar_id, SUM(horas), COUNT(*)
+                FROM registros_vuelo
+                GROUP BY aeronave_id, {periodo}, hangar_id""",
+        ]
+    sentencias.append("""UPDATE marcas_consolidacion
+                         SET ultimo_id = (SELECT COALESCE(MAX(id), 0) FROM registros_vuelo)
+                         WHERE nombre = 'registros_vuelo'""")
+    return sentencias
+
+
+MIGRACIONES = [
+    (1, "Índices secundarios para mantenimientos, alertas y piezas", [
+        # Historial por aeronave ordenado por fecha
+        """CREATE INDEX IF NOT EXISTS idx_mantenimientos_aeronave_fecha
+           ON mantenimientos (aeronave_id, fecha_programada)""",
+        # Historial general ORDER BY fecha_programada
+        """CREATE INDEX IF NOT EXISTS idx_mantenimientos_fecha
+           ON mantenimientos (fecha_programada)""",
+        # Conteos por estado ('En Proceso', 'Programado', ...)
+        """CREATE INDEX IF NOT EXISTS idx_mantenimientos_estado
+           ON mantenimientos (estado)""",
+        # Consulta de alertas por categoría y horas de vuelo
+        """CREATE INDEX IF NOT EXISTS idx_aeronaves_categoria_horas
+           ON aeronaves (categoria, horas_vuelo)""",
+        # Piezas usadas por mantenimiento
+        """CREATE INDEX IF NOT EXISTS idx_mantenimiento_piezas_mantenimiento
+           ON mantenimiento_piezas (mantenimiento_id)""",
+    ]),
+    (2, "Motor de alertas: umbrales configurables y alertas materializadas",
+     _sentencias_motor_alertas()),
+    (3, "Registro de vuelos y resúmenes diarios/mensuales de horas", [
+        # Sólo se agregan filas; sin índices secundarios para que anexar sea barato
+        """CREATE TABLE IF NOT EXISTS registros_vuelo (
+               id INTEGER PRIMARY KEY AUTOINCREMENT,
+               aeronave_id INTEGER NOT NULL,
+               fecha TEXT NOT NULL,
+               horas REAL NOT NULL CHECK (horas > 0),
+               origen TEXT,
+               destino TEXT,
+               FOREIGN KEY (aeronave_id) REFERENCES aeronaves (id)
+           )""",
+        # Resúmenes por aeronave; hangar_id es el hangar al consolidar (0 = sin hangar)
+        """CREATE TABLE IF NOT EXISTS resumen_vuelo_diario (
+               aeronave_id INTEGER NOT NULL,
+               fecha TEXT NOT NULL,
+               hangar_id INTEGER NOT NULL,
+               horas REAL NOT NULL,
+               vuelos INTEGER NOT NULL,
+               PRIMARY KEY (aeronave_id, fecha)
+           ) WITHOUT ROWID""",
+        """CREATE INDEX IF NOT EXISTS idx_resumen_vuelo_diario_hangar
+           ON resumen_vuelo_diario (hangar_id, fecha)""",
+        """CREATE TABLE IF NOT EXISTS resumen_vuelo_mensual (
+               aeronave_id INTEGER NOT NULL,
+               mes TEXT NOT NULL,
+               hangar_id INTEGER NOT NULL,
+               horas REAL NOT NULL,
+               vuelos INTEGER NOT NULL,
+               PRIMARY KEY (aeronave_id, mes)
+           ) WITHOUT ROWID""",
+        """CREATE INDEX IF NOT EXISTS idx_resumen_vuelo_mensual_hangar
+           ON resumen_vuelo_mensual (hangar_id, mes)""",
+        # Último registro de vuelo ya incluido en los resúmenes
+        """CREATE TABLE IF NOT EXISTS marcas_consolidacion (
+               nombre TEXT PRIMARY KEY,
+               ultimo_id INTEGER NOT NULL
+           )""",
+        "INSERT OR IGNORE INTO marcas_consolidacion (nombre, ultimo_id) VALUES ('registros_vuelo', 0)",
+    ]),
+    (4, "Hangar y duración de cada mantenimiento para detectar conflictos", [
+        "ALTER TABLE mantenimientos ADD COLUMN hangar_id INTEGER REFERENCES hangares (id)",
+        "ALTER TABLE mantenimientos ADD COLUMN duracion_dias INTEGER NOT NULL DEFAULT 1",
+        # Agenda de un técnico y de un hangar por fecha
+        """CREATE INDEX IF NOT EXISTS idx_mantenimientos_tecnico_fecha
+           ON mantenimientos (tecnico_id, fecha_programada)""",
+        """CREATE INDEX IF NOT EXISTS idx_mantenimientos_hangar_fecha
+           ON mantenimientos (hangar_id, fecha_programada)""",
+    ]),
+    (5, "Consumo de piezas fechado y tiempo de reposición por pieza", [
+        "ALTER TABLE mantenimiento_piezas ADD COLUMN fecha TEXT",
+        "ALTER TABLE piezas ADD COLUMN tiempo_entrega_dias INTEGER NOT NULL DEFAULT 7",
+        # Historial de consumo de todas las piezas por rango de fechas (cubre la consulta)
+        """CREATE INDEX IF NOT EXISTS idx_mantenimiento_piezas_fecha
+           ON mantenimiento_piezas (fecha, pieza_id, cantidad)""",
+        # Historial de una pieza
+        """CREATE INDEX IF NOT EXISTS idx_mantenimiento_piezas_pieza_fecha
+           ON mantenimiento_piezas (pieza_id, fecha)""",
+    ]),
+    (6, "Versión de los datos de costos para invalidar reportes en caché",
+     _sentencias_version_costos()),
+    (7, "Hangar de cada vuelo y resúmenes de horas por hangar",
+     _sentencias_resumenes_por_hangar()),
+]
+
+
+def version_esquema(conn):
+    """Obtener la versión actual del esquema"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def aplicar_migraciones(conn, migraciones=MIGRACIONES):
+    """Aplicar las migraciones pendientes y devolver las versiones aplicadas"""
+    aplicadas = []
+    for version, descripcion, sentencias in sorted(migraciones, key=lambda m: m[0]):
+        if version <= version_esquema(conn):
+            continue
+        conn.execute("BEGIN")
+        try:
+            for sentencia in sentencias:
+                conn.execute(sentencia)
+            # PRAGMA no admite parámetros; la versión es siempre un entero
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        aplicadas.append(version)
+    return aplicadas
@@ -0,0 +1,234 @@
+# planificador.py - Asignación de técnicos y hangares a mantenimientos pendientes
+from datetime import datetime, timedelta
+import time
+import numpy as np
+
+# Días de hangar que ocupa un mantenimiento según la categoría de la aeronave
+DURACION_POR_CATEGORIA = {
+    "Liviana": 1,
+    "Mediana": 2,
+    "Pesada": 3
+}
+
+# Especialidad del técnico que realiza la inspección por horas de cada categoría
+# (valores de tecnicos.especialidad)
+ESPECIALIDAD_POR_CATEGORIA = {
+    "Liviana": "Motores",
+    "Mediana": "Sistemas Hidráulicos",
+    "Pesada": "Estructural"
+}
+
+# Días máximos para iniciar el mantenimiento según la urgencia del análisis predictivo
+PLAZO_POR_URGENCIA = {
+    "CRÍTICA": 2,
+    "ALTA": 7,
+    "MEDIA": 14,
+    "BAJA": 30
+}
+
+class Demanda:
+    """Mantenimiento pendiente de asignar.
+
+    especialidad=None admite cualquier técnico. plazo_dias es el último día
+    (contado desde el inicio del horizonte) en que debería empezar; las
+    demandas se atienden por plazo y, a igual plazo, por prioridad (menor
+    primero).
+    """
+
+    def __init__(self, aeronave_id, tipo="Preventivo", duracion_dias=1, plazo_dias=None,
+                 especialidad=None, prioridad=0, descripcion="", costo=0):
+        self.aeronave_id = aeronave_id
+        self.tipo = tipo
+        self.duracion_dias = max(1, int(duracion_dias))
+        self.plazo_dias = plazo_dias
+        self.especialidad = especialidad
+        self.prioridad = prioridad
+        self.descripcion = descripcion
+        self.costo = costo
+
+class Asignacion:
+    """Técnico, hangar y fecha elegidos para una demanda"""
+
+    def __init__(self, demanda, tecnico_id, hangar_id, fecha, atrasada):
+        self.demanda = demanda
+        self.tecnico_id = tecnico_id
+        self.hangar_id = hangar_id
+        self.fecha = fecha
+        self.atrasada = atrasada
+
+    def fila(self):
+        """Tupla para DatabaseManager.insertar_mantenimientos_lote"""
+        d = self.demanda
+        return (d.aeronave_id, d.tipo, self.fecha, self.tecnico_id, d.descripcion, d.costo,
+                self.hangar_id, d.duracion_dias)
+
+class ResultadoPlanificacion:
+    def __init__(self):
+        self.asignaciones = []
+        self.sin_asignar = []     # (demanda, motivo)
+        self.segundos = 0.0
+
+    @property
+    def atrasadas(self):
+        return sum(1 for a in self.asignaciones if a.atrasada)
+
+    def resumen(self):
+        return (f"Asignados: {len(self.asignaciones):,} "
+                f"({self.atrasadas:,} fuera de plazo)\n"
+                f"Sin asignar: {len(self.sin_asignar):,}\n"
+                f"Tiempo: {self.segundos:.2f} s")
+
+def demandas_desde_prioridades(prioridades, urgencias=("CRÍTICA", "ALTA", "MEDIA"),
+                               especialidades=ESPECIALIDAD_POR_CATEGORIA):
+    """Convertir la lista de priorizar_mantenimiento_flota en demandas.
+
+    La especialidad requerida sale de la categoría (especialidades); una
+    categoría sin entrada admite cualquier técnico.
+    """
+    demandas = []
+    for posicion, (aeronave_id, matricula, _, categoria, _, restantes, urgencia, costo) in enumerate(prioridades):
+        if urgencia not in urgencias:
+            continue
+        demandas.append(Demanda(
+            aeronave_id,
+            duracion_dias=DURACION_POR_CATEGORIA.get(categoria, 1),
+            plazo_dias=PLAZO_POR_URGENCIA[urgencia],
+            especialidad=especialidades.get(categoria),
+            prioridad=posicion,
+            descripcion=f"Mantenimiento {urgencia.lower()} ({restantes:.1f} h restantes)",
+            costo=round(costo, 2)
+        ))
+    return demandas
+
+class PlanificadorMantenimiento:
+    """Planificador voraz por días sobre un horizonte fijo.
+
+    La agenda se indexa como matrices día a día: uso de cada hangar (contra su
+    capacidad) y días ocupados de cada técnico y aeronave. Con sumas
+    acumuladas se obtiene en un paso, para todos los días de inicio a la vez,
+    qué hangares y técnicos quedan libres durante toda la duración. Cada
+    demanda (por plazo y prioridad) toma el primer día factible, el hangar
+    con menos lugar sobrante que la admite (mejor ajuste) y el técnico de la
+    especialidad con menos carga. Un mismo avión no recibe dos mantenimientos
+    superpuestos.
+    """
+
+    def __init__(self, db, horizonte_dias=30, inicio=None):
+        self.db = db
+        self.horizonte_dias = horizonte_dias
+        self.inicio = inicio or datetime.now().strftime("%Y-%m-%d")
+
+    def _dia(self, fecha):
+        return (datetime.strptime(fecha, "%Y-%m-%d") - datetime.strptime(self.inicio, "%Y-%m-%d")).days
+
+    def _fecha(self, dia):
+        return (datetime.strptime(self.inicio, "%Y-%m-%d") + timedelta(days=int(dia))).strftime("%Y-%m-%d")
+
+    def cargar_agenda(self):
+        """Leer recursos y mantenimientos ya programados dentro del horizonte"""
+        D = self.horizonte_dias
+        hangares = self.db.obtener_hangares()
+        tecnicos = self.db.obtener_tecnicos()
+
+        self.hangar_ids = np.array([h[0] for h in hangares], dtype=np.int64)
+        self.capacidad = np.array([h[3] for h in hangares], dtype=np.int64)
+        self.uso_hangar = np.zeros((len(hangares), D), dtype=np.int64)
+
+        self.tecnico_ids = np.array([t[0] for t in tecnicos], dtype=np.int64)
+        self.especialidades = np.array([t[2] for t in tecnicos], dtype=object)
+        self.ocupado_tecnico = np.zeros((len(tecnicos), D), dtype=bool)
+
+        self.ocupado_aeronave = {}
+        fila_hangar = {h: i for i, h in enumerate(self.hangar_ids.tolist())}
+        fila_tecnico = {t: i for i, t in enumerate(self.tecnico_ids.tolist())}
+
+        for aeronave_id, tecnico_id, hangar_id, fecha, duracion in \
+                self.db.obtener_mantenimientos_activos(self.inicio, self._fecha(D)):
+            try:
+                desde = self._dia(fecha)
+            except ValueError:
+                continue
+            dias = slice(max(0, desde), max(0, min(D, desde + duracion)))
+            if hangar_id in fila_hangar:
+                self.uso_hangar[fila_hangar[hangar_id], dias] += 1
+            if tecnico_id in fila_tecnico:
+                self.ocupado_tecnico[fila_tecnico[tecnico_id], dias] = True
+            self._agenda_aeronave(aeronave_id)[dias] = True
+
+    def _agenda_aeronave(self, aeronave_id):
+        agenda = self.ocupado_aeronave.get(aeronave_id)
+        if agenda is None:
+            agenda = self.ocupado_aeronave[aeronave_id] = np.zeros(self.horizonte_dias, dtype=bool)
+        return agenda
+
+    @staticmethod
+    def _libres_en_ventana(ocupado, duracion):
+        """libres[i, s] = el recurso i no está ocupado en ningún día de [s, s + duración)"""
+        acumulado = np.zeros(ocupado.shape[:-1] + (ocupado.shape[-1] + 1,), dtype=np.int64)
+        np.cumsum(ocupado, axis=-1, out=acumulado[..., 1:])
+        return (acumulado[..., duracion:] - acumulado[..., :-duracion]) == 0
+
+    def planificar(self, demandas, progreso=None):
+        """Asignar las demandas y devolver un ResultadoPlanificacion (no escribe en la base)"""
+        inicio = time.perf_counter()
+        self.cargar_agenda()
+        resultado = ResultadoPlanificacion()
+        D = self.horizonte_dias
+
+        ordenadas = sorted(demandas, key=lambda d: (D if d.plazo_dias is None else d.plazo_dias, d.prioridad))
+        mascaras = {}
+        for n, demanda in enumerate(ordenadas):
+            dur = demanda.duracion_dias
+            if dur > D:
+                resultado.sin_asignar.append((demanda, "La duración excede el horizonte"))
+                continue
+
+            if demanda.especialidad not in mascaras:
+                mascaras[demanda.especialidad] = (np.ones(len(self.tecnico_ids), dtype=bool)
+                                                  if demanda.especialidad is None
+                                                  else self.especialidades == demanda.especialidad)
+            candidatos = np.flatnonzero(mascaras[demanda.especialidad])
+            if not len(candidatos) or not len(self.hangar_ids):
+                resultado.sin_asignar.append((demanda, "No hay técnicos de la especialidad o hangares"))
+                continue
+
+            hangar_libre = self._libres_en_ventana(self.uso_hangar >= self.capacidad[:, None], dur)
+            tecnico_libre = self._libres_en_ventana(self.ocupado_tecnico[candidatos], dur)
+            aeronave_libre = self._libres_en_ventana(self._agenda_aeronave(demanda.aeronave_id), dur)
+
+            factibles = np.flatnonzero(hangar_libre.any(0) & tecnico_libre.any(0) & aeronave_libre)
+            if not len(factibles):
+                resultado.sin_asignar.append((demanda, "Sin técnico y hangar libres en el horizonte"))
+                continue
+            dia = factibles[0]
+            dias = slice(dia, dia + dur)
+
+            # Hangar con menos lugar sobrante en la ventana (mejor ajuste)
+            hangares = np.flatnonzero(hangar_libre[:, dia])
+            sobrante = self.capacidad[hangares] - self.uso_hangar[hangares, dias].max(axis=1)
+            h = hangares[np.argmin(sobrante)]
+
+            # Técnico libre con menos días ocupados en el horizonte
+            tecnicos = candidatos[tecnico_libre[:, dia]]
+            t = tecnicos[np.argmin(self.ocupado_tecnico[tecnicos].sum(axis=1))]
+
+            self.uso_hangar[h, dias] += 1
+            self.ocupado_tecnico[t, dias] = True
+            self._agenda_aeronave(demanda.aeronave_id)[dias] = True
+
+            atrasada = demanda.plazo_dias is not None and dia > demanda.plazo_dias
+            resultado.asignaciones.append(Asignacion(demanda, int(self.tecnico_ids[t]),
+                                                     int(self.hangar_ids[h]), self._fecha(dia), atrasada))
+            if progreso is not None and n % 500 == 0:
+                progreso(n / len(ordenadas), f"{n:,} de {len(ordenadas):,} demandas")
+
+        resultado.segundos = time.perf_counter() - inicio
+        return resultado
+
+    def guardar(self, resultado):
+        """Registrar en la base las asignaciones de un plan.
+
+        Lanza ValueError, sin guardar nada, si la agenda cambió desde que se
+        planificó y alguna asignación ya no cabe; hay que volver a planificar.
+        """
+        return self.db.insertar_mantenimientos_lote([a.fila() for a in resultado.asignaciones])
@@ -0,0 +1,119 @@
+# pool_conexiones.py - Pool de conexiones SQLite reutilizables
+import sqlite3
+import threading
+import queue
+from contextlib import contextmanager
+
+# Pragmas aplicados a cada conexión nueva del pool
+PRAGMAS_CONEXION = (
+    "PRAGMA journal_mode=WAL",        # Lectores concurrentes con un escritor
+    "PRAGMA synchronous=NORMAL",      # Seguro con WAL y mucho más rápido que FULL
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",       # ~16 MB de caché de páginas por conexión
+    "PRAGMA mmap_size=134217728",     # Lecturas mapeadas en memoria (128 MB)
+    "PRAGMA busy_timeout=5000",
+)
+
+class PoolConexiones:
+    """Pool de conexiones SQLite persistentes, seguro entre hilos.
+
+    Cada hilo recibe una conexión prestada del pool; si un mismo hilo vuelve
+    a pedir conexión dentro de un bloque activo, se reutiliza la misma y la
+    transacción se confirma sólo al salir del bloque más externo.
+    """
+
+    def __init__(self, db_name, tamano_maximo=5, sentencias_cache=256, timeout=30.0):
+        self.db_name = db_name
+        # Una base en memoria es distinta por conexión: se limita a una sola
+        self.tamano_maximo = 1 if db_name == ":memory:" else max(1, tamano_maximo)
+        self.sentencias_cache = sentencias_cache
+        self.timeout = timeout
+        self._libres = queue.LifoQueue()
+        self._todas = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._cerrado = False
+
+    def _nueva_conexion(self):
+        """Abrir una conexión configurada con los pragmas del pool"""
+        conn = sqlite3.connect(self.db_name, timeout=self.timeout,
+                               check_same_thread=False,
+                               cached_statements=self.sentencias_cache)
+        for pragma in PRAGMAS_CONEXION:
+            conn.execute(pragma)
+        return conn
+
+    def adquirir(self):
+        """Tomar una conexión libre, creando una nueva si no se llegó al máximo"""
+        if self._cerrado:
+            raise sqlite3.ProgrammingError("El pool de conexiones está cerrado")
+        try:
+            return self._libres.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            crear = len(self._todas) < self.tamano_maximo
+            if crear:
+                conn = self._nueva_conexion()
+                self._todas.append(conn)
+                return conn
+
+        return self._libres.get(timeout=self.timeout)
+
+    def liberar(self, conn):
+        """Devolver una conexión al pool descartando transacciones abiertas"""
+        if self._cerrado:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                pass
+            return
+        if conn.in_transaction:
+            conn.rollback()
+        self._libres.put(conn)
+
+    @contextmanager
+    def conexion(self):
+        """Prestar una conexión; confirma al salir o revierte si hay error"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            # Llamada anidada en el mismo hilo: comparte conexión y transacción
+            self._local.profundidad += 1
+            try:
+                yield conn
+            finally:
+                self._local.profundidad -= 1
+            return
+
+        conn = self.adquirir()
+        self._local.conn = conn
+        self._local.profundidad = 1
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            self._local.profundidad = 0
+            self.liberar(conn)
+
+    def cerrar(self):
+        """Cerrar todas las conexiones del pool"""
+        with self._lock:
+            self._cerrado = True
+            conexiones, self._todas = self._todas, []
+        while True:
+            try:
+                self._libres.get_nowait()
+            except queue.Empty:
+                break
+        for conn in conexiones:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                pass
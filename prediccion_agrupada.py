@@ -0,0 +1,196 @@
+# prediccion_agrupada.py - Micro-lotes de predicción con caché LRU para servicios compartidos
+import asyncio
+import time
+from collections import OrderedDict, deque
+
+# Límites superiores de los rangos del histograma de tamaños de lote
+RANGOS_LOTE = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+class AgrupadorCerrado(RuntimeError):
+    """El agrupador se cerró antes de responder la solicitud"""
+
+class AgrupadorPredicciones:
+    """Agrupa predicciones concurrentes en una sola llamada a predict_proba.
+
+    Cada solicitud se encola; un despachador toma la primera y espera como
+    máximo espera_max_ms a que lleguen otras hasta completar max_lote, y
+    predice todo el lote en el ejecutor (fuera del bucle de asyncio). Las
+    entradas se redondean (redondeo = pasos de peso, horas y año) y el
+    resultado se guarda en una caché LRU con esa clave; la predicción se
+    hace sobre los valores redondeados, de modo que un acierto de caché
+    devuelve exactamente lo que se habría calculado. Solicitudes iguales que
+    llegan mientras otra está en curso esperan el mismo resultado.
+
+    servicio es un ServicioModeloIA (o cualquier objeto con
+    predecir_categorias_lote). Al cambiar de modelo, cambiar_servicio()
+    vacía la caché; los lotes que ya estaban en curso responden con el
+    modelo anterior pero no se guardan en la caché. cerrar() hace fallar
+    las solicitudes pendientes con AgrupadorCerrado.
+    """
+
+    def __init__(self, servicio, ejecutor=None, max_lote=64, espera_max_ms=5.0,
+                 tamano_cache=10000, redondeo=(10.0, 1.0, 1)):
+        self.servicio = servicio
+        self.ejecutor = ejecutor
+        self.max_lote = max_lote
+        self.espera_max = espera_max_ms / 1000.0
+        self.tamano_cache = tamano_cache
+        self.redondeo = redondeo
+        self.cache = OrderedDict()
+        self._en_curso = {}
+        self._generacion = 0              # Cambia con cada invalidar()
+        self.cola = None
+        self._tarea = None
+        self._cerrado = False
+        self.reiniciar_metricas()
+
+    def reiniciar_metricas(self):
+        self.solicitudes = 0
+        self.aciertos_cache = 0
+        self.compartidas = 0              # Esperaron una predicción idéntica en curso
+        self.lotes = 0
+        self.filas_predichas = 0
+        self.histograma_lotes = {rango: 0 for rango in RANGOS_LOTE + (None,)}
+        self.latencias_cola = deque(maxlen=10000)       # Segundos entre encolar y predecir
+        self.tiempos_prediccion = deque(maxlen=10000)   # Segundos de cada predict_proba
+
+    def iniciar(self):
+        """Crear la cola y el despachador en el bucle en ejecución"""
+        self.cola = asyncio.Queue()
+        self._tarea = asyncio.get_running_loop().create_task(self._despachar())
+
+    async def cerrar(self):
+        """Detener el despachador y hacer fallar las solicitudes encoladas o en curso"""
+        self._cerrado = True
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+        pendientes = list(self._en_curso.values())
+        while self.cola is not None and not self.cola.empty():
+            pendientes.append(self.cola.get_nowait()[2])
+        self._en_curso.clear()
+        for futuro in pendientes:
+            if not futuro.done():
+                futuro.set_exception(AgrupadorCerrado("El servicio de predicción se cerró"))
+
+    def invalidar(self):
+        """Vaciar la caché (p. ej. después de cargar un modelo nuevo)"""
+        self.cache.clear()
+        # Las solicitudes nuevas no se suman a predicciones del modelo anterior
+        self._en_curso.clear()
+        self._generacion += 1
+
+    def cambiar_servicio(self, servicio):
+        """Predecir con otro modelo desde ahora, sin reutilizar resultados del anterior"""
+        self.servicio = servicio
+        self.invalidar()
+
+    def clave(self, peso_mtow, horas_vuelo, ano_fabricacion=2020):
+        paso_peso, paso_horas, paso_ano = self.redondeo
+        return (round(float(peso_mtow) / paso_peso) * paso_peso,
+                round(float(horas_vuelo) / paso_horas) * paso_horas,
+                int(round(float(ano_fabricacion) / paso_ano) * paso_ano))
+
+    async def predecir(self, peso_mtow, horas_vuelo, ano_fabricacion=2020):
+        """Devolver (categoria, confianza) de una aeronave"""
+        if self._cerrado:
+            raise AgrupadorCerrado("El servicio de predicción se cerró")
+        self.solicitudes += 1
+        clave = self.clave(peso_mtow, horas_vuelo, ano_fabricacion)
+        resultado = self.cache.get(clave)
+        if resultado is not None:
+            self.cache.move_to_end(clave)
+            self.aciertos_cache += 1
+            return resultado
+
+        futuro = self._en_curso.get(clave)
+        if futuro is not None:
+            self.compartidas += 1
+            return await asyncio.shield(futuro)
+
+        futuro = asyncio.get_running_loop().create_future()
+        self._en_curso[clave] = futuro
+        self.cola.put_nowait((clave, time.perf_counter(), futuro))
+        return await asyncio.shield(futuro)
+
+    async def predecir_varias(self, filas):
+        """[(categoria, confianza)] para filas (peso_mtow, horas_vuelo[, ano_fabricacion])"""
+        return await asyncio.gather(*(self.predecir(*fila) for fila in filas))
+
+    async def _despachar(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = [await self.cola.get()]
+            limite = lote[0][1] + self.espera_max
+            while len(lote) < self.max_lote:
+                if not self.cola.empty():
+                    lote.append(self.cola.get_nowait())
+                    continue
+                restante = limite - time.perf_counter()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(await asyncio.wait_for(self.cola.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+
+            generacion = self._generacion
+            inicio = time.perf_counter()
+            for _, encolada, _ in lote:
+                self.latencias_cola.append(inicio - encolada)
+            try:
+                categorias, confianzas = await loop.run_in_executor(
+                    self.ejecutor, self.servicio.predecir_categorias_lote, [clave for clave, _, _ in lote])
+                resultados = list(zip(categorias.tolist(), confianzas.tolist()))
+                error = None
+            except Exception as e:
+                error = e
+            self.tiempos_prediccion.append(time.perf_counter() - inicio)
+            self._registrar_lote(len(lote))
+
+            for i, (clave, _, futuro) in enumerate(lote):
+                if self._en_curso.get(clave) is futuro:
+                    del self._en_curso[clave]
+                if error is not None:
+                    futuro.set_exception(error)
+                    continue
+                if generacion == self._generacion:
+                    self.cache[clave] = resultados[i]
+                    if len(self.cache) > self.tamano_cache:
+                        self.cache.popitem(last=False)
+                futuro.set_result(resultados[i])
+
+    def _registrar_lote(self, tamano):
+        self.lotes += 1
+        self.filas_predichas += tamano
+        rango = next((r for r in RANGOS_LOTE if tamano <= r), None)
+        self.histograma_lotes[rango] += 1
+
+    def metricas(self):
+        """Contadores, histograma de tamaños de lote y percentiles de espera en cola (ms)"""
+        def percentiles(valores):
+            if not valores:
+                return {"p50": None, "p99": None}
+            ordenados = sorted(valores)
+            return {p: round(ordenados[min(len(ordenados) - 1, int(q * len(ordenados)))] * 1000, 3)
+                    for p, q in (("p50", 0.50), ("p99", 0.99))}
+
+        return {
+            "solicitudes": self.solicitudes,
+            "aciertos_cache": self.aciertos_cache,
+            "tasa_aciertos": round(self.aciertos_cache / self.solicitudes, 4) if self.solicitudes else 0.0,
+            "compartidas": self.compartidas,
+            "entradas_cache": len(self.cache),
+            "pendientes": self.cola.qsize() if self.cola is not None else 0,
+            "lotes": self.lotes,
+            "filas_predichas": self.filas_predichas,
+            "tamano_medio_lote": round(self.filas_predichas / self.lotes, 2) if self.lotes else 0.0,
+            "histograma_lotes": {(f"<={rango}" if rango else f">{RANGOS_LOTE[-1]}"): n
+                                 for rango, n in self.histograma_lotes.items()},
+            "espera_cola_ms": percentiles(self.latencias_cola),
+            "prediccion_ms": percentiles(self.tiempos_prediccion)
+        }
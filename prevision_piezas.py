@@ -0,0 +1,96 @@
+# prevision_piezas.py - Tasas de consumo de piezas y puntos de pedido
+from datetime import datetime, timedelta
+from statistics import NormalDist
+import numpy as np
+
+class PrevisionPiezas:
+    """Previsión de reposición para todas las piezas a la vez.
+
+    El consumo diario de cada pieza en la ventana de historial se arma como
+    una matriz (piezas x días) desde una única consulta agregada; media y
+    desviación por fila dan la demanda durante el tiempo de entrega y el
+    stock de seguridad para el nivel de servicio pedido:
+
+        punto de pedido = media * entrega + z * desviación * sqrt(entrega)
+    """
+
+    def __init__(self, db, ventana_dias=180, nivel_servicio=0.95, dias_pedido=30):
+        self.db = db
+        self.ventana_dias = ventana_dias
+        self.nivel_servicio = nivel_servicio
+        self.dias_pedido = dias_pedido      # Días de consumo que cubre un pedido sugerido
+
+    def matriz_consumo(self, ids, hoy=None):
+        """Consumo por pieza (fila, en el orden de ids) y día de la ventana (columna)"""
+        hoy = datetime.strptime(hoy, "%Y-%m-%d") if hoy else datetime.now()
+        desde = hoy - timedelta(days=self.ventana_dias - 1)
+        historial = self.db.obtener_consumo_diario_piezas(desde.strftime("%Y-%m-%d"),
+                                                          hoy.strftime("%Y-%m-%d"))
+        matriz = np.zeros((len(ids), self.ventana_dias))
+        if not historial or not len(ids):
+            return matriz
+
+        pieza_ids, fechas, cantidades = zip(*historial)
+        pieza_ids = np.asarray(pieza_ids, dtype=np.int64)
+        orden_ids = np.argsort(ids)
+        posicion = np.searchsorted(ids, pieza_ids, sorter=orden_ids)
+        posicion = np.minimum(posicion, len(ids) - 1)
+        fila = orden_ids[posicion]
+        conocida = ids[fila] == pieza_ids     # Ignorar consumos de piezas eliminadas
+
+        dia = (np.asarray(fechas, dtype='datetime64[D]')
+               - np.datetime64(desde.strftime("%Y-%m-%d"), 'D')).astype(np.int64)
+        np.add.at(matriz, (fila[conocida], dia[conocida]), np.asarray(cantidades, dtype=float)[conocida])
+        return matriz
+
+    def calcular(self, hoy=None):
+        """Devolver arreglos paralelos por pieza, ordenados por días de cobertura.
+
+        Claves: id, nombre, stock, tiempo_entrega, consumo_diario, desviacion,
+        stock_seguridad, punto_pedido, dias_cobertura (inf si no hay consumo),
+        reponer y cantidad_sugerida.
+        """
+        piezas = self.db.obtener_piezas()
+        ids = np.array([p[0] for p in piezas], dtype=np.int64)
+        nombres = np.array([p[1] for p in piezas], dtype=object)
+        stock = np.array([p[3] for p in piezas], dtype=float)
+        entrega = np.array([p[7] for p in piezas], dtype=float)
+
+        matriz = self.matriz_consumo(ids, hoy)
+        consumo_diario = matriz.mean(axis=1)
+        desviacion = matriz.std(axis=1, ddof=1) if self.ventana_dias > 1 else np.zeros(len(ids))
+
+        z = NormalDist().inv_cdf(self.nivel_servicio)
+        stock_seguridad = z * desviacion * np.sqrt(entrega)
+        punto_pedido = np.ceil(consumo_diario * entrega + stock_seguridad)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dias_cobertura = np.where(consumo_diario > 0, stock / consumo_diario, np.inf)
+        reponer = (consumo_diario > 0) & (stock <= punto_pedido)
+        cantidad_sugerida = np.where(
+            reponer, np.ceil(punto_pedido + consumo_diario * self.dias_pedido - stock), 0)
+
+        orden = np.argsort(dias_cobertura, kind='stable')
+        return {
+            'id': ids[orden],
+            'nombre': nombres[orden],
+            'stock': stock[orden],
+            'tiempo_entrega': entrega[orden],
+            'consumo_diario': consumo_diario[orden],
+            'desviacion': desviacion[orden],
+            'stock_seguridad': stock_seguridad[orden],
+            'punto_pedido': punto_pedido[orden],
+            'dias_cobertura': dias_cobertura[orden],
+            'reponer': reponer[orden],
+            'cantidad_sugerida': cantidad_sugerida[orden].astype(np.int64)
+        }
+
+    def piezas_a_reponer(self, hoy=None):
+        """[(pieza_id, nombre, stock, punto_pedido, dias_cobertura, cantidad_sugerida)] a pedir"""
+        prevision = self.calcular(hoy)
+        return [
+            (int(prevision['id'][i]), prevision['nombre'][i], int(prevision['stock'][i]),
+             int(prevision['punto_pedido'][i]), float(prevision['dias_cobertura'][i]),
+             int(prevision['cantidad_sugerida'][i]))
+            for i in np.flatnonzero(prevision['reponer'])
+        ]
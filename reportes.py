@@ -0,0 +1,277 @@
+# reportes.py - Reportes de estadísticas y costos sin interfaz gráfica (PDF, PNG y CSV)
+#
+# Uso: python reportes.py --salida reportes/ [--hangares todos|1,3] [--periodos 2024-01:2024-12]
+#                         [--formatos pdf,png,csv] [--procesos 4] [--db sgma_aeronaves.db]
+import argparse
+import calendar
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from categorias import CATEGORIAS
+from database import DatabaseManager
+
+FORMATOS = ("pdf", "png", "csv")
+MAX_AERONAVES = 10    # Aeronaves de mayor costo en el gráfico
+
+class SolicitudReporte:
+    """Alcance de un reporte: un hangar (o toda la flota) y un mes (o todo el historial)"""
+
+    def __init__(self, hangar_id=None, hangar_nombre="Flota completa", periodo=None):
+        self.hangar_id = hangar_id
+        self.hangar_nombre = hangar_nombre
+        self.periodo = periodo    # 'AAAA-MM' o None
+
+    @property
+    def desde(self):
+        return f"{self.periodo}-01" if self.periodo else None
+
+    @property
+    def hasta(self):
+        if not self.periodo:
+            return None
+        anio, mes = map(int, self.periodo.split("-"))
+        return f"{self.periodo}-{calendar.monthrange(anio, mes)[1]:02d}"
+
+    @property
+    def titulo(self):
+        return f"{self.hangar_nombre} - {self.periodo or 'Todo el historial'}"
+
+    @property
+    def nombre_archivo(self):
+        hangar = f"hangar_{self.hangar_id}" if self.hangar_id is not None else "flota"
+        return f"reporte_{hangar}_{self.periodo or 'historial'}"
+
+class PlantillaReporte:
+    """Página A4 apaisada con cuatro gráficos, creada una sola vez.
+
+    Figura, lienzo Agg, ejes, títulos y grillas se construyen en __init__.
+    Cada dibujar() sólo actualiza textos y el alto (o ancho) de las barras
+    existentes; las barras se vuelven a crear únicamente cuando cambia la
+    cantidad de grupos de un gráfico.
+    """
+
+    def __init__(self):
+        self.fig = Figure(figsize=(11.69, 8.27))
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.titulo = self.fig.suptitle("", fontsize=14, fontweight='bold')
+        self.pie = self.fig.text(0.5, 0.01, "", ha='center', fontsize=10, color='#2c3e50')
+
+        ejes = self.fig.subplots(2, 2)
+        self.ax_categorias, self.ax_estados = ejes[0]
+        self.ax_tipos, self.ax_aeronaves = ejes[1]
+        for ax, titulo in ((self.ax_categorias, "Aeronaves por Categoría"),
+                           (self.ax_estados, "Mantenimientos por Estado"),
+                           (self.ax_tipos, "Costos por Tipo de Mantenimiento (Bs)"),
+                           (self.ax_aeronaves, f"Aeronaves de Mayor Costo (Bs, {MAX_AERONAVES} primeras)")):
+            ax.set_title(titulo, fontsize=11)
+            ax.grid(axis='x' if ax is self.ax_aeronaves else 'y', alpha=0.3)
+        self.fig.subplots_adjust(left=0.08, right=0.97, top=0.9, bottom=0.1, hspace=0.4, wspace=0.3)
+
+        self._barras = {}
+        self._actualizar_barras(self.ax_categorias, list(CATEGORIAS), [0] * len(CATEGORIAS), '#3498db')
+
+    def _actualizar_barras(self, ax, etiquetas, valores, color, horizontal=False):
+        barras = self._barras.get(ax)
+        if barras is None or len(barras) != len(valores):
+            if barras is not None:
+                barras.remove()
+            posiciones = range(len(valores))
+            barras = (ax.barh(posiciones, valores, color=color) if horizontal
+                      else ax.bar(posiciones, valores, color=color))
+            self._barras[ax] = barras
+        else:
+            for barra, valor in zip(barras, valores):
+                if horizontal:
+                    barra.set_width(valor)
+                else:
+                    barra.set_height(valor)
+
+        posiciones = list(range(len(etiquetas)))
+        if horizontal:
+            ax.set_yticks(posiciones, etiquetas, fontsize=8)
+            ax.set_ylim(max(len(etiquetas), 1) - 0.5, -0.5)     # Mayor costo arriba
+            ax.set_xlim(0, max(valores, default=0) * 1.1 or 1)
+        else:
+            ax.set_xticks(posiciones, etiquetas, fontsize=8)
+            ax.set_xlim(-0.5, max(len(etiquetas), 1) - 0.5)
+            ax.set_ylim(0, max(valores, default=0) * 1.1 or 1)
+
+    def dibujar(self, titulo, datos):
+        self.titulo.set_text(titulo)
+        self.pie.set_text(f"Costo total: Bs {datos['costo_total']:,.2f}   |   "
+                          f"Mantenimientos: {sum(datos['mantenimientos_por_estado'].values()):,}")
+
+        categorias = datos['aeronaves_por_categoria']
+        self._actualizar_barras(self.ax_categorias, list(CATEGORIAS),
+                                [categorias.get(c, 0) for c in CATEGORIAS], '#3498db')
+        estados = datos['mantenimientos_por_estado']
+        self._actualizar_barras(self.ax_estados, [str(e) for e in estados], list(estados.values()), '#2ecc71')
+        self._actualizar_barras(self.ax_tipos, [c[0] for c in datos['costos_por_tipo']],
+                                [c[1] for c in datos['costos_por_tipo']], '#e67e22')
+        aeronaves = datos['costos_por_aeronave'][:MAX_AERONAVES]
+        self._actualizar_barras(self.ax_aeronaves, [c[0] for c in aeronaves], [c[1] for c in aeronaves],
+                                '#e74c3c', horizontal=True)
+
+    def guardar(self, ruta, formato, dpi=100):
+        self.fig.savefig(ruta, format=formato, dpi=dpi)
+
+class GeneradorReportes:
+    """Genera los archivos de un reporte reutilizando una sola PlantillaReporte"""
+
+    def __init__(self, db, directorio, formatos=FORMATOS):
+        formatos_no_validos = set(formatos) - set(FORMATOS)
+        if formatos_no_validos:
+            raise ValueError(f"Formatos de reporte no soportados: {', '.join(sorted(formatos_no_validos))}")
+        self.db = db
+        self.directorio = directorio
+        self.formatos = tuple(formatos)
+        self._plantilla = None
+
+    @property
+    def plantilla(self):
+        if self._plantilla is None:
+            self._plantilla = PlantillaReporte()
+        return self._plantilla
+
+    def datos(self, solicitud):
+        """Estadísticas y costos del alcance de la solicitud"""
+        filtro = dict(hangar_id=solicitud.hangar_id, desde=solicitud.desde, hasta=solicitud.hasta)
+        estadisticas = self.db.obtener_estadisticas_generales(**filtro)
+        return {
+            'aeronaves_por_categoria': estadisticas['aeronaves_por_categoria'],
+            'mantenimientos_por_estado': estadisticas['mantenimientos_por_estado'],
+            'costo_total': estadisticas['costo_total_mantenimientos'],
+            'costos_por_tipo': self.db.obtener_costos('tipo', **filtro),
+            'costos_por_aeronave': self.db.obtener_costos('aeronave', **filtro),
+            'costos_por_mes': self.db.obtener_costos('mes', **filtro)
+        }
+
+    def generar(self, solicitud):
+        """Escribir el reporte en cada formato y devolver las rutas creadas"""
+        os.makedirs(self.directorio, exist_ok=True)
+        datos = self.datos(solicitud)
+        base = os.path.join(self.directorio, solicitud.nombre_archivo)
+        rutas = []
+
+        if "pdf" in self.formatos or "png" in self.formatos:
+            self.plantilla.dibujar(solicitud.titulo, datos)
+            for formato in ("pdf", "png"):
+                if formato in self.formatos:
+                    self.plantilla.guardar(f"{base}.{formato}", formato)
+                    rutas.append(f"{base}.{formato}")
+
+        if "csv" in self.formatos:
+            self.escribir_csv(f"{base}.csv", datos)
+            rutas.append(f"{base}.csv")
+        return rutas
+
+    def escribir_csv(self, ruta, datos):
+        with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(["seccion", "clave", "valor", "cantidad", "promedio"])
+            for categoria, cantidad in datos['aeronaves_por_categoria'].items():
+                escritor.writerow(["aeronaves_por_categoria", categoria, cantidad, "", ""])
+            for estado, cantidad in datos['mantenimientos_por_estado'].items():
+                escritor.writerow(["mantenimientos_por_estado", estado, cantidad, "", ""])
+            for seccion in ("costos_por_tipo", "costos_por_aeronave", "costos_por_mes"):
+                for clave, total, cantidad, promedio in datos[seccion]:
+                    escritor.writerow([seccion, clave, round(total, 2), cantidad, round(promedio, 2)])
+            escritor.writerow(["costo_total", "", round(datos['costo_total'], 2), "", ""])
+
+def solicitudes_lote(db, hangares="todos", periodos=(None,)):
+    """Una solicitud por hangar y período; 'todos' agrega también la flota completa"""
+    nombres = {h[0]: h[1] for h in db.obtener_hangares()}
+    if hangares == "todos":
+        alcances = [(None, "Flota completa")] + list(nombres.items())
+    else:
+        for hangar_id in hangares:
+            if hangar_id not in nombres:
+                raise ValueError(f"No existe el hangar con id {hangar_id}")
+        alcances = [(hangar_id, nombres[hangar_id]) for hangar_id in hangares]
+    return [SolicitudReporte(hangar_id, nombre, periodo) for hangar_id, nombre in alcances for periodo in periodos]
+
+def meses(desde, hasta):
+    """Lista de meses 'AAAA-MM' entre dos meses, inclusive"""
+    anio, mes = map(int, desde.split("-"))
+    fin = tuple(map(int, hasta.split("-")))
+    resultado = []
+    while (anio, mes) <= fin:
+        resultado.append(f"{anio:04d}-{mes:02d}")
+        anio, mes = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+    return resultado
+
+def interpretar_alcance(hangares, periodos):
+    """Traducir los textos de la línea de comandos a (hangares, períodos) para solicitudes_lote"""
+    if ":" in periodos:
+        lista_periodos = meses(*periodos.split(":"))
+    else:
+        lista_periodos = [p.strip() for p in periodos.split(",") if p.strip()] or [None]
+    lista_hangares = hangares if hangares == "todos" else [int(h) for h in hangares.split(",")]
+    return lista_hangares, lista_periodos
+
+# Un generador por proceso de trabajo: la plantilla se crea una vez y sirve a todos sus reportes
+_generador_proceso = None
+
+def _iniciar_proceso(db_name, directorio, formatos):
+    global _generador_proceso
+    _generador_proceso = GeneradorReportes(DatabaseManager(db_name, tamano_pool=1), directorio, formatos)
+
+def _generar_en_proceso(solicitud):
+    return _generador_proceso.generar(solicitud)
+
+def generar_lote(db_name, solicitudes, directorio, formatos=FORMATOS, procesos=None, progreso=None):
+    """Generar muchos reportes repartidos entre procesos; devuelve todas las rutas creadas.
+
+    procesos=1 genera en el proceso actual. progreso(fraccion, mensaje) se
+    llama tras cada reporte terminado.
+    """
+    rutas = []
+    if procesos == 1:
+        _iniciar_proceso(db_name, directorio, formatos)
+        resultados = map(_generar_en_proceso, solicitudes)
+        ejecutor = None
+    else:
+        procesos = procesos or os.cpu_count() or 1
+        ejecutor = ProcessPoolExecutor(procesos, initializer=_iniciar_proceso,
+                                       initargs=(db_name, directorio, formatos))
+        tamano_bloque = max(1, len(solicitudes) // (4 * procesos))
+        resultados = ejecutor.map(_generar_en_proceso, solicitudes, chunksize=tamano_bloque)
+    try:
+        for n, creadas in enumerate(resultados, 1):
+            rutas.extend(creadas)
+            if progreso is not None:
+                progreso(n / len(solicitudes), f"{n:,} de {len(solicitudes):,} reportes")
+    finally:
+        if ejecutor is not None:
+            ejecutor.shutdown(cancel_futures=True)
+    return rutas
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generación de reportes por hangar y período")
+    parser.add_argument("--salida", required=True, help="Directorio donde escribir los reportes")
+    parser.add_argument("--db", default="sgma_aeronaves.db")
+    parser.add_argument("--hangares", default="todos", help="'todos' o ids separados por coma")
+    parser.add_argument("--periodos", default="",
+                        help="Meses AAAA-MM separados por coma o un rango AAAA-MM:AAAA-MM (vacío: todo el historial)")
+    parser.add_argument("--formatos", default=",".join(FORMATOS))
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos de trabajo (por defecto, uno por CPU)")
+    args = parser.parse_args(argv)
+
+    hangares, periodos = interpretar_alcance(args.hangares, args.periodos)
+    formatos = [f.strip().lower() for f in args.formatos.split(",") if f.strip()]
+
+    db = DatabaseManager(args.db)
+    solicitudes = solicitudes_lote(db, hangares, periodos)
+    db.cerrar_conexion()
+
+    inicio = time.perf_counter()
+    rutas = generar_lote(args.db, solicitudes, args.salida, formatos, args.procesos,
+                         progreso=lambda fraccion, mensaje: print(f"\r{mensaje}", end="", flush=True))
+    segundos = time.perf_counter() - inicio
+    print(f"\n{len(solicitudes):,} reportes ({len(rutas):,} archivos) en {segundos:.1f} s -> {args.salida}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,692 @@
+# servicio_modelo.py - Modelo de IA de aeronaves sin interfaz gráfica
+#
+# ServicioModeloIA entrena, guarda, carga y consulta el modelo a partir de una
+# fuente de datos (DatabaseManager u otro objeto con los mismos métodos de
+# lectura). No usa Tk: sirve igual desde la ventana, hilos de trabajo, procesos,
+# la línea de comandos o un servidor.
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.utils.class_weight import compute_class_weight
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import accuracy_score, classification_report
+import joblib
+import copy
+import glob
+import os
+import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from bosque_compilado import BosqueCompilado, ARCHIVO_COMPILADO
+
+DIRECTORIO_MODELOS = 'modelos_ia'
+VERSION_FORMATO_MODELO = 1
+# Hasta esta cantidad de filas el bosque compilado es más rápido que sklearn
+# (sin el costo fijo de validación y de hilos por llamada); más allá conviene sklearn
+MAX_FILAS_COMPILADO = 500
+
+# Datos sintéticos iniciales: categoría -> (cantidad, peso MTOW, horas, años, fabricantes)
+GRUPOS_SINTETICOS = {
+    "Liviana": (50, (500, 5700), (50, 1000), (2010, 2024), ["Cessna", "Piper", "Beechcraft"]),
+    "Mediana": (40, (5701, 27000), (200, 2000), (2005, 2023), ["Embraer", "Bombardier", "ATR"]),
+    "Pesada": (30, (27001, 400000), (500, 5000), (2000, 2022), ["Boeing", "Airbus", "McDonnell Douglas"])
+}
+
+# Análisis predictivo de mantenimiento
+LIMITE_HORAS_DEFECTO = 150
+COSTO_BASE_CATEGORIA = {
+    "Liviana": 1500,
+    "Mediana": 5000,
+    "Pesada": 15000
+}
+COSTO_BASE_DEFECTO = 5000
+# (horas restantes máximas, urgencia, color), de mayor a menor urgencia
+NIVELES_URGENCIA = [
+    (10, "CRÍTICA", "#e74c3c"),
+    (25, "ALTA", "#f39c12"),
+    (50, "MEDIA", "#f1c40f"),
+    (np.inf, "BAJA", "#2ecc71")
+]
+
+class ServicioModeloIA:
+    """Clasificador de categoría (bosque aleatorio) y análisis predictivo de mantenimiento.
+    
+    fuente provee los datos: iterar_datos_entrenamiento, obtener_datos_clasificacion,
+    actualizar_categorias, obtener_datos_mantenimiento_flota y
+    obtener_aeronaves_por_ids (DatabaseManager los implementa). Cada instancia
+    tiene su propio modelo y directorio, de modo que varias pueden entrenar a
+    la vez en hilos o procesos distintos.
+    """
+    
+    def __init__(self, fuente, directorio_modelos=DIRECTORIO_MODELOS):
+        self.fuente = fuente
+        self.directorio_modelos = directorio_modelos
+        self.modelo = None
+        self.bosque_compilado = None
+        self.scaler = StandardScaler()
+        self.label_encoder_categoria = LabelEncoder()
+        self.label_encoder_fabricante = LabelEncoder()
+        self.fabricantes_conocidos = []
+        self.modelo_entrenado = False
+        
+        # Opciones de guardado del paquete de modelo
+        self.compresion_modelo = 0     # 0 permite cargar con mmap; 1-9 o ('lz4', 3) comprime
+        self.modelos_conservados = 5   # Paquetes fechados que se mantienen en disco
+        
+        # Lectura de datos de entrenamiento
+        self.tamano_bloque_lectura = 10000     # Filas por fetchmany
+        self.max_filas_entrenamiento = None    # Tope de filas en memoria (muestra si la flota es mayor)
+        
+        # Crear directorio para modelos si no existe
+        os.makedirs(self.directorio_modelos, exist_ok=True)
+    
+    def preparar_datos_entrenamiento(self):
+        """Preparar datos de aeronaves existentes para entrenamiento.
+        
+        Lee la flota por bloques directamente en arreglos numpy reservados de
+        antemano, sin armar la lista completa de filas. Si la flota supera
+        max_filas_entrenamiento se usa una muestra uniforme de ese tamaño
+        (muestreo de reservorio), de modo que la memoria queda acotada a
+        unos 32 bytes por fila más las etiquetas finales.
+        """
+        lector = self.fuente.iterar_datos_entrenamiento(self.tamano_bloque_lectura)
+        try:
+            total = next(lector)
+            if total < 10:
+                # Si hay pocos datos, agregar datos sintéticos para entrenamiento
+                return self.generar_datos_sinteticos()
+            
+            capacidad = total if self.max_filas_entrenamiento is None else min(total, self.max_filas_entrenamiento)
+            pesos = np.empty(capacidad)
+            horas = np.empty(capacidad)
+            categorias = np.empty(capacidad, dtype=np.int32)    # Códigos en vocabulario_*
+            fabricantes = np.empty(capacidad, dtype=np.int32)
+            vocabulario_categorias, vocabulario_fabricantes = {}, {}
+            rng = np.random.default_rng(42)
+            leidas = 0
+            
+            for bloque in lector:
+                columnas = list(zip(*bloque))
+                destino = np.arange(leidas, leidas + len(bloque))
+                leidas += len(bloque)
+                if leidas > capacidad:
+                    # Reservorio: la fila i reemplaza una posición al azar con probabilidad capacidad/(i+1)
+                    excedentes = destino >= capacidad
+                    destino[excedentes] = rng.integers(0, destino[excedentes] + 1)
+                conservar = destino < capacidad
+                destino = destino[conservar]
+                
+                pesos[destino] = np.array(columnas[0], dtype=float)[conservar]
+                horas[destino] = np.array(columnas[1], dtype=float)[conservar]
+                categorias[destino] = self._codificar(columnas[2], vocabulario_categorias)[conservar]
+                fabricantes[destino] = self._codificar(columnas[3], vocabulario_fabricantes)[conservar]
+        finally:
+            lector.close()
+        
+        filas = min(leidas, capacidad)
+        pesos, horas = pesos[:filas], horas[:filas]
+        # Estimar año de fabricación basado en horas de vuelo (aproximación)
+        anos = np.where(horas > 500, 2024 - (horas / 500).astype(np.int64), 2020)
+        
+        X = np.column_stack([pesos, horas, anos])
+        y = np.array(list(vocabulario_categorias))[categorias[:filas]]
+        return X, y, np.array(list(vocabulario_fabricantes))[fabricantes[:filas]]
+    
+    @staticmethod
+    def _codificar(valores, vocabulario):
+        """Códigos enteros de valores, agregando al vocabulario los que falten"""
+        return np.fromiter((vocabulario.setdefault(v, len(vocabulario)) for v in valores),
+                           dtype=np.int32, count=len(valores))
+    
+    def generar_datos_sinteticos(self):
+        """Generar datos sintéticos para entrenamiento inicial"""
+        # Generador propio para no compartir el estado global entre
+        # entrenamientos simultáneos
+        rng = np.random.RandomState(42)
+        
+        X, y, fabricantes = [], [], []
+        for categoria, (cantidad, peso, horas, anos, marcas) in GRUPOS_SINTETICOS.items():
+            X.append(np.column_stack([rng.uniform(*peso, cantidad), rng.uniform(*horas, cantidad),
+                                      rng.randint(*anos, cantidad)]))
+            y.append(np.full(cantidad, categoria))
+            fabricantes.append(rng.choice(marcas, cantidad))
+        
+        # Combinar todos los datos
+        orden = rng.permutation(sum(len(parte) for parte in X))
+        return np.concatenate(X)[orden], np.concatenate(y)[orden], np.concatenate(fabricantes)[orden]
+    
+    def ejecutar_entrenamiento(self, progreso=None, n_estimators=100, n_jobs=-1, guardar=True):
+        """Entrenar el modelo y devolver sus métricas.
+        
+        Puede ejecutarse en un hilo de trabajo: el modelo nuevo se publica sólo
+        al final, y progreso(fraccion, mensaje) se llama entre etapas.
+        n_jobs=-1 construye los árboles en todos los núcleos; guardar=False
+        deja el modelo sólo en memoria (p. ej. al comparar configuraciones en
+        paralelo). Lanza una excepción si el entrenamiento falla.
+        """
+        def avanzar(fraccion, mensaje):
+            if progreso is not None:
+                progreso(fraccion, mensaje)
+        
+        # Obtener datos
+        avanzar(0.0, "Preparando datos")
+        inicio = time.perf_counter()
+        X, y, fabricantes = self.preparar_datos_entrenamiento()
+        tiempo_preparacion = time.perf_counter() - inicio
+        
+        if len(X) == 0:
+            raise ValueError("No hay datos suficientes para entrenar")
+        
+        # Normalizar características
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X)
+        
+        # Codificar etiquetas
+        label_encoder_categoria = LabelEncoder()
+        label_encoder_fabricante = LabelEncoder()
+        y_encoded = label_encoder_categoria.fit_transform(y)
+        label_encoder_fabricante.fit(fabricantes)
+        
+        # Dividir datos
+        X_train, X_test, y_train, y_test = train_test_split(
+            X_scaled, y_encoded, test_size=0.2, random_state=42, stratify=y_encoded
+        )
+        
+        # Entrenar modelo (warm_start permite añadir árboles después)
+        avanzar(0.2, "Entrenando modelo")
+        modelo = RandomForestClassifier(
+            n_estimators=n_estimators,
+            max_depth=10,
+            random_state=42,
+            class_weight=self._pesos_balanceados(y_train),
+            n_jobs=n_jobs,
+            warm_start=True
+        )
+        
+        metricas = self._ajustar_midiendo(modelo, X_train, y_train)
+        
+        # Evaluar modelo
+        avanzar(0.8, "Evaluando modelo")
+        evaluacion = self._evaluar(modelo, X_test, y_test, label_encoder_categoria)
+        
+        # Publicar y guardar modelo; el último punto de cancelación va antes de publicar
+        bosque_compilado = BosqueCompilado.desde_sklearn(modelo, scaler, label_encoder_categoria)
+        avanzar(0.9, "Guardando modelo" if guardar else "Publicando modelo")
+        self.bosque_compilado = bosque_compilado
+        self.modelo = modelo
+        self.scaler = scaler
+        self.label_encoder_categoria = label_encoder_categoria
+        self.label_encoder_fabricante = label_encoder_fabricante
+        self.fabricantes_conocidos = list(label_encoder_fabricante.classes_)
+        if guardar:
+            self.guardar_modelo()
+        self.modelo_entrenado = True
+        
+        return {
+            'total_datos': len(X),
+            'tiempo_preparacion_s': tiempo_preparacion,
+            'tiempo_total_s': time.perf_counter() - inicio,
+            **evaluacion,
+            **metricas
+        }
+    
+    def ampliar_modelo(self, arboles_nuevos=25, progreso=None, n_jobs=-1, guardar=True):
+        """Añadir árboles al bosque actual (warm start) con los datos vigentes.
+        
+        Los árboles existentes se conservan; sólo los nuevos se ajustan, con el
+        mismo scaler y codificación, sobre los datos actuales (que incluyen
+        las aeronaves registradas desde el último entrenamiento).
+        """
+        def avanzar(fraccion, mensaje):
+            if progreso is not None:
+                progreso(fraccion, mensaje)
+        
+        if self.modelo is None:
+            # Puede haber sólo un bosque compilado cargado para predecir
+            if not self.cargar_modelo():
+                raise ValueError("No hay un modelo de IA entrenado para ampliar")
+        
+        avanzar(0.0, "Preparando datos")
+        inicio = time.perf_counter()
+        X, y, _ = self.preparar_datos_entrenamiento()
+        tiempo_preparacion = time.perf_counter() - inicio
+        
+        desconocidas = set(y) - set(self.label_encoder_categoria.classes_)
+        if desconocidas:
+            raise ValueError(f"Categorías nuevas no vistas por el modelo: {', '.join(sorted(desconocidas))}")
+        
+        X_scaled = self.scaler.transform(X)
+        y_encoded = self.label_encoder_categoria.transform(y)
+        X_train, X_test, y_train, y_test = train_test_split(
+            X_scaled, y_encoded, test_size=0.2, random_state=42, stratify=y_encoded
+        )
+        
+        # Trabajar sobre una copia para no publicar un bosque a medio ampliar
+        avanzar(0.2, "Añadiendo árboles")
+        modelo = copy.copy(self.modelo)
+        modelo.estimators_ = list(self.modelo.estimators_)
+        modelo.set_params(warm_start=True, n_jobs=n_jobs,
+                          n_estimators=len(self.modelo.estimators_) + arboles_nuevos)
+        if modelo.class_weight == 'balanced':
+            # Modelos antiguos: fijar los pesos para que no cambien entre ampliaciones
+            modelo.set_params(class_weight=self._pesos_balanceados(y_train))
+        
+        metricas = self._ajustar_midiendo(modelo, X_train, y_train)
+        
+        avanzar(0.8, "Evaluando modelo")
+        evaluacion = self._evaluar(modelo, X_test, y_test, self.label_encoder_categoria)
+        
+        bosque_compilado = BosqueCompilado.desde_sklearn(modelo, self.scaler, self.label_encoder_categoria)
+        avanzar(0.9, "Guardando modelo" if guardar else "Publicando modelo")
+        self.bosque_compilado = bosque_compilado
+        self.modelo = modelo
+        if guardar:
+            self.guardar_modelo()
+        
+        return {
+            'total_datos': len(X),
+            'tiempo_preparacion_s': tiempo_preparacion,
+            'tiempo_total_s': time.perf_counter() - inicio,
+            **evaluacion,
+            **metricas
+        }
+    
+    def _evaluar(self, modelo, X_test, y_test, label_encoder_categoria):
+        """Exactitud y reporte por clase (precision, recall, f1-score, support) sobre el conjunto de prueba"""
+        inicio = time.perf_counter()
+        y_pred = modelo.predict(X_test)
+        clases = np.arange(len(label_encoder_categoria.classes_))
+        reporte = classification_report(y_test, y_pred, labels=clases,
+                                        target_names=[str(c) for c in label_encoder_categoria.classes_],
+                                        output_dict=True, zero_division=0)
+        return {
+            'precision': accuracy_score(y_test, y_pred),
+            'reporte_clases': {clase: reporte[clase] for clase in map(str, label_encoder_categoria.classes_)},
+            'tiempo_evaluacion_s': time.perf_counter() - inicio
+        }
+    
+    def _pesos_balanceados(self, y):
+        """Pesos 'balanced' fijados como diccionario (compatibles con warm_start)"""
+        clases = np.unique(y)
+        pesos = compute_class_weight('balanced', classes=clases, y=y)
+        return dict(zip(clases.tolist(), pesos.tolist()))
+    
+    def _ajustar_midiendo(self, modelo, X, y):
+        """Ajustar el modelo midiendo el tiempo de ajuste y el tamaño del bosque.
+        
+        No se traza la memoria durante el ajuste: tracemalloc lo hace más lento
+        y no ve los nodos que reserva el código compilado de sklearn; el costo
+        en memoria del bosque es tamano_modelo_mb.
+        """
+        inicio = time.perf_counter()
+        modelo.fit(X, y)
+        tiempo = time.perf_counter() - inicio
+        
+        # Predecir en paralelo cuesta más de lo que ahorra en consultas pequeñas
+        n_jobs = modelo.n_jobs
+        modelo.set_params(n_jobs=None)
+        
+        # Memoria ocupada por los nodos y valores de todos los árboles
+        tamano = sum(arbol.tree_.__getstate__()['nodes'].nbytes + arbol.tree_.value.nbytes
+                     for arbol in modelo.estimators_)
+        
+        return {
+            'tiempo_ajuste_s': tiempo,
+            'arboles': len(modelo.estimators_),
+            'tamano_modelo_mb': tamano / 2**20,
+            'n_jobs': n_jobs
+        }
+    
+    def predecir_categoria(self, peso_mtow, horas_vuelo, ano_fabricacion=None):
+        """Predecir categoría de aeronave usando IA"""
+        if not self.modelo_entrenado:
+            if not self.cargar_para_prediccion():
+                return None, 0.0
+        
+        try:
+            # Preparar datos de entrada
+            if ano_fabricacion is None:
+                ano_fabricacion = 2020  # Valor por defecto
+            
+            categorias, confianzas = self.predecir_categorias_lote(
+                [[peso_mtow, horas_vuelo, ano_fabricacion]])
+            
+            return categorias[0], confianzas[0]
+            
+        except Exception as e:
+            print(f"Error en predicción: {e}")
+            return None, 0.0
+    
+    def predecir_categorias_lote(self, X):
+        """Predecir categorías de muchas aeronaves en una sola llamada.
+        
+        X es una matriz (n, 3) con peso_mtow, horas_vuelo y año de fabricación.
+        Devuelve (categorias, confianzas) como arrays de numpy; la etiqueta se
+        deriva de la matriz de probabilidades (igual que predict). Hasta
+        MAX_FILAS_COMPILADO filas responde el bosque compilado, que da
+        exactamente las mismas probabilidades; también responde lotes mayores
+        si sólo se cargó el compilado (cargar_para_prediccion).
+        """
+        if not self.modelo_entrenado:
+            if not self.cargar_para_prediccion():
+                raise ValueError("No hay un modelo de IA entrenado")
+        
+        X = np.asarray(X, dtype=float).reshape(-1, 3)
+        if len(X) == 0:
+            return np.array([], dtype=object), np.array([])
+        if self.bosque_compilado is not None and (len(X) <= MAX_FILAS_COMPILADO or self.modelo is None):
+            return self.bosque_compilado.predecir_categorias_lote(X)
+        
+        probabilidades = self.modelo.predict_proba(self.scaler.transform(X))
+        indices = probabilidades.argmax(axis=1)
+        categorias = self.label_encoder_categoria.inverse_transform(self.modelo.classes_[indices])
+        confianzas = probabilidades[np.arange(len(X)), indices]
+        
+        return categorias, confianzas
+    
+    def reclasificar_flota(self):
+        """Reclasificar todas las aeronaves con el modelo y guardar los cambios"""
+        aeronaves = self.fuente.obtener_datos_clasificacion()
+        if not aeronaves:
+            return {'total': 0, 'cambios': 0}
+        
+        ids = np.array([a[0] for a in aeronaves])
+        pesos = np.array([a[1] if a[1] else 10000 for a in aeronaves], dtype=float)
+        horas = np.array([a[2] if a[2] else 100 for a in aeronaves], dtype=float)
+        actuales = np.array([a[3] for a in aeronaves], dtype=object)
+        
+        # Mismo año estimado que en preparar_datos_entrenamiento
+        anos = np.where(horas > 500, 2024 - (horas / 500).astype(int), 2020)
+        
+        categorias, _ = self.predecir_categorias_lote(np.column_stack([pesos, horas, anos]))
+        
+        # Escribir sólo las aeronaves cuya categoría cambió
+        distintas = categorias != actuales
+        cambios = list(zip(categorias[distintas].tolist(), ids[distintas].tolist()))
+        if cambios:
+            self.fuente.actualizar_categorias(cambios)
+        
+        return {'total': len(aeronaves), 'cambios': len(cambios)}
+    
+    def sugerir_fabricante(self, peso_mtow, categoria):
+        """Sugerir fabricante basado en peso y categoría"""
+        sugerencias = {
+            "Liviana": {
+                "peso_bajo": ["Cessna", "Piper", "Diamond"],
+                "peso_alto": ["Beechcraft", "Mooney", "Cirrus"]
+            },
+            "Mediana": {
+                "peso_bajo": ["Embraer", "ATR", "Bombardier"],
+                "peso_alto": ["Saab", "Fokker", "BAe"]
+            },
+            "Pesada": {
+                "peso_bajo": ["Boeing", "Airbus", "Embraer"],
+                "peso_alto": ["Boeing", "Airbus", "McDonnell Douglas"]
+            }
+        }
+        
+        if categoria in sugerencias:
+            if categoria == "Liviana":
+                subcategoria = "peso_bajo" if peso_mtow < 3000 else "peso_alto"
+            elif categoria == "Mediana":
+                subcategoria = "peso_bajo" if peso_mtow < 15000 else "peso_alto"
+            else:  # Pesada
+                subcategoria = "peso_bajo" if peso_mtow < 100000 else "peso_alto"
+            
+            return sugerencias[categoria][subcategoria]
+        
+        return ["Boeing", "Airbus", "Cessna"]
+    
+    def analizar_mantenimiento_predictivo(self, aeronave_id):
+        """Análisis predictivo para mantenimiento"""
+        puntaje = self.puntuar_flota([aeronave_id])
+        if not len(puntaje['id']):
+            return None
+        
+        _, urgencia, color = NIVELES_URGENCIA[puntaje['nivel'][0]]
+        categoria = puntaje['categoria'][0]
+        horas_vuelo = float(puntaje['horas_vuelo'][0])
+        
+        return {
+            "horas_restantes": float(puntaje['horas_restantes'][0]),
+            "urgencia": urgencia,
+            "color": color,
+            "costo_estimado": float(puntaje['costo_estimado'][0]),
+            "recomendaciones": self.generar_recomendaciones(categoria, horas_vuelo)
+        }
+    
+    def puntuar_flota(self, aeronave_ids=None):
+        """Calcular horas restantes, urgencia y costo estimado de toda la flota.
+        
+        Lee las aeronaves en una sola consulta y opera sobre arreglos numpy.
+        Devuelve un diccionario de arreglos paralelos ordenados por prioridad
+        (menos horas restantes primero; a igualdad, mayor costo primero).
+        'nivel' es el índice en NIVELES_URGENCIA.
+        """
+        filas = self.fuente.obtener_datos_mantenimiento_flota(aeronave_ids)
+        ids, categorias, horas, limites = list(zip(*filas)) or [()] * 4
+        
+        horas = np.asarray(horas, dtype=float)
+        limites = np.asarray(limites, dtype=float)   # None -> nan
+        limites = np.where(np.isnan(limites), LIMITE_HORAS_DEFECTO, limites)
+        
+        # Horas hasta el próximo múltiplo del umbral
+        horas_restantes = limites - np.mod(horas, limites)
+        
+        cotas = np.array([n[0] for n in NIVELES_URGENCIA[:-1]])
+        nivel = np.searchsorted(cotas, horas_restantes, side='left')
+        
+        # Costo base por categoría (mayor costo con más horas)
+        categorias = np.asarray(categorias, dtype=object)
+        costo_base = np.fromiter((COSTO_BASE_CATEGORIA.get(c, COSTO_BASE_DEFECTO) for c in categorias),
+                                 dtype=float, count=len(categorias))
+        costo_estimado = costo_base * (1 + horas / 10000)
+        
+        orden = np.lexsort((-costo_estimado, horas_restantes))
+        return {
+            'id': np.asarray(ids, dtype=np.int64)[orden],
+            'categoria': categorias[orden],
+            'horas_vuelo': horas[orden],
+            'horas_restantes': horas_restantes[orden],
+            'nivel': nivel[orden],
+            'costo_estimado': costo_estimado[orden]
+        }
+    
+    def priorizar_mantenimiento_flota(self, limite=None):
+        """Lista de aeronaves ordenada por prioridad de mantenimiento.
+        
+        Devuelve tuplas (aeronave_id, matricula, modelo, categoria, horas_vuelo,
+        horas_restantes, urgencia, costo_estimado); limite recorta la lista.
+        """
+        puntaje = self.puntuar_flota()
+        n = len(puntaje['id']) if limite is None else min(limite, len(puntaje['id']))
+        # Matrícula y modelo sólo para las aeronaves que se van a mostrar
+        ids = puntaje['id'][:n].tolist()
+        aeronaves = {}
+        for inicio in range(0, n, 500):
+            aeronaves.update(self.fuente.obtener_aeronaves_por_ids(ids[inicio:inicio + 500]))
+        return [
+            (aeronave_id, aeronaves[aeronave_id][1], aeronaves[aeronave_id][2],
+             puntaje['categoria'][i], float(puntaje['horas_vuelo'][i]),
+             float(puntaje['horas_restantes'][i]), NIVELES_URGENCIA[puntaje['nivel'][i]][1],
+             float(puntaje['costo_estimado'][i]))
+            for i, aeronave_id in enumerate(ids)
+        ]
+    
+    def generar_recomendaciones(self, categoria, horas_vuelo):
+        """Generar recomendaciones de mantenimiento"""
+        recomendaciones = []
+        
+        if categoria == "Liviana":
+            if horas_vuelo > 500:
+                recomendaciones.append("Revisar sistema de combustible")
+                recomendaciones.append("Inspección de hélice")
+            if horas_vuelo > 1000:
+                recomendaciones.append("Overhaul del motor")
+        
+        elif categoria == "Mediana":
+            if horas_vuelo > 1000:
+                recomendaciones.append("Inspección de sistemas hidráulicos")
+                recomendaciones.append("Revisión de aviónica")
+            if horas_vuelo > 2000:
+                recomendaciones.append("Mantenimiento mayor de motores")
+        
+        else:  # Pesada
+            if horas_vuelo > 2000:
+                recomendaciones.append("Inspección estructural completa")
+                recomendaciones.append("Revisión de sistemas de navegación")
+            if horas_vuelo > 4000:
+                recomendaciones.append("Overhaul completo requerido")
+        
+        if not recomendaciones:
+            recomendaciones.append("Mantenimiento preventivo estándar")
+        
+        return recomendaciones
+    
+    def guardar_modelo(self):
+        """Guardar modelo entrenado en un único paquete versionado"""
+        try:
+            fecha = datetime.now().strftime("%Y%m%d_%H%M%S")
+            paquete = {
+                'version_formato': VERSION_FORMATO_MODELO,
+                'fecha': fecha,
+                'modelo': self.modelo,
+                'scaler': self.scaler,
+                'encoder_categoria': self.label_encoder_categoria,
+                'encoder_fabricante': self.label_encoder_fabricante
+            }
+            
+            # Guardar paquete fechado y publicarlo como actual de forma atómica
+            ruta = os.path.join(self.directorio_modelos, f'modelo_aeronaves_{fecha}.joblib')
+            joblib.dump(paquete, ruta, compress=self.compresion_modelo)
+            # Temporal único: dos servicios pueden publicar a la vez sin pisarse
+            descriptor, temporal = tempfile.mkstemp(dir=self.directorio_modelos, suffix='.tmp')
+            os.close(descriptor)
+            shutil.copyfile(ruta, temporal)
+            os.replace(temporal, os.path.join(self.directorio_modelos, 'modelo_actual.joblib'))
+            # Copia en arreglos planos para servicios que predicen sin importar sklearn
+            if self.bosque_compilado is not None:
+                self.bosque_compilado.guardar(os.path.join(self.directorio_modelos, ARCHIVO_COMPILADO))
+            
+            self.podar_modelos()
+            
+        except Exception as e:
+            print(f"Error al guardar modelo: {e}")
+    
+    def podar_modelos(self, conservar=None):
+        """Borrar artefactos fechados antiguos, conservando los más recientes"""
+        if conservar is None:
+            conservar = self.modelos_conservados
+        
+        # Paquetes actuales y pickles sueltos del formato anterior, agrupados por fecha
+        grupos = {}
+        for patron in ('modelo_aeronaves_*.joblib', 'modelo_aeronaves_*.pkl', 'scaler_*.pkl',
+                       'encoder_categoria_*.pkl', 'encoder_fabricante_*.pkl'):
+            for ruta in glob.glob(os.path.join(self.directorio_modelos, patron)):
+                if ruta.endswith('_actual.pkl'):
+                    continue
+                fecha = re.search(r'(\d{8}_\d{4,6})$', os.path.splitext(ruta)[0])
+                if fecha:
+                    grupos.setdefault(fecha.group(1), []).append(ruta)
+        
+        antiguos = sorted(grupos, key=lambda f: max(os.path.getmtime(r) for r in grupos[f]),
+                          reverse=True)[conservar:]
+        for fecha in antiguos:
+            for ruta in grupos[fecha]:
+                os.remove(ruta)
+        return len(antiguos)
+    
+    def _ruta_compilado_vigente(self):
+        """Ruta del bosque compilado si corresponde al paquete actual, si no None.
+        
+        guardar_modelo escribe el .npz después del paquete, así que un .npz
+        más antiguo que modelo_actual.joblib quedó de un modelo anterior.
+        """
+        ruta = os.path.join(self.directorio_modelos, ARCHIVO_COMPILADO)
+        paquete = os.path.join(self.directorio_modelos, 'modelo_actual.joblib')
+        if not os.path.exists(ruta):
+            return None
+        if os.path.exists(paquete) and os.path.getmtime(ruta) < os.path.getmtime(paquete):
+            return None
+        return ruta
+    
+    def cargar_para_prediccion(self):
+        """Cargar sólo lo necesario para predecir categorías.
+        
+        Si hay un bosque compilado vigente se leen únicamente sus arreglos
+        planos (.npz), sin deserializar el bosque de sklearn; éste se carga
+        recién si se amplía el modelo. Sin .npz equivale a cargar_modelo.
+        """
+        ruta = self._ruta_compilado_vigente()
+        if ruta is not None:
+            try:
+                self.bosque_compilado = BosqueCompilado.cargar(ruta)
+                self.modelo_entrenado = True
+                return True
+            except Exception as e:
+                print(f"Error al cargar modelo compilado: {e}")
+        return self.cargar_modelo()
+    
+    def cargar_modelo(self, mmap=True):
+        """Cargar el modelo de sklearn completo (para ampliarlo o predecir lotes grandes).
+        
+        Con mmap=True y un paquete sin comprimir joblib mapea los arreglos del
+        archivo, pero sklearn copia los nodos de cada árbol a memoria propia al
+        reconstruirlo: el bosque se deserializa completo igual. Para sólo
+        predecir conviene cargar_para_prediccion. El bosque compilado se lee
+        del .npz vigente y sólo se reconstruye desde sklearn si no lo hay.
+        """
+        try:
+            ruta = os.path.join(self.directorio_modelos, 'modelo_actual.joblib')
+            if os.path.exists(ruta):
+                with open(ruta, 'rb') as f:
+                    sin_comprimir = f.read(1) == b'\x80'  # Cabecera de pickle
+                paquete = joblib.load(ruta, mmap_mode='r' if mmap and sin_comprimir else None)
+                if paquete.get('version_formato', 0) > VERSION_FORMATO_MODELO:
+                    raise ValueError("El modelo fue guardado por una versión más nueva del sistema")
+                self.modelo = paquete['modelo']
+                self.scaler = paquete['scaler']
+                self.label_encoder_categoria = paquete['encoder_categoria']
+                self.label_encoder_fabricante = paquete['encoder_fabricante']
+            elif os.path.exists(os.path.join(self.directorio_modelos, 'modelo_actual.pkl')):
+                # Formato anterior: cuatro pickles separados
+                anterior = lambda nombre: joblib.load(os.path.join(self.directorio_modelos, f'{nombre}_actual.pkl'))
+                self.modelo = anterior('modelo')
+                self.scaler = anterior('scaler')
+                self.label_encoder_categoria = anterior('encoder_categoria')
+                self.label_encoder_fabricante = anterior('encoder_fabricante')
+            else:
+                return False
+            self.fabricantes_conocidos = list(self.label_encoder_fabricante.classes_)
+            ruta_compilado = self._ruta_compilado_vigente()
+            if ruta_compilado is not None:
+                self.bosque_compilado = BosqueCompilado.cargar(ruta_compilado)
+            else:
+                self.bosque_compilado = BosqueCompilado.desde_sklearn(self.modelo, self.scaler,
+                                                                      self.label_encoder_categoria)
+            self.modelo_entrenado = True
+            return True
+        except Exception as e:
+            print(f"Error al cargar modelo: {e}")
+            return False
+
+def entrenar_en_paralelo(fuente, configuraciones, max_hilos=None, directorio_modelos=DIRECTORIO_MODELOS):
+    """Entrenar varias configuraciones a la vez sin guardar ninguna.
+    
+    configuraciones: diccionarios de argumentos de ejecutar_entrenamiento,
+    p. ej. [{'n_estimators': 50}, {'n_estimators': 200}]. Cada una usa su
+    propio ServicioModeloIA con n_jobs=1 salvo que se indique otro valor; el
+    ajuste de los árboles libera el GIL, así que los hilos ocupan varios
+    núcleos. Devuelve [(servicio, resultado)] en el mismo orden; quien llama
+    decide cuál guardar con servicio.guardar_modelo().
+    """
+    def entrenar(configuracion):
+        servicio = ServicioModeloIA(fuente, directorio_modelos)
+        argumentos = {'n_jobs': 1, **configuracion, 'guardar': False}
+        return servicio, servicio.ejecutar_entrenamiento(**argumentos)
+    
+    with ThreadPoolExecutor(max_hilos) as ejecutor:
+        return list(ejecutor.map(entrenar, configuraciones))
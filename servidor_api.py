@@ -0,0 +1,511 @@
+# servidor_api.py - API HTTP/JSON local sobre DatabaseManager (asyncio)
+#
+# Uso: python servidor_api.py [--host 0.0.0.0] [--puerto 8080] [--db sgma_aeronaves.db] [--lectores 8]
+#                             [--modelos modelos_ia]
+#
+#   GET  /api/salud
+#   GET  /api/hangares
+#   GET  /api/aeronaves?limite=100&despues_de=<id>&matricula=CP&categoria=Pesada
+#   GET  /api/aeronaves/<id>
+#   GET  /api/aeronaves/<id>/mantenimientos
+#   POST /api/aeronaves                    {matricula, modelo, fabricante, peso_mtow, horas_vuelo, hangar_id}
+#   POST /api/aeronaves/<id>/vuelos        {horas, fecha, origen, destino} o una lista de ellos
+#   GET  /api/mantenimientos?limite=100&despues_de=<id>&estado=Programado
+#   POST /api/mantenimientos               {aeronave_id, tipo, fecha_programada, tecnico_id, descripcion,
+#                                           costo, hangar_id, duracion_dias}
+#   GET  /api/alertas?desde_version=0
+#   GET  /api/estadisticas?hangar_id=1&desde=2024-01-01&hasta=2024-12-31
+#   POST /api/predicciones                 {aeronaves: [{peso_mtow, horas_vuelo, ano_fabricacion}]}
+#   GET  /api/predicciones/metricas
+#
+# Un modelo reentrenado (desde la aplicación o 'sgma entrenar') se detecta
+# por la fecha de su archivo y se carga sin reiniciar; la caché de
+# predicciones se vacía al cambiar de modelo.
+import argparse
+import asyncio
+import json
+import math
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit, parse_qs
+from carga_diferida import ModuloDiferido
+from categorias import categorizar_aeronave
+from database import DatabaseManager, VISTAS_PAGINADAS
+from prediccion_agrupada import AgrupadorPredicciones, AgrupadorCerrado
+
+# Se importan recién al cargar el modelo: bosque_compilado sólo usa numpy,
+# servicio_modelo (respaldo si no hay modelo compilado) también sklearn
+bosque_compilado = ModuloDiferido('bosque_compilado')
+servicio_modelo = ModuloDiferido('servicio_modelo')
+
+MAX_CUERPO = 1 << 20           # 1 MB por solicitud
+MAX_LIMITE_PAGINA = 1000
+INTERVALO_RECARGA_MODELO_S = 30
+MOTIVOS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error",
+           503: "Service Unavailable"}
+
+class ErrorHTTP(Exception):
+    """Error que se responde al cliente con un código de estado y un mensaje"""
+
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+class EscritorUnico:
+    """Serializa todas las escrituras en un solo hilo con confirmación agrupada.
+
+    Las escrituras se encolan (con espera si la cola está llena) y un único
+    consumidor las toma en lotes de hasta max_lote: cada lote es una
+    transacción BEGIN IMMEDIATE con un SAVEPOINT por trabajo, de modo que un
+    trabajo fallido se revierte solo y los demás se confirman juntos con un
+    único commit. Así SQLite nunca ve dos escritores de la API compitiendo por
+    el bloqueo.
+    """
+
+    def __init__(self, db, max_lote=64, max_pendientes=1000):
+        self.db = db
+        self.max_lote = max_lote
+        self.cola = asyncio.Queue(max_pendientes)
+        self._hilo = ThreadPoolExecutor(1, thread_name_prefix="sgma-escritor")
+        self._tarea = None
+        self.lotes = 0
+        self.trabajos = 0
+
+    def iniciar(self):
+        self._tarea = asyncio.get_running_loop().create_task(self._atender())
+
+    async def ejecutar(self, funcion, *args):
+        """Encolar una escritura y esperar su resultado (o su excepción)"""
+        futuro = asyncio.get_running_loop().create_future()
+        await self.cola.put((funcion, args, futuro))
+        return await futuro
+
+    async def _atender(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = [await self.cola.get()]
+            while len(lote) < self.max_lote and not self.cola.empty():
+                lote.append(self.cola.get_nowait())
+            try:
+                resultados = await loop.run_in_executor(self._hilo, self._ejecutar_lote, lote)
+            except Exception as e:
+                resultados = [(False, e)] * len(lote)
+            for (_, _, futuro), (correcto, valor) in zip(lote, resultados):
+                if futuro.done():
+                    continue
+                if correcto:
+                    futuro.set_result(valor)
+                else:
+                    futuro.set_exception(valor)
+            self.lotes += 1
+            self.trabajos += len(lote)
+
+    def _ejecutar_lote(self, lote):
+        resultados = []
+        with self.db.conexion() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for funcion, args, _ in lote:
+                conn.execute("SAVEPOINT trabajo")
+                try:
+                    valor = funcion(*args)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO trabajo")
+                    conn.execute("RELEASE trabajo")
+                    resultados.append((False, e))
+                else:
+                    conn.execute("RELEASE trabajo")
+                    resultados.append((True, valor))
+        return resultados
+
+    async def cerrar(self):
+        if self._tarea is not None:
+            self._tarea.cancel()
+        self._hilo.shutdown(wait=True)
+
+class ServidorAPI:
+    """Servidor HTTP/1.1 (con keep-alive) que expone DatabaseManager como JSON.
+
+    Las lecturas se ejecutan en paralelo en un grupo de hilos con una
+    conexión del pool cada uno; las escrituras pasan por EscritorUnico. El
+    bucle de asyncio sólo analiza solicitudes y serializa respuestas.
+    """
+
+    def __init__(self, db_name="sgma_aeronaves.db", lectores=8, directorio_modelos="modelos_ia"):
+        # Una conexión por lector más la del escritor
+        self.db = DatabaseManager(db_name, tamano_pool=lectores + 1)
+        self.lectores = ThreadPoolExecutor(lectores, thread_name_prefix="sgma-lector")
+        self.escritor = None
+        self.directorio_modelos = directorio_modelos
+        self.modelo = None
+        self.agrupador = None
+        self._marca_modelo = None      # Fecha del archivo del modelo cargado
+        self._vigilancia = None
+        self.inicio = time.monotonic()
+        self.solicitudes = 0
+        with self.db.conexion() as conn:
+            self.columnas_aeronave = [c[1] for c in conn.execute("PRAGMA table_info(aeronaves)")]
+            self.columnas_mantenimiento = [c[1] for c in conn.execute("PRAGMA table_info(mantenimientos)")]
+        self.rutas = [
+            ("GET", r"/api/salud", self.salud),
+            ("GET", r"/api/hangares", self.hangares),
+            ("GET", r"/api/aeronaves", self.listar_aeronaves),
+            ("POST", r"/api/aeronaves", self.crear_aeronave),
+            ("GET", r"/api/aeronaves/(\d+)", self.obtener_aeronave),
+            ("GET", r"/api/aeronaves/(\d+)/mantenimientos", self.mantenimientos_aeronave),
+            ("POST", r"/api/aeronaves/(\d+)/vuelos", self.registrar_vuelos),
+            ("GET", r"/api/mantenimientos", self.listar_mantenimientos),
+            ("POST", r"/api/mantenimientos", self.crear_mantenimiento),
+            ("GET", r"/api/alertas", self.alertas),
+            ("GET", r"/api/estadisticas", self.estadisticas),
+            ("POST", r"/api/predicciones", self.predicciones),
+            ("GET", r"/api/predicciones/metricas", self.metricas_predicciones),
+        ]
+        self.rutas = [(metodo, re.compile(patron + "$"), manejador) for metodo, patron, manejador in self.rutas]
+
+    async def leer(self, funcion, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.lectores, funcion, *args)
+
+    async def escribir(self, funcion, *args):
+        return await self.escritor.ejecutar(funcion, *args)
+
+    # Ciclo de vida
+    async def iniciar(self, host="127.0.0.1", puerto=8080):
+        self.escritor = EscritorUnico(self.db)
+        self.escritor.iniciar()
+        # El modelo de IA se carga en segundo plano; mientras tanto /predicciones responde 503
+        self._vigilancia = asyncio.get_running_loop().create_task(self._vigilar_modelo())
+        self.servidor = await asyncio.start_server(self._atender_conexion, host, puerto, limit=MAX_CUERPO)
+        return self.servidor
+
+    def _archivo_modelo(self):
+        """(ruta, es_compilado) del modelo publicado; el compilado se escribe último al guardar"""
+        ruta = os.path.join(self.directorio_modelos, bosque_compilado.ARCHIVO_COMPILADO)
+        if os.path.exists(ruta):
+            return ruta, True
+        return os.path.join(self.directorio_modelos, 'modelo_actual.joblib'), False
+
+    async def _vigilar_modelo(self):
+        """Cargar el modelo y recargarlo cuando se publique uno nuevo"""
+        while True:
+            await self._cargar_modelo()
+            await asyncio.sleep(INTERVALO_RECARGA_MODELO_S)
+
+    async def _cargar_modelo(self):
+        try:
+            ruta, compilado = self._archivo_modelo()
+            if not os.path.exists(ruta):
+                return
+            marca = os.path.getmtime(ruta)
+            if marca == self._marca_modelo:
+                return
+            if compilado:
+                modelo = await self.leer(bosque_compilado.BosqueCompilado.cargar, ruta)
+            else:
+                modelo = await self.leer(servicio_modelo.ServicioModeloIA, self.db, self.directorio_modelos)
+                if not await self.leer(modelo.cargar_para_prediccion):
+                    return
+            if self.agrupador is None:
+                self.agrupador = AgrupadorPredicciones(modelo, self.lectores)
+                self.agrupador.iniciar()
+            else:
+                self.agrupador.cambiar_servicio(modelo)
+                print(f"Modelo de IA recargado desde {ruta}", flush=True)
+            self.modelo = modelo
+            self._marca_modelo = marca
+        except Exception as e:
+            print(f"No se pudo cargar el modelo de IA: {e}", flush=True)
+
+    async def cerrar(self):
+        self.servidor.close()
+        await self.servidor.wait_closed()
+        await self.escritor.cerrar()
+        if self._vigilancia is not None:
+            self._vigilancia.cancel()
+        if self.agrupador is not None:
+            await self.agrupador.cerrar()
+        self.lectores.shutdown(wait=True)
+        self.db.cerrar_conexion()
+
+    # HTTP
+    async def _atender_conexion(self, reader, writer):
+        try:
+            while True:
+                linea = await reader.readline()
+                if not linea:
+                    break
+                try:
+                    metodo, destino, version = linea.decode("latin-1").split()
+                except ValueError:
+                    break
+                encabezados = {}
+                while True:
+                    linea = await reader.readline()
+                    if linea in (b"\r\n", b"\n", b""):
+                        break
+                    clave, _, valor = linea.decode("latin-1").partition(":")
+                    encabezados[clave.strip().lower()] = valor.strip()
+
+                largo = int(encabezados.get("content-length") or 0)
+                if largo > MAX_CUERPO:
+                    estado, datos = 413, {"error": "Solicitud demasiado grande"}
+                    mantener = False
+                else:
+                    cuerpo = await reader.readexactly(largo) if largo else b""
+                    estado, datos = await self.despachar(metodo, destino, cuerpo)
+                    mantener = (version == "HTTP/1.1" and
+                                encabezados.get("connection", "").lower() != "close")
+
+                contenido = json.dumps(datos, ensure_ascii=False, default=str).encode("utf-8")
+                writer.write(f"HTTP/1.1 {estado} {MOTIVOS.get(estado, '')}\r\n"
+                             f"Content-Type: application/json; charset=utf-8\r\n"
+                             f"Content-Length: {len(contenido)}\r\n"
+                             f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n".encode("latin-1")
+                             + contenido)
+                await writer.drain()
+                if not mantener:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def despachar(self, metodo, destino, cuerpo):
+        """Resolver la ruta y devolver (estado, datos JSON)"""
+        self.solicitudes += 1
+        url = urlsplit(destino)
+        parametros = {clave: valores[-1] for clave, valores in parse_qs(url.query).items()}
+        metodos_ruta = []
+        for metodo_ruta, patron, manejador in self.rutas:
+            coincidencia = patron.match(url.path)
+            if not coincidencia:
+                continue
+            metodos_ruta.append(metodo_ruta)
+            if metodo_ruta != metodo:
+                continue
+            try:
+                if metodo == "POST":
+                    try:
+                        datos = json.loads(cuerpo or b"{}")
+                    except json.JSONDecodeError as e:
+                        raise ErrorHTTP(400, f"JSON inválido: {e.msg}")
+                    return await manejador(*coincidencia.groups(), datos)
+                return await manejador(*coincidencia.groups(), parametros)
+            except ErrorHTTP as e:
+                return e.estado, {"error": str(e)}
+            except sqlite3.IntegrityError as e:
+                return 409, {"error": f"Conflicto con datos existentes: {e}"}
+            except ValueError as e:
+                return 400, {"error": str(e)}
+            except Exception as e:
+                return 500, {"error": f"Error interno: {e}"}
+        if metodos_ruta:
+            return 405, {"error": f"Método no permitido (use {', '.join(metodos_ruta)})"}
+        return 404, {"error": f"Ruta no encontrada: {url.path}"}
+
+    # Utilidades
+    def _objeto(self, valor, descripcion):
+        if not isinstance(valor, dict):
+            raise ErrorHTTP(400, f"Se espera un objeto JSON en {descripcion}")
+        return valor
+
+    def _entero(self, parametros, clave, defecto=None):
+        valor = parametros.get(clave)
+        if valor in (None, ""):
+            return defecto
+        try:
+            return int(valor)
+        except (TypeError, ValueError):
+            raise ErrorHTTP(400, f"'{clave}' debe ser un número entero")
+
+    def _numero(self, datos, clave, defecto=None):
+        valor = datos.get(clave, defecto)
+        if valor is None:
+            raise ErrorHTTP(400, f"Falta el campo '{clave}'")
+        try:
+            numero = float(valor)
+        except (TypeError, ValueError, OverflowError):
+            raise ErrorHTTP(400, f"'{clave}' debe ser numérico")
+        if not math.isfinite(numero):
+            raise ErrorHTTP(400, f"'{clave}' debe ser un número finito")
+        return numero
+
+    def _texto(self, datos, clave):
+        valor = str(datos.get(clave) or "").strip()
+        if not valor:
+            raise ErrorHTTP(400, f"Falta el campo '{clave}'")
+        return valor
+
+    async def _hangar(self, valor):
+        """hangar_id validado (None si no se indica); las claves foráneas no se verifican en SQLite"""
+        if valor in (None, ""):
+            return None
+        try:
+            if isinstance(valor, bool) or (isinstance(valor, float) and not valor.is_integer()):
+                raise ValueError(valor)
+            hangar_id = int(valor)
+        except (TypeError, ValueError):
+            raise ErrorHTTP(400, f"hangar_id no válido: {valor!r}")
+        if hangar_id not in {h[0] for h in await self.leer(self.db.obtener_hangares)}:
+            raise ErrorHTTP(400, f"No existe el hangar con id {hangar_id}")
+        return hangar_id
+
+    async def _pagina(self, vista, parametros):
+        """Página de una vista ordenada por id, con filtros por columna y cursor despues_de"""
+        columnas = list(VISTAS_PAGINADAS[vista]['columnas'])
+        limite = self._entero(parametros, "limite", 100)
+        if limite < 1:
+            raise ErrorHTTP(400, "'limite' debe ser al menos 1")
+        limite = min(limite, MAX_LIMITE_PAGINA)
+        despues_de = self._entero(parametros, "despues_de")
+        filtros = {c: parametros[c] for c in columnas if c in parametros}
+        filas = await self.leer(self.db.obtener_pagina_vista, vista, 'id', False, filtros,
+                               (despues_de, despues_de) if despues_de is not None else None, None, 0, limite)
+        return 200, {
+            "datos": [dict(zip(columnas, fila)) for fila in filas],
+            "siguiente": filas[-1][0] if len(filas) == limite else None
+        }
+
+    # Manejadores
+    async def salud(self, parametros):
+        return 200, {
+            "estado": "ok",
+            "segundos_activo": round(time.monotonic() - self.inicio, 1),
+            "solicitudes": self.solicitudes,
+            "escrituras": self.escritor.trabajos,
+            "lotes_escritura": self.escritor.lotes,
+            "escrituras_pendientes": self.escritor.cola.qsize(),
+            "modelo_cargado": self.modelo is not None
+        }
+
+    async def hangares(self, parametros):
+        hangares = await self.leer(self.db.obtener_hangares)
+        return 200, [{"id": h[0], "nombre": h[1], "ubicacion": h[2], "capacidad": h[3], "ocupacion": h[4]}
+                     for h in hangares]
+
+    async def listar_aeronaves(self, parametros):
+        return await self._pagina('aeronaves', parametros)
+
+    async def obtener_aeronave(self, aeronave_id, parametros):
+        fila = await self.leer(self.db.obtener_aeronave_por_id, int(aeronave_id))
+        if fila is None:
+            raise ErrorHTTP(404, f"No existe la aeronave con id {aeronave_id}")
+        return 200, dict(zip(self.columnas_aeronave, fila))
+
+    async def mantenimientos_aeronave(self, aeronave_id, parametros):
+        filas = await self.leer(self.db.obtener_mantenimientos_por_aeronave, int(aeronave_id))
+        columnas = self.columnas_mantenimiento + ["tecnico_nombre"]
+        return 200, [dict(zip(columnas, fila)) for fila in filas]
+
+    async def crear_aeronave(self, datos):
+        self._objeto(datos, "el cuerpo")
+        peso_mtow = self._numero(datos, "peso_mtow")
+        if peso_mtow <= 0:
+            raise ErrorHTTP(400, "peso_mtow debe ser mayor que cero")
+        fila = (self._texto(datos, "matricula"), self._texto(datos, "modelo"), self._texto(datos, "fabricante"),
+                peso_mtow, categorizar_aeronave(peso_mtow), self._numero(datos, "horas_vuelo", 0),
+                await self._hangar(datos.get("hangar_id")))
+        if not await self.escribir(self.db.insertar_aeronave, *fila):
+            raise ErrorHTTP(409, f"La matrícula {fila[0]} ya existe")
+        return 201, {"matricula": fila[0], "categoria": fila[4]}
+
+    def _fecha(self, datos, clave):
+        """Fecha AAAA-MM-DD normalizada; hoy si no se indica"""
+        valor = datos.get(clave)
+        if valor in (None, ""):
+            return time.strftime("%Y-%m-%d")
+        try:
+            return datetime.strptime(str(valor), "%Y-%m-%d").strftime("%Y-%m-%d")
+        except ValueError:
+            raise ErrorHTTP(400, f"'{clave}' debe tener el formato AAAA-MM-DD: {valor!r}")
+
+    async def registrar_vuelos(self, aeronave_id, datos):
+        vuelos = [self._objeto(v, "cada vuelo") for v in (datos if isinstance(datos, list) else [datos])]
+        registros = [(int(aeronave_id), self._fecha(v, "fecha"),
+                      self._numero(v, "horas"), v.get("origen"), v.get("destino")) for v in vuelos]
+        if any(r[2] <= 0 for r in registros):
+            raise ErrorHTTP(400, "Las horas de cada vuelo deben ser mayores que cero")
+        if await self.leer(self.db.obtener_aeronave_por_id, int(aeronave_id)) is None:
+            raise ErrorHTTP(404, f"No existe la aeronave con id {aeronave_id}")
+        total = await self.escribir(self.db.registrar_vuelos, registros)
+        return 201, {"registrados": total}
+
+    async def listar_mantenimientos(self, parametros):
+        return await self._pagina('mantenimientos', parametros)
+
+    async def crear_mantenimiento(self, datos):
+        self._objeto(datos, "el cuerpo")
+        hangar_id = datos.get("hangar_id")
+        await self.escribir(self.db.insertar_mantenimiento,
+                            int(self._numero(datos, "aeronave_id")), self._texto(datos, "tipo"),
+                            self._texto(datos, "fecha_programada"), int(self._numero(datos, "tecnico_id")),
+                            str(datos.get("descripcion") or ""), self._numero(datos, "costo", 0),
+                            int(hangar_id) if hangar_id is not None else None,
+                            int(self._numero(datos, "duracion_dias", 1)))
+        return 201, {"programado": True}
+
+    async def alertas(self, parametros):
+        version, cambios = await self.leer(self.db.obtener_alertas_cambiadas,
+                                           self._entero(parametros, "desde_version", 0))
+        columnas = ("aeronave_id", "matricula", "modelo", "categoria", "horas_vuelo", "horas_limite", "activa")
+        return 200, {"version": version, "cambios": [dict(zip(columnas, c)) for c in cambios]}
+
+    async def estadisticas(self, parametros):
+        return 200, await self.leer(self.db.obtener_estadisticas_generales,
+                                    self._entero(parametros, "hangar_id"),
+                                    parametros.get("desde"), parametros.get("hasta"))
+
+    async def predicciones(self, datos):
+        if self.modelo is None:
+            raise ErrorHTTP(503, "No hay un modelo de IA cargado")
+        aeronaves = datos.get("aeronaves") if isinstance(datos, dict) else None
+        if not isinstance(aeronaves, list):
+            raise ErrorHTTP(400, "Se espera {\"aeronaves\": [...]}")
+        aeronaves = [self._objeto(a, "cada aeronave") for a in aeronaves]
+        X = [[self._numero(a, "peso_mtow"), self._numero(a, "horas_vuelo", 0), self._numero(a, "ano_fabricacion", 2020)]
+             for a in aeronaves]
+        if len(X) >= self.agrupador.max_lote:
+            # Un pedido grande ya es un lote: se predice entero en una llamada
+            categorias, confianzas = await self.leer(self.modelo.predecir_categorias_lote, X)
+            resultados = zip(categorias.tolist(), confianzas.tolist())
+        else:
+            try:
+                resultados = await self.agrupador.predecir_varias(X)
+            except AgrupadorCerrado as e:
+                raise ErrorHTTP(503, str(e))
+        return 200, [{"categoria": c, "confianza": round(p, 4)} for c, p in resultados]
+
+    async def metricas_predicciones(self, parametros):
+        if self.agrupador is None:
+            raise ErrorHTTP(503, "No hay un modelo de IA cargado")
+        return 200, self.agrupador.metricas()
+
+async def servir(db_name, host, puerto, lectores, directorio_modelos):
+    api = ServidorAPI(db_name, lectores, directorio_modelos)
+    servidor = await api.iniciar(host, puerto)
+    print(f"API de SGMA escuchando en http://{host}:{puerto}/api (base: {db_name})", flush=True)
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        await api.cerrar()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API HTTP/JSON local del SGMA")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8080)
+    parser.add_argument("--db", default="sgma_aeronaves.db")
+    parser.add_argument("--lectores", type=int, default=8, help="Hilos de lectura (conexiones del pool)")
+    parser.add_argument("--modelos", default="modelos_ia", help="Directorio del modelo de IA")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(servir(args.db, args.host, args.puerto, args.lectores, args.modelos))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+# sgma.py - Línea de comandos para operaciones por lotes sin interfaz gráfica
+#
+# Uso: python -m sgma [--db sgma_aeronaves.db] <comando> [opciones]
+#
+#   importar RUTA              Cargar aeronaves desde CSV o JSON Lines
+#   entrenar                   Entrenar (o ampliar) el modelo de IA
+#   predecir-lote [ENTRADA]    Predecir categorías desde un CSV o para toda la flota
+#   alertas                    Listar aeronaves que superan su umbral de horas
+#   estadisticas               Estadísticas generales, de la flota o de un hangar
+#   exportar                   Generar reportes PDF/PNG/CSV por hangar y período
+#   evaluar                    Validación cruzada y comparación de modelos de categoría
+#
+# No crea ventanas de Tk: sirve para tareas programadas en servidores sin X.
+import argparse
+import csv
+import json
+import sys
+import time
+from carga_diferida import ModuloDiferido
+from database import DatabaseManager
+
+# Módulos pesados (sklearn, matplotlib): sólo los comandos que los usan los importan
+servicio_modelo = ModuloDiferido('servicio_modelo')
+importador = ModuloDiferido('importador')
+reportes = ModuloDiferido('reportes')
+evaluacion_modelos = ModuloDiferido('evaluacion_modelos')
+
+TAMANO_LOTE_PREDICCION = 10000
+
+def progreso_consola(fraccion, mensaje):
+    print(f"\r[{fraccion:4.0%}] {mensaje:<60}", end="", file=sys.stderr, flush=True)
+
+def escribir_filas(encabezados, filas, formato, salida=None):
+    """Escribir filas como tabla alineada, CSV o JSON (una lista de objetos)"""
+    salida = salida or sys.stdout
+    if formato == "csv":
+        escritor = csv.writer(salida)
+        escritor.writerow(encabezados)
+        escritor.writerows(filas)
+    elif formato == "json":
+        json.dump([dict(zip(encabezados, fila)) for fila in filas], salida, ensure_ascii=False, indent=2)
+        salida.write("\n")
+    else:
+        textos = [[("" if v is None else f"{v:,.2f}" if isinstance(v, float) else str(v)) for v in fila]
+                  for fila in filas]
+        anchos = [max([len(e)] + [len(t[i]) for t in textos]) for i, e in enumerate(encabezados)]
+        salida.write("  ".join(e.ljust(a) for e, a in zip(encabezados, anchos)) + "\n")
+        for texto in textos:
+            salida.write("  ".join(v.ljust(a) for v, a in zip(texto, anchos)) + "\n")
+
+# Comandos
+def comando_importar(db, args):
+    resultado = importador.ImportadorAeronaves(db, tamano_lote=args.lote).importar(
+        args.ruta, formato=args.formato, progreso=progreso_consola)
+    print(file=sys.stderr)
+    print(resultado.resumen())
+    if resultado.rechazos:
+        print(f"\nPrimeros rechazos (de {resultado.total_rechazos:,}):")
+        escribir_filas(["linea", "matricula", "motivo"], resultado.rechazos[:args.mostrar_rechazos], "tabla")
+    return 0
+
+def comando_entrenar(db, args):
+    sistema = servicio_modelo.ServicioModeloIA(db)
+    sistema.max_filas_entrenamiento = args.max_filas
+    if args.ampliar:
+        resultado = sistema.ampliar_modelo(args.ampliar, progreso=progreso_consola, n_jobs=args.n_jobs)
+    else:
+        resultado = sistema.ejecutar_entrenamiento(progreso=progreso_consola, n_estimators=args.arboles,
+                                                   n_jobs=args.n_jobs)
+    print(file=sys.stderr)
+    print(f"Precisión: {resultado['precision']:.2%}\n"
+          f"Datos de entrenamiento: {resultado['total_datos']:,} aeronaves\n"
+          f"Árboles: {resultado['arboles']}\n"
+          f"Tiempo de ajuste: {resultado['tiempo_ajuste_s']:.2f} s\n"
+          f"Tamaño del modelo: {resultado['tamano_modelo_mb']:.1f} MB\n")
+    escribir_filas(["categoria", "precision", "recall", "f1", "muestras"],
+                   [(clase, r['precision'], r['recall'], r['f1-score'], int(r['support']))
+                    for clase, r in resultado['reporte_clases'].items()], "tabla")
+    return 0
+
+def _lotes_csv(ruta):
+    """Generar lotes de (filas originales, matriz peso/horas/año) desde un CSV con encabezados"""
+    with open(ruta, newline="", encoding="utf-8-sig") as archivo:
+        lector = csv.DictReader(archivo)
+        filas, X = [], []
+        for registro in lector:
+            try:
+                X.append([float(registro["peso_mtow"]), float(registro.get("horas_vuelo") or 0),
+                          float(registro.get("ano_fabricacion") or 2020)])
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f"Línea {lector.line_num}: se requieren peso_mtow y horas_vuelo numéricos")
+            filas.append(registro)
+            if len(filas) >= TAMANO_LOTE_PREDICCION:
+                yield lector.fieldnames, filas, X
+                filas, X = [], []
+        if filas:
+            yield lector.fieldnames, filas, X
+
+def comando_predecir_lote(db, args):
+    sistema = servicio_modelo.ServicioModeloIA(db)
+    if not sistema.cargar_para_prediccion():
+        print("No hay un modelo de IA entrenado (ejecute 'entrenar')", file=sys.stderr)
+        return 1
+
+    if args.entrada is None:
+        if args.reclasificar:
+            resultado = sistema.reclasificar_flota()
+            print(f"Aeronaves analizadas: {resultado['total']:,}\n"
+                  f"Categorías actualizadas: {resultado['cambios']:,}")
+            return 0
+        # Toda la flota registrada, con el mismo año estimado que el entrenamiento
+        filas = db.obtener_datos_clasificacion()
+        X = [[peso or 10000, horas or 100, 2024 - int(horas / 500) if horas and horas > 500 else 2020]
+             for _, peso, horas, _ in filas]
+        categorias, confianzas = sistema.predecir_categorias_lote(X)
+        escribir_filas(["id", "peso_mtow", "horas_vuelo", "categoria_actual", "categoria_predicha", "confianza"],
+                       [(f[0], f[1], f[2], f[3], c, round(float(p), 4))
+                        for f, c, p in zip(filas, categorias.tolist(), confianzas.tolist())],
+                       args.formato_salida)
+        return 0
+
+    salida = open(args.salida, "w", newline="", encoding="utf-8") if args.salida else sys.stdout
+    try:
+        escritor = None
+        total = 0
+        inicio = time.perf_counter()
+        for campos, filas, X in _lotes_csv(args.entrada):
+            if escritor is None:
+                escritor = csv.DictWriter(salida, fieldnames=list(campos) + ["categoria_predicha", "confianza"])
+                escritor.writeheader()
+            categorias, confianzas = sistema.predecir_categorias_lote(X)
+            for registro, categoria, confianza in zip(filas, categorias.tolist(), confianzas.tolist()):
+                registro["categoria_predicha"] = categoria
+                registro["confianza"] = round(confianza, 4)
+                escritor.writerow(registro)
+            total += len(filas)
+            print(f"\r{total:,} filas", end="", file=sys.stderr, flush=True)
+    finally:
+        if args.salida:
+            salida.close()
+    print(f"\n{total:,} predicciones en {time.perf_counter() - inicio:.2f} s", file=sys.stderr)
+    return 0
+
+def comando_alertas(db, args):
+    alertas = db.obtener_aeronaves_con_alertas()
+    limites = {a[0]: a[3] for a in db.obtener_datos_mantenimiento_flota([a[0] for a in alertas])} if alertas else {}
+    escribir_filas(["id", "matricula", "modelo", "categoria", "horas_vuelo", "horas_limite"],
+                   [(a[0], a[1], a[2], a[5], a[6], limites.get(a[0])) for a in alertas], args.formato_salida)
+    # Código 2 con alertas activas, para que una tarea programada pueda avisar
+    return 2 if alertas and args.codigo_alertas else 0
+
+def comando_estadisticas(db, args):
+    estadisticas = db.obtener_estadisticas_generales(args.hangar, args.desde, args.hasta)
+    if args.formato_salida == "json":
+        json.dump(estadisticas, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+    filas = [("aeronaves_por_categoria", clave, valor)
+             for clave, valor in sorted(estadisticas['aeronaves_por_categoria'].items())]
+    filas += [("mantenimientos_por_estado", clave, valor)
+              for clave, valor in sorted(estadisticas['mantenimientos_por_estado'].items(), key=lambda e: str(e[0]))]
+    filas.append(("costo_total_mantenimientos", "", float(estadisticas['costo_total_mantenimientos'])))
+    escribir_filas(["seccion", "clave", "valor"], filas, args.formato_salida)
+    return 0
+
+def comando_exportar(db, args):
+    hangares, periodos = reportes.interpretar_alcance(args.hangares, args.periodos)
+    formatos = [f.strip().lower() for f in args.formatos.split(",") if f.strip()]
+    solicitudes = reportes.solicitudes_lote(db, hangares, periodos)
+
+    inicio = time.perf_counter()
+    rutas = reportes.generar_lote(db.db_name, solicitudes, args.salida, formatos, args.procesos,
+                                  progreso=progreso_consola)
+    print(file=sys.stderr)
+    print(f"{len(solicitudes):,} reportes ({len(rutas):,} archivos) en "
+          f"{time.perf_counter() - inicio:.1f} s -> {args.salida}")
+    return 0
+
+def comando_evaluar(db, args):
+    sistema = servicio_modelo.ServicioModeloIA(db)
+    sistema.max_filas_entrenamiento = args.max_filas
+    X, y, _ = sistema.preparar_datos_entrenamiento()
+    resultados = evaluacion_modelos.evaluar(X, y, args.modelos, args.pliegues, args.procesos,
+                                            progreso=progreso_consola)
+    print(file=sys.stderr)
+    datos = evaluacion_modelos.informe(X, resultados, args.pliegues, args.precision_minima, db.db_name)
+    if args.formato_salida == "json":
+        json.dump(datos, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        evaluacion_modelos.escribir_tabla(datos)
+    return 0
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog="sgma", description="Sistema de Gestión de Mantenimiento de Aeronaves")
+    parser.add_argument("--db", default="sgma_aeronaves.db", help="Archivo de base de datos")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    p = comandos.add_parser("importar", help="Cargar aeronaves desde CSV o JSON Lines")
+    p.add_argument("ruta")
+    p.add_argument("--formato", choices=["csv", "jsonl"], help="Por defecto, según la extensión")
+    p.add_argument("--lote", type=int, default=1000, help="Filas por transacción")
+    p.add_argument("--mostrar-rechazos", type=int, default=20)
+    p.set_defaults(funcion=comando_importar)
+
+    p = comandos.add_parser("entrenar", help="Entrenar el modelo de IA")
+    p.add_argument("--arboles", type=int, default=100)
+    p.add_argument("--ampliar", type=int, default=0, metavar="N",
+                   help="Añadir N árboles al modelo actual en lugar de entrenar uno nuevo")
+    p.add_argument("--n-jobs", type=int, default=-1)
+    p.add_argument("--max-filas", type=int, metavar="N",
+                   help="Entrenar con una muestra de N aeronaves si la flota es mayor (acota la memoria)")
+    p.set_defaults(funcion=comando_entrenar)
+
+    p = comandos.add_parser("predecir-lote", help="Predecir categorías por lotes")
+    p.add_argument("entrada", nargs="?",
+                   help="CSV con peso_mtow, horas_vuelo y opcionalmente ano_fabricacion (por defecto, la flota)")
+    p.add_argument("--salida", help="CSV de resultados (por defecto, la salida estándar)")
+    p.add_argument("--reclasificar", action="store_true",
+                   help="Sin ENTRADA: guardar en la base la categoría predicha de cada aeronave")
+    p.add_argument("--formato-salida", choices=["tabla", "csv", "json"], default="csv")
+    p.set_defaults(funcion=comando_predecir_lote)
+
+    p = comandos.add_parser("alertas", help="Aeronaves que superan su umbral de horas")
+    p.add_argument("--formato-salida", choices=["tabla", "csv", "json"], default="tabla")
+    p.add_argument("--codigo-alertas", action="store_true", help="Terminar con código 2 si hay alertas")
+    p.set_defaults(funcion=comando_alertas)
+
+    p = comandos.add_parser("estadisticas", help="Estadísticas generales")
+    p.add_argument("--hangar", type=int)
+    p.add_argument("--desde", help="AAAA-MM-DD")
+    p.add_argument("--hasta", help="AAAA-MM-DD")
+    p.add_argument("--formato-salida", choices=["tabla", "csv", "json"], default="tabla")
+    p.set_defaults(funcion=comando_estadisticas)
+
+    p = comandos.add_parser("exportar", help="Generar reportes PDF/PNG/CSV")
+    p.add_argument("--salida", required=True, help="Directorio donde escribir los reportes")
+    p.add_argument("--hangares", default="todos", help="'todos' o ids separados por coma")
+    p.add_argument("--periodos", default="",
+                   help="Meses AAAA-MM separados por coma o un rango AAAA-MM:AAAA-MM (vacío: todo el historial)")
+    p.add_argument("--formatos", default="pdf,png,csv")
+    p.add_argument("--procesos", type=int, default=None)
+    p.set_defaults(funcion=comando_exportar)
+
+    p = comandos.add_parser("evaluar", help="Validación cruzada y comparación de modelos")
+    p.add_argument("--modelos", nargs="+",
+                   default=["reglas", "bosque", "bosque_compilado", "gradient_boosting", "hist_gradient_boosting"])
+    p.add_argument("--pliegues", type=int, default=5)
+    p.add_argument("--procesos", type=int, default=None)
+    p.add_argument("--max-filas", type=int, metavar="N", help="Evaluar con una muestra de N aeronaves")
+    p.add_argument("--precision-minima", type=float, default=0.95)
+    p.add_argument("--formato-salida", choices=["tabla", "json"], default="tabla")
+    p.set_defaults(funcion=comando_evaluar)
+    return parser
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    db = DatabaseManager(args.db)
+    try:
+        return args.funcion(db, args)
+    except (ValueError, OSError) as e:
+        print(f"\nError: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.cerrar_conexion()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+# tabla_virtual.py - Tabla con desplazamiento virtual sobre vistas paginadas
+import tkinter as tk
+from tkinter import ttk
+
+class FuenteVistaDB:
+    """Fuente de datos paginada sobre una vista de DatabaseManager"""
+
+    def __init__(self, db, vista):
+        self.db = db
+        self.vista = vista
+
+    def contar(self, filtros):
+        return self.db.contar_filas_vista(self.vista, filtros)
+
+    def obtener(self, orden, descendente, filtros, despues_de=None, antes_de=None,
+                desplazamiento=0, limite=100):
+        return self.db.obtener_pagina_vista(self.vista, orden, descendente, filtros,
+                                            despues_de, antes_de, desplazamiento, limite)
+
+class TablaVirtual(tk.Frame):
+    """Treeview que sólo materializa las filas visibles.
+
+    columnas: lista de (clave, título, ancho, formateador o None), en el mismo
+    orden en que la fuente devuelve los valores. La primera columna debe ser el
+    id único usado para la paginación por clave. Ordenar (clic en encabezado) y
+    filtrar (clic derecho en encabezado o barra de filtro) se resuelven en SQL.
+    Con un ejecutor (EjecutorTareas) el conteo y la carga inicial de cada
+    refresco se hacen fuera del hilo de Tk.
+    """
+
+    def __init__(self, parent, fuente, columnas, orden=None, descendente=False,
+                 filas_visibles=20, tamano_bloque=200, ejecutor=None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.fuente = fuente
+        self.ejecutor = ejecutor
+        self._tarea_carga = None
+        self.columnas = columnas
+        self.claves = [c[0] for c in columnas]
+        self.orden = orden or self.claves[0]
+        self.descendente = descendente
+        self.filtros = {}
+        self.filas_visibles = filas_visibles
+        self.tamano_bloque = max(tamano_bloque, filas_visibles * 2)
+
+        self.total = 0
+        self.desplazamiento = 0
+        self.bloque = []          # Filas leídas alrededor de la ventana visible
+        self.bloque_inicio = 0    # Posición absoluta de bloque[0]
+
+        self.crear_interfaz()
+
+    def crear_interfaz(self):
+        # Barra de filtro
+        filtro_frame = tk.Frame(self, bg=self['bg'])
+        filtro_frame.pack(fill='x', pady=(0, 5))
+
+        tk.Label(filtro_frame, text="Filtrar por:", bg=self['bg']).pack(side='left')
+        self.var_columna_filtro = tk.StringVar(value=self.columnas[1][1] if len(self.columnas) > 1 else self.columnas[0][1])
+        ttk.Combobox(filtro_frame, textvariable=self.var_columna_filtro, state='readonly',
+                     values=[c[1] for c in self.columnas], width=18).pack(side='left', padx=5)
+        self.var_texto_filtro = tk.StringVar()
+        self.entry_filtro = ttk.Entry(filtro_frame, textvariable=self.var_texto_filtro, width=25)
+        self.entry_filtro.pack(side='left', padx=5)
+        self.entry_filtro.bind('<Return>', lambda e: self.aplicar_filtro())
+        tk.Button(filtro_frame, text="Filtrar", command=self.aplicar_filtro,
+                  bg='#3498db', fg='white').pack(side='left', padx=5)
+        tk.Button(filtro_frame, text="Limpiar", command=self.limpiar_filtros,
+                  bg='#95a5a6', fg='white').pack(side='left', padx=5)
+        self.lbl_total = tk.Label(filtro_frame, text="", bg=self['bg'], fg='#7f8c8d')
+        self.lbl_total.pack(side='right')
+
+        # Tabla con un número fijo de filas reutilizadas
+        tabla_frame = tk.Frame(self)
+        tabla_frame.pack(fill='both', expand=True)
+
+        self.tree = ttk.Treeview(tabla_frame, columns=self.claves, show='headings',
+                                 selectmode='browse', height=self.filas_visibles)
+        for clave, titulo, ancho, _ in self.columnas:
+            self.tree.heading(clave, text=titulo, command=lambda c=clave: self.ordenar_por(c))
+            self.tree.column(clave, width=ancho, anchor='center')
+
+        self.items = [self.tree.insert('', 'end', values=()) for _ in range(self.filas_visibles)]
+
+        self.scrollbar = ttk.Scrollbar(tabla_frame, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side='right', fill='y')
+        self.tree.pack(side='left', fill='both', expand=True)
+
+        self.tree.bind('<MouseWheel>', self._on_rueda)
+        self.tree.bind('<Button-4>', lambda e: self.desplazar_a(self.desplazamiento - 3))
+        self.tree.bind('<Button-5>', lambda e: self.desplazar_a(self.desplazamiento + 3))
+        self.tree.bind('<Prior>', lambda e: self.desplazar_a(self.desplazamiento - self.filas_visibles))
+        self.tree.bind('<Next>', lambda e: self.desplazar_a(self.desplazamiento + self.filas_visibles))
+        self.tree.bind('<Button-3>', self._on_clic_derecho)
+        self._actualizar_encabezados()
+
+    # Consultas a la fuente
+    def refrescar(self):
+        """Volver a contar y leer la ventana actual (tras cambios en los datos)"""
+        argumentos = (self.orden, self.descendente, dict(self.filtros), self.desplazamiento)
+        if self.ejecutor is None:
+            self._aplicar_carga(self._cargar(*argumentos))
+            return
+        if self._tarea_carga is not None:
+            self._tarea_carga.cancelar()
+        self.lbl_total.config(text="Cargando...")
+        self._tarea_carga = self.ejecutor.enviar(self._cargar, *argumentos,
+                                                 al_terminar=self._aplicar_carga)
+
+    def _cargar(self, orden, descendente, filtros, inicio):
+        """Contar y leer el bloque inicial (puede ejecutarse fuera del hilo de Tk)"""
+        total = self.fuente.contar(filtros)
+        inicio = max(0, min(inicio, total - self.filas_visibles))
+        desde = max(0, inicio - self.tamano_bloque // 4)
+        bloque = self.fuente.obtener(orden, descendente, filtros,
+                                     desplazamiento=desde, limite=self.tamano_bloque)
+        return total, inicio, desde, bloque
+
+    def _aplicar_carga(self, carga):
+        self._tarea_carga = None
+        self.total, inicio, self.bloque_inicio, self.bloque = carga
+        self.lbl_total.config(text=f"{self.total:,} registros")
+        self.desplazar_a(inicio)
+
+    def _cursor(self, fila):
+        return (fila[self.claves.index(self.orden)], fila[0])
+
+    def _asegurar_ventana(self, inicio):
+        """Garantizar que el bloque contenga las filas [inicio, inicio + visibles)"""
+        fin = min(inicio + self.filas_visibles, self.total)
+        bloque_fin = self.bloque_inicio + len(self.bloque)
+        if self.bloque and self.bloque_inicio <= inicio and fin <= bloque_fin:
+            return
+
+        if self.bloque and self.bloque_inicio <= inicio <= bloque_fin:
+            # Avance continuo: seguir desde la última fila conocida
+            nuevas = self.fuente.obtener(self.orden, self.descendente, self.filtros,
+                                         despues_de=self._cursor(self.bloque[-1]),
+                                         limite=self.tamano_bloque)
+            self.bloque = self.bloque[inicio - self.bloque_inicio:] + nuevas
+            self.bloque_inicio = inicio
+        elif self.bloque and inicio < self.bloque_inicio <= fin:
+            # Retroceso continuo: leer hacia atrás desde la primera fila conocida
+            nuevas = self.fuente.obtener(self.orden, self.descendente, self.filtros,
+                                         antes_de=self._cursor(self.bloque[0]),
+                                         limite=self.tamano_bloque)
+            self.bloque = nuevas + self.bloque[:fin - self.bloque_inicio]
+            self.bloque_inicio -= len(nuevas)
+        else:
+            # Salto directo (barra de desplazamiento, cambio de orden o filtro)
+            desde = max(0, inicio - self.tamano_bloque // 4)
+            self.bloque = self.fuente.obtener(self.orden, self.descendente, self.filtros,
+                                              desplazamiento=desde, limite=self.tamano_bloque)
+            self.bloque_inicio = desde
+
+    def desplazar_a(self, inicio):
+        """Mostrar la ventana de filas que empieza en la posición indicada"""
+        inicio = max(0, min(int(inicio), self.total - self.filas_visibles))
+        self.desplazamiento = inicio
+        if self.total:
+            self._asegurar_ventana(inicio)
+
+        desde = inicio - self.bloque_inicio
+        for i, item in enumerate(self.items):
+            j = desde + i
+            if self.total and 0 <= j < len(self.bloque):
+                self.tree.item(item, values=self._formatear(self.bloque[j]))
+            else:
+                self.tree.item(item, values=())
+
+        if self.total:
+            self.scrollbar.set(inicio / self.total,
+                               min(1.0, (inicio + self.filas_visibles) / self.total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _formatear(self, fila):
+        valores = []
+        for valor, (_, _, _, formateador) in zip(fila, self.columnas):
+            if valor is None:
+                valores.append("")
+            elif formateador:
+                valores.append(formateador(valor))
+            else:
+                valores.append(valor)
+        return valores
+
+    def fila_seleccionada(self):
+        """Devolver los valores crudos de la fila seleccionada (o None)"""
+        seleccion = self.tree.selection()
+        if not seleccion:
+            return None
+        j = self.desplazamiento - self.bloque_inicio + self.items.index(seleccion[0])
+        return self.bloque[j] if 0 <= j < len(self.bloque) else None
+
+    # Orden y filtros
+    def ordenar_por(self, clave):
+        """Ordenar por la columna (un segundo clic invierte el sentido)"""
+        if clave == self.orden:
+            self.descendente = not self.descendente
+        else:
+            self.orden = clave
+            self.descendente = False
+        self._actualizar_encabezados()
+        self.desplazamiento = 0
+        self.refrescar()
+
+    def aplicar_filtro(self):
+        titulo = self.var_columna_filtro.get()
+        clave = next(c[0] for c in self.columnas if c[1] == titulo)
+        texto = self.var_texto_filtro.get().strip()
+        if texto:
+            self.filtros[clave] = texto
+        else:
+            self.filtros.pop(clave, None)
+        self._actualizar_encabezados()
+        self.desplazamiento = 0
+        self.refrescar()
+
+    def limpiar_filtros(self):
+        self.filtros = {}
+        self.var_texto_filtro.set("")
+        self._actualizar_encabezados()
+        self.desplazamiento = 0
+        self.refrescar()
+
+    def _actualizar_encabezados(self):
+        for clave, titulo, _, _ in self.columnas:
+            texto = titulo
+            if clave in self.filtros:
+                texto += " *"
+            if clave == self.orden:
+                texto += " ▼" if self.descendente else " ▲"
+            self.tree.heading(clave, text=texto)
+
+    # Eventos
+    def _on_scrollbar(self, accion, valor, unidad=None):
+        if accion == 'moveto':
+            self.desplazar_a(float(valor) * self.total)
+        elif accion == 'scroll':
+            paso = self.filas_visibles if unidad == 'pages' else 1
+            self.desplazar_a(self.desplazamiento + int(valor) * paso)
+
+    def _on_rueda(self, event):
+        self.desplazar_a(self.desplazamiento - int(event.delta / 120) * 3)
+        return 'break'
+
+    def _on_clic_derecho(self, event):
+        """Clic derecho en un encabezado: filtrar por esa columna"""
+        if self.tree.identify_region(event.x, event.y) != 'heading':
+            return
+        indice = int(self.tree.identify_column(event.x).lstrip('#')) - 1
+        self.var_columna_filtro.set(self.columnas[indice][1])
+        self.var_texto_filtro.set(self.filtros.get(self.columnas[indice][0], ""))
+        self.entry_filtro.focus_set()
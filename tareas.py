@@ -0,0 +1,135 @@
+# tareas.py - Ejecutor de tareas en segundo plano con despacho seguro hacia Tk
+import queue
+import threading
+import traceback
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, CancelledError
+
+class TareaCancelada(Exception):
+    """Se lanza dentro de una tarea cuando fue cancelada desde la interfaz"""
+
+class Tarea:
+    """Manejador de una tarea enviada al ejecutor.
+
+    La función de trabajo puede recibirlo (con_progreso=True) para informar
+    avance con reportar_progreso(), que además interrumpe la tarea lanzando
+    TareaCancelada si el usuario la canceló.
+    """
+
+    def __init__(self, ejecutor, al_progreso=None):
+        self._ejecutor = ejecutor
+        self._al_progreso = al_progreso
+        self._cancelada = threading.Event()
+        self.futuro = None
+
+    @property
+    def cancelada(self):
+        return self._cancelada.is_set()
+
+    def cancelar(self):
+        """Cancelar la tarea: si no empezó no se ejecuta y su resultado se descarta"""
+        self._cancelada.set()
+        if self.futuro is not None:
+            self.futuro.cancel()
+
+    def verificar_cancelacion(self):
+        if self._cancelada.is_set():
+            raise TareaCancelada()
+
+    def reportar_progreso(self, fraccion, mensaje=""):
+        """Informar avance (0..1) desde el hilo de trabajo"""
+        self.verificar_cancelacion()
+        if self._al_progreso is not None:
+            self._ejecutor._despachar(self, self._al_progreso, fraccion, mensaje)
+
+class EjecutorTareas:
+    """Pool de hilos (y opcionalmente de procesos) compartido por las ventanas.
+
+    Los callbacks al_terminar / al_error / al_progreso nunca se llaman desde el
+    hilo de trabajo: se encolan y el hilo de Tk los ejecuta al sondear la cola
+    con after(), por lo que pueden tocar widgets con seguridad.
+    """
+
+    def __init__(self, raiz, max_hilos=4, max_procesos=None, intervalo_ms=50):
+        self.raiz = raiz
+        self.intervalo_ms = intervalo_ms
+        self.max_procesos = max_procesos
+        self._hilos = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="sgma-tarea")
+        self._procesos = None
+        self._cola = queue.Queue()
+        self._cerrado = False
+        self._id_sondeo = self.raiz.after(self.intervalo_ms, self._sondear)
+
+    def enviar(self, funcion, *args, al_terminar=None, al_error=None, al_progreso=None,
+               con_progreso=False, en_proceso=False, **kwargs):
+        """Ejecutar funcion(*args, **kwargs) en segundo plano y devolver su Tarea.
+
+        con_progreso=True pasa la Tarea como argumento 'tarea'. en_proceso=True
+        usa el pool de procesos (la función y sus argumentos deben poder
+        serializarse; no admite progreso).
+        """
+        tarea = Tarea(self, al_progreso)
+        if en_proceso:
+            if self._procesos is None:
+                self._procesos = ProcessPoolExecutor(max_workers=self.max_procesos)
+            tarea.futuro = self._procesos.submit(funcion, *args, **kwargs)
+        else:
+            if con_progreso:
+                kwargs['tarea'] = tarea
+            tarea.futuro = self._hilos.submit(funcion, *args, **kwargs)
+        tarea.futuro.add_done_callback(
+            lambda futuro: self._al_finalizar(tarea, futuro, al_terminar, al_error))
+        return tarea
+
+    def _al_finalizar(self, tarea, futuro, al_terminar, al_error):
+        if tarea.cancelada or futuro.cancelled():
+            return
+        try:
+            resultado = futuro.result()
+        except (TareaCancelada, CancelledError):
+            return
+        except Exception as e:
+            if al_error is not None:
+                self._despachar(tarea, al_error, e)
+            else:
+                print(f"Error en tarea en segundo plano: {e}")
+            return
+        if al_terminar is not None:
+            self._despachar(tarea, al_terminar, resultado)
+
+    def _despachar(self, tarea, callback, *args):
+        self._cola.put((tarea, callback, args))
+
+    def _sondear(self):
+        """Ejecutar en el hilo de Tk los callbacks pendientes"""
+        try:
+            while True:
+                try:
+                    tarea, callback, args = self._cola.get_nowait()
+                except queue.Empty:
+                    break
+                if tarea.cancelada:
+                    continue
+                try:
+                    callback(*args)
+                except tk.TclError:
+                    # La ventana que pidió la tarea ya fue cerrada
+                    pass
+                except Exception:
+                    # Un callback fallido no debe detener el despacho de las demás ventanas
+                    print("Error en callback de tarea en segundo plano:")
+                    traceback.print_exc()
+        finally:
+            if not self._cerrado:
+                self._id_sondeo = self.raiz.after(self.intervalo_ms, self._sondear)
+
+    def cerrar(self):
+        """Detener el sondeo y los pools sin esperar tareas pendientes"""
+        self._cerrado = True
+        try:
+            self.raiz.after_cancel(self._id_sondeo)
+        except tk.TclError:
+            pass
+        self._hilos.shutdown(wait=False, cancel_futures=True)
+        if self._procesos is not None:
+            self._procesos.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,17 @@
+# conftest.py - Configuración común de las pruebas
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from database import DatabaseManager
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Base temporal con el esquema migrado y los datos iniciales"""
+    db = DatabaseManager(str(tmp_path / "prueba.db"))
+    yield db
+    db.cerrar_conexion()
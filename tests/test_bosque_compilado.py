@@ -0,0 +1,82 @@
+# test_bosque_compilado.py - El bosque compilado reproduce exactamente a sklearn
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from bosque_compilado import ARCHIVO_COMPILADO, BosqueCompilado
+
+CATEGORIAS = ['Liviana', 'Mediana', 'Pesada', 'Helicóptero']
+
+
+@pytest.fixture(scope="module")
+def entrenado():
+    """Bosque chico entrenado como en ServicioModeloIA (peso_mtow, horas_vuelo, año)"""
+    rng = np.random.default_rng(7)
+    X = np.column_stack([
+        rng.integers(500, 80000, 400).astype(float),
+        np.round(rng.uniform(0, 20000, 400), 1),
+        rng.integers(1970, 2024, 400).astype(float),
+    ])
+    y = np.where(X[:, 0] < 5700, 'Liviana', np.where(X[:, 0] < 30000, 'Mediana', 'Pesada')).astype(object)
+    y[rng.random(400) < 0.15] = 'Helicóptero'
+
+    scaler = StandardScaler().fit(X)
+    codificador = LabelEncoder().fit(CATEGORIAS)
+    # n_jobs=1: la suma de los árboles en paralelo no sigue un orden fijo
+    modelo = RandomForestClassifier(n_estimators=15, max_depth=8, random_state=0, n_jobs=1)
+    modelo.fit(scaler.transform(X), codificador.transform(y))
+    return modelo, scaler, codificador, X
+
+
+def filas_en_umbrales(modelo, scaler):
+    """Filas sin escalar cuyo valor escalado cae sobre los umbrales de los árboles o a un ulp"""
+    filas = []
+    for estimador in modelo.estimators_:
+        arbol = estimador.tree_
+        for nodo in np.flatnonzero(arbol.children_left >= 0):
+            f = arbol.feature[nodo]
+            for umbral in (arbol.threshold[nodo], np.float64(np.float32(arbol.threshold[nodo]))):
+                valor = umbral * scaler.scale_[f] + scaler.mean_[f]
+                for crudo in (np.nextafter(valor, -np.inf), valor, np.nextafter(valor, np.inf)):
+                    fila = scaler.mean_.copy()
+                    fila[f] = crudo
+                    filas.append(fila)
+    return np.array(filas)
+
+
+def test_predict_proba_igual_a_sklearn(entrenado):
+    modelo, scaler, codificador, X = entrenado
+    bosque = BosqueCompilado.desde_sklearn(modelo, scaler, codificador)
+
+    assert np.array_equal(bosque.predict_proba(X), modelo.predict_proba(scaler.transform(X)))
+
+
+def test_valores_sobre_los_umbrales(entrenado):
+    modelo, scaler, codificador, _ = entrenado
+    bosque = BosqueCompilado.desde_sklearn(modelo, scaler, codificador)
+    X = filas_en_umbrales(modelo, scaler)
+
+    # Al menos una fila tiene que caer exactamente sobre un umbral en float32
+    escalado = scaler.transform(X).astype(np.float32)
+    umbrales = np.concatenate([e.tree_.threshold[e.tree_.children_left >= 0] for e in modelo.estimators_])
+    assert np.isin(escalado.astype(np.float64), umbrales).any()
+
+    assert np.array_equal(bosque.predict_proba(X), modelo.predict_proba(scaler.transform(X)))
+
+
+def test_guardar_y_cargar(entrenado, tmp_path):
+    modelo, scaler, codificador, X = entrenado
+    bosque = BosqueCompilado.desde_sklearn(modelo, scaler, codificador)
+    ruta = tmp_path / ARCHIVO_COMPILADO
+    bosque.guardar(str(ruta))
+    cargado = BosqueCompilado.cargar(str(ruta))
+
+    assert (cargado.arboles, cargado.nodos, cargado.profundidad) == (bosque.arboles, bosque.nodos, bosque.profundidad)
+    assert list(cargado.categorias) == list(bosque.categorias)
+    X = np.vstack([X, filas_en_umbrales(modelo, scaler)])
+    assert np.array_equal(cargado.predict_proba(X), modelo.predict_proba(scaler.transform(X)))
+    categorias, confianzas = cargado.predecir_categorias_lote(X[:20])
+    esperadas = codificador.inverse_transform(modelo.predict(scaler.transform(X[:20])))
+    assert list(categorias) == list(esperadas)
+    assert np.array_equal(confianzas, modelo.predict_proba(scaler.transform(X[:20])).max(axis=1))
@@ -0,0 +1,141 @@
+# test_migraciones.py - Migraciones en el lugar e índices de las consultas principales
+import sqlite3
+
+import pytest
+
+from database import DatabaseManager
+from migraciones import MIGRACIONES, version_esquema
+
+# Esquema creado por las versiones sin migraciones (user_version = 0)
+ESQUEMA_BASE = """
+CREATE TABLE aeronaves (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    matricula TEXT UNIQUE NOT NULL,
+    modelo TEXT NOT NULL,
+    fabricante TEXT NOT NULL,
+    peso_mtow REAL NOT NULL,
+    categoria TEXT NOT NULL,
+    horas_vuelo REAL NOT NULL,
+    hangar_id INTEGER,
+    fecha_registro TEXT NOT NULL
+);
+CREATE TABLE hangares (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre TEXT NOT NULL,
+    ubicacion TEXT NOT NULL,
+    capacidad INTEGER NOT NULL,
+    ocupacion INTEGER DEFAULT 0
+);
+CREATE TABLE tecnicos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre TEXT NOT NULL,
+    especialidad TEXT NOT NULL,
+    licencia TEXT UNIQUE NOT NULL,
+    activo BOOLEAN DEFAULT TRUE
+);
+CREATE TABLE mantenimientos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    aeronave_id INTEGER NOT NULL,
+    tipo TEXT NOT NULL,
+    fecha_programada TEXT NOT NULL,
+    tecnico_id INTEGER NOT NULL,
+    descripcion TEXT,
+    estado TEXT DEFAULT 'Programado',
+    fecha_creacion TEXT NOT NULL,
+    costo REAL DEFAULT 0
+);
+CREATE TABLE piezas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre TEXT NOT NULL,
+    descripcion TEXT,
+    stock INTEGER NOT NULL DEFAULT 0,
+    precio REAL NOT NULL,
+    proveedor TEXT,
+    fecha_actualizacion TEXT NOT NULL
+);
+CREATE TABLE mantenimiento_piezas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    mantenimiento_id INTEGER NOT NULL,
+    pieza_id INTEGER NOT NULL,
+    cantidad INTEGER NOT NULL
+);
+INSERT INTO hangares (nombre, ubicacion, capacidad) VALUES ('Hangar A', 'El Alto', 5);
+INSERT INTO tecnicos (nombre, especialidad, licencia) VALUES ('Carlos Mendoza', 'Motores', 'AMT-001');
+INSERT INTO aeronaves (matricula, modelo, fabricante, peso_mtow, categoria, horas_vuelo, hangar_id, fecha_registro)
+VALUES ('CP-2001', 'Cessna 172', 'Cessna', 1111, 'Liviana', 150, 1, '2024-01-01'),
+       ('CP-2002', 'ATR 72', 'ATR', 23000, 'Mediana', 80, 1, '2024-01-01');
+INSERT INTO mantenimientos (aeronave_id, tipo, fecha_programada, tecnico_id, descripcion, fecha_creacion)
+VALUES (1, 'Preventivo', '2024-02-01', 1, 'Inspección 100 h', '2024-01-15 10:00');
+"""
+
+# (consulta, parámetros, índice que debe usar)
+CONSULTAS = {
+    "mantenimientos_por_aeronave": (
+        """SELECT m.*, t.nombre as tecnico_nombre
+           FROM mantenimientos m
+           JOIN tecnicos t ON m.tecnico_id = t.id
+           WHERE m.aeronave_id = ?
+           ORDER BY m.fecha_programada DESC""", (1,), "idx_mantenimientos_aeronave_fecha"),
+    "historial_por_fecha": (
+        """SELECT m.*, a.matricula, a.modelo, t.nombre as tecnico_nombre
+           FROM mantenimientos m
+           JOIN aeronaves a ON m.aeronave_id = a.id
+           JOIN tecnicos t ON m.tecnico_id = t.id
+           ORDER BY m.fecha_programada DESC""", (), "idx_mantenimientos_fecha"),
+    "mantenimientos_por_estado": (
+        "SELECT COUNT(*) FROM mantenimientos WHERE estado = ?", ("En Proceso",),
+        "idx_mantenimientos_estado"),
+    "alertas_por_categoria_y_horas": (
+        "SELECT id, horas_vuelo FROM aeronaves WHERE categoria = ? AND horas_vuelo > ?", ("Liviana", 100),
+        "idx_aeronaves_categoria_horas"),
+    "piezas_por_mantenimiento": (
+        "SELECT * FROM mantenimiento_piezas WHERE mantenimiento_id = ?", (1,),
+        "idx_mantenimiento_piezas_mantenimiento"),
+}
+
+
+@pytest.fixture
+def base_migrada(tmp_path):
+    """Base con el esquema sin migraciones, abierta (y migrada) por DatabaseManager"""
+    ruta = str(tmp_path / "base.db")
+    conn = sqlite3.connect(ruta)
+    conn.executescript(ESQUEMA_BASE)
+    conn.close()
+    db = DatabaseManager(ruta)
+    yield db
+    db.cerrar_conexion()
+
+
+def plan(conn, consulta, parametros):
+    return [fila[3] for fila in conn.execute("EXPLAIN QUERY PLAN " + consulta, parametros)]
+
+
+def escaneos_completos(lineas):
+    """Líneas 'SCAN aeronaves' o 'SCAN mantenimientos' (o sus alias a y m) sin índice"""
+    return [linea for linea in lineas
+            if linea.split()[:1] == ["SCAN"] and linea.split()[1] in ("aeronaves", "a", "mantenimientos", "m")
+            and "USING" not in linea]
+
+
+def test_migra_en_el_lugar(base_migrada):
+    with base_migrada.conexion() as conn:
+        assert version_esquema(conn) == max(version for version, _, _ in MIGRACIONES)
+        matriculas = [fila[0] for fila in conn.execute("SELECT matricula FROM aeronaves ORDER BY id")]
+        mantenimientos = conn.execute("SELECT COUNT(*) FROM mantenimientos").fetchone()[0]
+    assert matriculas == ["CP-2001", "CP-2002"]
+    assert mantenimientos == 1
+    # La aeronave que ya superaba su umbral queda con alerta materializada
+    assert [a[1] for a in base_migrada.obtener_aeronaves_con_alertas()] == ["CP-2001"]
+
+
+def test_migraciones_no_se_repiten(base_migrada):
+    assert base_migrada.migrar_esquema() == []
+
+
+@pytest.mark.parametrize("nombre", sorted(CONSULTAS))
+def test_consulta_usa_indice(base_migrada, nombre):
+    consulta, parametros, indice = CONSULTAS[nombre]
+    with base_migrada.conexion() as conn:
+        lineas = plan(conn, consulta, parametros)
+    assert any(indice in linea for linea in lineas), lineas
+    assert not escaneos_completos(lineas), lineas
@@ -1,6 +1,9 @@
 # ventana_aeronaves.py - Ventanas para gestión de aeronaves
 import tkinter as tk
-from tkinter import ttk, messagebox
+from datetime import datetime
+from tkinter import ttk, messagebox, filedialog
+from tabla_virtual import TablaVirtual, FuenteVistaDB
+from importador import ImportadorAeronaves
 
 class VentanaRegistroAeronave(tk.Toplevel):
     def __init__(self, parent):
@@ -85,23 +88,29 @@ class VentanaRegistroAeronave(tk.Toplevel):
         """Usar IA para predecir categoría y sugerir fabricante"""
         try:
             peso = float(self.var_peso_mtow.get())
-            # Predecir categoría usando IA
-            categoria, confianza = self.parent.ia_sistema.predecir_categoria(peso, 0)
-            
-            # Sugerir fabricante
-            fabricantes_sugeridos = self.parent.ia_sistema.sugerir_fabricante(peso, categoria)
-            
-            # Actualizar interfaz
-            self.lbl_sugerencia.config(
-                text=f"IA sugiere: Categoría {categoria} | Fabricantes: {', '.join(fabricantes_sugeridos[:3])}"
-            )
-            
-            # Autocompletar fabricante si es posible
-            if fabricantes_sugeridos:
-                self.var_fabricante.set(fabricantes_sugeridos[0])
-                
         except ValueError:
             messagebox.showerror("Error", "Ingrese un peso válido primero")
+            return
+        
+        # Predecir categoría usando IA en segundo plano
+        self.lbl_sugerencia.config(text="IA analizando...")
+        self.parent.tareas.enviar(
+            self.parent.ia_sistema.predecir_categoria, peso, 0,
+            al_terminar=lambda resultado: self._mostrar_sugerencia(peso, *resultado)
+        )
+    
+    def _mostrar_sugerencia(self, peso, categoria, confianza):
+        # Sugerir fabricante
+        fabricantes_sugeridos = self.parent.ia_sistema.sugerir_fabricante(peso, categoria)
+        
+        # Actualizar interfaz
+        self.lbl_sugerencia.config(
+            text=f"IA sugiere: Categoría {categoria} | Fabricantes: {', '.join(fabricantes_sugeridos[:3])}"
+        )
+        
+        # Autocompletar fabricante si es posible
+        if fabricantes_sugeridos:
+            self.var_fabricante.set(fabricantes_sugeridos[0])
             
     def guardar_aeronave(self):
         """Validar y guardar la aeronave en la base de datos"""
@@ -161,32 +170,264 @@ class VentanaListaAeronaves(tk.Toplevel):
         tk.Label(self, text="Aeronaves Registradas", font=('Arial', 18, 'bold'), 
                 bg='#ecf0f1', fg='#2c3e50').pack(pady=20)
         
-        # Treeview
-        columns = ("ID", "Matrícula", "Modelo", "Fabricante", "Peso MTOW", "Categoría", "Horas Vuelo", "Hangar")
-        self.tree = ttk.Treeview(self, columns=columns, show='headings', selectmode='browse')
+        # Tabla virtual: sólo se materializan las filas visibles
+        columnas = [
+            ("id", "ID", 60, None),
+            ("matricula", "Matrícula", 100, None),
+            ("modelo", "Modelo", 150, None),
+            ("fabricante", "Fabricante", 100, None),
+            ("peso_mtow", "Peso MTOW", 110, lambda v: f"{v:,.2f} kg"),
+            ("categoria", "Categoría", 100, None),
+            ("horas_vuelo", "Horas Vuelo", 100, lambda v: f"{v:,.1f} h"),
+            ("hangar", "Hangar", 150, None)
+        ]
+        self.tabla = TablaVirtual(self, FuenteVistaDB(self.parent.db, 'aeronaves'), columnas,
+                                  ejecutor=self.parent.tareas, bg='#ecf0f1')
+        self.tabla.pack(fill='both', expand=True, padx=20, pady=10)
+        self.tree = self.tabla.tree
+    
+    def actualizar_lista(self):
+        # Recontar y releer sólo la ventana visible
+        self.tabla.refrescar()
+
+class VentanaImportarFlota(tk.Toplevel):
+    """Importación masiva de aeronaves desde CSV o JSON Lines"""
+    
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.parent = parent
+        self.title("Importar Flota")
+        self.geometry("800x550")
+        self.configure(bg='#ecf0f1')
+        
+        self.var_archivo = tk.StringVar()
+        self.var_tamano_lote = tk.StringVar(value="1000")
+        self.tarea = None
         
-        for col in columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=100, anchor='center')
+        self.crear_interfaz()
+        self.protocol("WM_DELETE_WINDOW", self.cerrar)
+    
+    def crear_interfaz(self):
+        tk.Label(self, text="Importar Flota (CSV / JSON Lines)", font=('Arial', 18, 'bold'), 
+                bg='#ecf0f1', fg='#2c3e50').pack(pady=20)
         
-        self.tree.column("Modelo", width=150)
-        self.tree.column("Hangar", width=150)
+        form_frame = tk.Frame(self, bg='#ecf0f1')
+        form_frame.pack(padx=20, fill='x')
         
-        scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        tk.Label(form_frame, text="Archivo:", font=('Arial', 12), 
+                bg='#ecf0f1').grid(row=0, column=0, sticky='w', pady=5)
+        tk.Entry(form_frame, textvariable=self.var_archivo, font=('Arial', 11), 
+                width=50).grid(row=0, column=1, padx=10, pady=5)
+        tk.Button(form_frame, text="Examinar...", command=self.seleccionar_archivo,
+                 bg='#3498db', fg='white').grid(row=0, column=2, pady=5)
+        
+        tk.Label(form_frame, text="Filas por lote:", font=('Arial', 12), 
+                bg='#ecf0f1').grid(row=1, column=0, sticky='w', pady=5)
+        tk.Entry(form_frame, textvariable=self.var_tamano_lote, font=('Arial', 11), 
+                width=10).grid(row=1, column=1, sticky='w', padx=10, pady=5)
+        
+        tk.Label(form_frame, text="Columnas: matricula, modelo, fabricante, peso_mtow, "
+                                  "horas_vuelo, hangar (nombre) o hangar_id",
+                font=('Arial', 9), bg='#ecf0f1', fg='#7f8c8d').grid(row=2, column=0, columnspan=3, sticky='w')
+        
+        btn_frame = tk.Frame(self, bg='#ecf0f1')
+        btn_frame.pack(pady=10)
+        
+        self.btn_importar = tk.Button(btn_frame, text="Importar", command=self.importar,
+                                      bg='#2ecc71', fg='white', font=('Arial', 12), width=12)
+        self.btn_importar.pack(side='left', padx=10)
+        self.btn_cancelar = tk.Button(btn_frame, text="Detener", command=self.detener,
+                                      bg='#e74c3c', fg='white', font=('Arial', 12), width=12,
+                                      state='disabled')
+        self.btn_cancelar.pack(side='left', padx=10)
+        
+        self.progress = ttk.Progressbar(self, mode='determinate', maximum=1.0)
+        self.progress.pack(fill='x', padx=20)
+        self.lbl_estado = tk.Label(self, text="", bg='#ecf0f1', fg='#2c3e50', justify='left')
+        self.lbl_estado.pack(anchor='w', padx=20, pady=5)
+        
+        # Filas rechazadas
+        tabla_frame = tk.Frame(self)
+        tabla_frame.pack(fill='both', expand=True, padx=20, pady=10)
+        
+        self.tree = ttk.Treeview(tabla_frame, columns=('Línea', 'Matrícula', 'Motivo'), show='headings')
+        for col, ancho in (('Línea', 70), ('Matrícula', 120), ('Motivo', 500)):
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=ancho, anchor='center' if col != 'Motivo' else 'w')
         
-        self.tree.pack(fill='both', expand=True, padx=20, pady=10)
+        scrollbar = ttk.Scrollbar(tabla_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side='left', fill='both', expand=True)
         scrollbar.pack(side='right', fill='y')
     
-    def actualizar_lista(self):
-        # Limpiar datos antiguos
+    def seleccionar_archivo(self):
+        ruta = filedialog.askopenfilename(
+            parent=self, title="Seleccionar archivo de flota",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl *.ndjson *.json"), ("Todos", "*.*")]
+        )
+        if ruta:
+            self.var_archivo.set(ruta)
+    
+    def importar(self):
+        ruta = self.var_archivo.get().strip()
+        if not ruta:
+            messagebox.showerror("Error", "Seleccione un archivo", parent=self)
+            return
+        try:
+            tamano_lote = int(self.var_tamano_lote.get())
+            if tamano_lote <= 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "El tamaño de lote debe ser un entero positivo", parent=self)
+            return
+        
         for item in self.tree.get_children():
             self.tree.delete(item)
+        self.progress['value'] = 0
+        self.lbl_estado.config(text="Importando...")
+        self.btn_importar.config(state='disabled')
+        self.btn_cancelar.config(state='normal')
         
-        # Obtener y cargar nuevos datos
-        aeronaves = self.parent.db.obtener_aeronaves()
-        for a in aeronaves:
-            self.tree.insert('', 'end', values=(
-                a[0], a[1], a[2], a[3], f"{a[4]:,.2f} kg", 
-                a[5], f"{a[6]:,.1f} h", a[8]
-            ))
\ No newline at end of file
+        importador = ImportadorAeronaves(self.parent.db, tamano_lote=tamano_lote)
+        self.tarea = self.parent.tareas.enviar(
+            lambda tarea: importador.importar(ruta, progreso=tarea.reportar_progreso),
+            con_progreso=True,
+            al_terminar=self.importacion_terminada,
+            al_error=self.importacion_fallida,
+            al_progreso=self.mostrar_progreso
+        )
+    
+    def mostrar_progreso(self, fraccion, mensaje):
+        self.progress['value'] = fraccion
+        self.lbl_estado.config(text=mensaje)
+    
+    def importacion_terminada(self, resultado):
+        self._fin_importacion()
+        self.progress['value'] = 1.0
+        self.lbl_estado.config(text=resultado.resumen())
+        for rechazo in resultado.rechazos:
+            self.tree.insert('', 'end', values=rechazo)
+        if resultado.total_rechazos > len(resultado.rechazos):
+            self.tree.insert('', 'end', values=("...", "", 
+                             f"{resultado.total_rechazos - len(resultado.rechazos):,} rechazos más"))
+    
+    def importacion_fallida(self, error):
+        self._fin_importacion()
+        self.lbl_estado.config(text="")
+        messagebox.showerror("Error", f"No se pudo importar el archivo: {error}", parent=self)
+    
+    def detener(self):
+        """Detener tras el lote en curso; los lotes ya cargados se conservan"""
+        if self.tarea is not None:
+            self.tarea.cancelar()
+        self._fin_importacion()
+        self.lbl_estado.config(text="Importación detenida")
+    
+    def _fin_importacion(self):
+        self.tarea = None
+        self.btn_importar.config(state='normal')
+        self.btn_cancelar.config(state='disabled')
+    
+    def cerrar(self):
+        if self.tarea is not None:
+            self.tarea.cancelar()
+        self.destroy()
+
+class VentanaRegistroVuelos(tk.Toplevel):
+    """Registro de vuelos y utilización mensual por aeronave"""
+    
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.parent = parent
+        self.title("Registro de Vuelos")
+        self.geometry("700x600")
+        self.configure(bg='#ecf0f1')
+        
+        self.var_aeronave = tk.StringVar()
+        self.var_fecha = tk.StringVar(value=datetime.now().strftime("%Y-%m-%d"))
+        self.var_horas = tk.StringVar()
+        self.var_origen = tk.StringVar()
+        self.var_destino = tk.StringVar()
+        
+        self.crear_interfaz()
+    
+    def crear_interfaz(self):
+        tk.Label(self, text="Registro de Vuelos", font=('Arial', 18, 'bold'), 
+                bg='#ecf0f1', fg='#2c3e50').pack(pady=20)
+        
+        main_frame = tk.Frame(self, bg='#ecf0f1')
+        main_frame.pack(padx=40, fill='x')
+        
+        tk.Label(main_frame, text="Aeronave:", bg='#ecf0f1').grid(row=0, column=0, sticky='w', pady=5)
+        aeronaves = [f"{a[0]}|{a[1]} - {a[2]}" for a in self.parent.db.obtener_aeronaves()]
+        combo = ttk.Combobox(main_frame, textvariable=self.var_aeronave, values=aeronaves, width=40)
+        combo.grid(row=0, column=1, pady=5)
+        combo.bind('<<ComboboxSelected>>', lambda e: self.actualizar_utilizacion())
+        
+        campos = [
+            ("Fecha (AAAA-MM-DD):", self.var_fecha),
+            ("Horas de vuelo:", self.var_horas),
+            ("Origen:", self.var_origen),
+            ("Destino:", self.var_destino)
+        ]
+        for i, (texto, var) in enumerate(campos, 1):
+            tk.Label(main_frame, text=texto, bg='#ecf0f1').grid(row=i, column=0, sticky='w', pady=5)
+            ttk.Entry(main_frame, textvariable=var, width=43).grid(row=i, column=1, pady=5)
+        
+        tk.Button(main_frame, text="Registrar Vuelo", command=self.registrar_vuelo,
+                 bg='#2ecc71', fg='white', font=('Arial', 12)).grid(row=len(campos)+1, column=0, 
+                                                                   columnspan=2, pady=15)
+        
+        # Utilización mensual (leída de los resúmenes, no del registro completo)
+        tk.Label(self, text="Utilización mensual", font=('Arial', 12, 'bold'), 
+                bg='#ecf0f1', fg='#2c3e50').pack()
+        self.tree = ttk.Treeview(self, columns=('Mes', 'Horas', 'Vuelos'), show='headings', height=10)
+        for col in ('Mes', 'Horas', 'Vuelos'):
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=150, anchor='center')
+        self.tree.pack(fill='both', expand=True, padx=40, pady=10)
+    
+    def _aeronave_id(self):
+        try:
+            return int(self.var_aeronave.get().split("|")[0])
+        except ValueError:
+            return None
+    
+    def registrar_vuelo(self):
+        aeronave_id = self._aeronave_id()
+        if aeronave_id is None:
+            messagebox.showerror("Error", "Seleccione una aeronave", parent=self)
+            return
+        try:
+            horas = float(self.var_horas.get())
+            fecha = datetime.strptime(self.var_fecha.get(), "%Y-%m-%d").strftime("%Y-%m-%d")
+            if horas <= 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "Ingrese una fecha válida y horas mayores que cero", parent=self)
+            return
+        
+        self.parent.tareas.enviar(
+            self.parent.db.registrar_vuelo, aeronave_id, horas, fecha,
+            self.var_origen.get() or None, self.var_destino.get() or None,
+            al_terminar=lambda _: self._vuelo_registrado(),
+            al_error=lambda error: messagebox.showerror(
+                "Error", f"No se pudo registrar el vuelo: {error}", parent=self)
+        )
+    
+    def _vuelo_registrado(self):
+        self.var_horas.set("")
+        self.actualizar_utilizacion()
+    
+    def actualizar_utilizacion(self):
+        aeronave_id = self._aeronave_id()
+        if aeronave_id is None:
+            return
+        self.parent.tareas.enviar(self.parent.db.obtener_tendencia_aeronave, aeronave_id,
+                                  al_terminar=self.mostrar_utilizacion)
+    
+    def mostrar_utilizacion(self, tendencia):
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        for mes, horas, vuelos in tendencia:
+            self.tree.insert('', 'end', values=(mes, f"{horas:,.1f} h", vuelos))
@@ -1,6 +1,10 @@
 # ventana_gestion.py - Ventanas para gestión de recursos
 import tkinter as tk
 from tkinter import ttk, messagebox
+from carga_diferida import ModuloDiferido
+
+# Usa numpy: se importa al calcular la previsión, no al arrancar
+prevision_piezas = ModuloDiferido('prevision_piezas')
 
 # Implementación completa para VentanaGestionHangares
 class VentanaGestionHangares(tk.Toplevel):
@@ -93,28 +97,86 @@ class VentanaInventarioPiezas(tk.Toplevel):
         super().__init__(parent)
         self.parent = parent
         self.title("Gestión de Inventario de Piezas")
-        self.geometry("1000x500")
+        self.geometry("1200x600")
         self.configure(bg='#ecf0f1')
+        
+        self.var_mantenimiento = tk.StringVar()
+        self.var_pieza = tk.StringVar()
+        self.var_cantidad = tk.StringVar(value="1")
+        
         self.crear_interfaz()
         self.actualizar_inventario()
     
     def crear_interfaz(self):
-        columns = ("ID", "Nombre", "Descripción", "Stock", "Precio", "Proveedor", "Última Actualización")
+        columns = ("ID", "Nombre", "Descripción", "Stock", "Precio", "Proveedor", "Última Actualización",
+                   "Consumo/día", "Punto de Pedido", "Cobertura (días)")
         self.tree = ttk.Treeview(self, columns=columns, show='headings')
         
         for col in columns:
             self.tree.heading(col, text=col)
-            self.tree.column(col, width=120, anchor='center')
+            self.tree.column(col, width=110, anchor='center')
+        # Piezas en o bajo su punto de pedido
+        self.tree.tag_configure('reponer', foreground='#e74c3c')
         
         scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
         self.tree.configure(yscrollcommand=scrollbar.set)
         
+        # Registro de consumo en un mantenimiento
+        consumo_frame = tk.Frame(self, bg='#ecf0f1')
+        consumo_frame.pack(side='bottom', fill='x', padx=20, pady=10)
+        tk.Label(consumo_frame, text="ID Mantenimiento:", bg='#ecf0f1').pack(side='left')
+        ttk.Entry(consumo_frame, textvariable=self.var_mantenimiento, width=8).pack(side='left', padx=5)
+        tk.Label(consumo_frame, text="Pieza:", bg='#ecf0f1').pack(side='left')
+        self.combo_pieza = ttk.Combobox(consumo_frame, textvariable=self.var_pieza, width=30)
+        self.combo_pieza.pack(side='left', padx=5)
+        tk.Label(consumo_frame, text="Cantidad:", bg='#ecf0f1').pack(side='left')
+        ttk.Entry(consumo_frame, textvariable=self.var_cantidad, width=6).pack(side='left', padx=5)
+        tk.Button(consumo_frame, text="Registrar Consumo", command=self.registrar_consumo,
+                 bg='#e67e22', fg='white').pack(side='left', padx=10)
+        
         self.tree.pack(fill='both', expand=True, padx=20, pady=20)
         scrollbar.pack(side='right', fill='y')
     
     def actualizar_inventario(self):
+        for item in self.tree.get_children():
+            self.tree.delete(item)
         piezas = self.parent.db.obtener_piezas()
+        self.items = {}
         for p in piezas:
-            self.tree.insert('', 'end', values=(
-                p[0], p[1], p[2], p[3], f"Bs {p[4]:.2f}", p[5], p[6]
-            ))
\ No newline at end of file
+            self.items[p[0]] = self.tree.insert('', 'end', values=(
+                p[0], p[1], p[2], p[3], f"Bs {p[4]:.2f}", p[5], p[6], "", "", ""
+            ))
+        self.combo_pieza.config(values=[f"{p[0]}|{p[1]}" for p in piezas])
+        
+        # Previsión de reposición (numpy) fuera del hilo de Tk
+        self.parent.tareas.enviar(
+            lambda: prevision_piezas.PrevisionPiezas(self.parent.db).calcular(),
+            al_terminar=self.mostrar_prevision
+        )
+    
+    def mostrar_prevision(self, prevision):
+        for i, pieza_id in enumerate(prevision['id'].tolist()):
+            item = self.items.get(pieza_id)
+            if item is None:
+                continue
+            valores = list(self.tree.item(item, 'values'))
+            cobertura = prevision['dias_cobertura'][i]
+            valores[7:10] = (f"{prevision['consumo_diario'][i]:.2f}", int(prevision['punto_pedido'][i]),
+                             "∞" if cobertura == float('inf') else f"{cobertura:.0f}")
+            self.tree.item(item, values=valores, tags=('reponer',) if prevision['reponer'][i] else ())
+    
+    def registrar_consumo(self):
+        try:
+            mantenimiento_id = int(self.var_mantenimiento.get())
+            pieza_id = int(self.var_pieza.get().split("|")[0])
+            cantidad = int(self.var_cantidad.get())
+        except ValueError:
+            messagebox.showerror("Error", "Ingrese mantenimiento, pieza y cantidad válidos", parent=self)
+            return
+        
+        try:
+            self.parent.db.registrar_consumo_piezas(mantenimiento_id, [(pieza_id, cantidad)])
+        except ValueError as e:
+            messagebox.showerror("Error", str(e), parent=self)
+            return
+        self.actualizar_inventario()
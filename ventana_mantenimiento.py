@@ -2,6 +2,11 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
+from tabla_virtual import TablaVirtual, FuenteVistaDB
+from carga_diferida import ModuloDiferido
+
+# Usa numpy: se importa al abrir el planificador, no al arrancar
+planificador = ModuloDiferido('planificador')
 
 class VentanaProgramarMantenimiento(tk.Toplevel):
     def __init__(self, parent):
@@ -17,6 +22,8 @@ class VentanaProgramarMantenimiento(tk.Toplevel):
         self.var_tecnico = tk.StringVar()
         self.var_descripcion = tk.StringVar()
         self.var_costo = tk.DoubleVar(value=0.0)
+        self.var_hangar = tk.StringVar()
+        self.var_duracion = tk.StringVar(value="1")
         
         self.crear_interfaz()
     
@@ -53,9 +60,17 @@ class VentanaProgramarMantenimiento(tk.Toplevel):
         tk.Label(main_frame, text="Costo Estimado (Bs):", bg='#ecf0f1').grid(row=5, column=0, sticky='w', pady=5)
         ttk.Entry(main_frame, textvariable=self.var_costo, width=43).grid(row=5, column=1, pady=5)
         
+        # Hangar (opcional) y duración: se verifica que haya lugar y técnico libre
+        tk.Label(main_frame, text="Hangar:", bg='#ecf0f1').grid(row=6, column=0, sticky='w', pady=5)
+        hangares = [f"{h[0]}|{h[1]} - {h[2]}" for h in self.parent.db.obtener_hangares()]
+        ttk.Combobox(main_frame, textvariable=self.var_hangar, values=hangares, width=40).grid(row=6, column=1, pady=5)
+        
+        tk.Label(main_frame, text="Duración (días):", bg='#ecf0f1').grid(row=7, column=0, sticky='w', pady=5)
+        ttk.Entry(main_frame, textvariable=self.var_duracion, width=43).grid(row=7, column=1, pady=5)
+        
         # Botones
         btn_frame = tk.Frame(main_frame, bg='#ecf0f1')
-        btn_frame.grid(row=6, column=0, columnspan=3, pady=20)
+        btn_frame.grid(row=8, column=0, columnspan=3, pady=20)
         tk.Button(btn_frame, text="Guardar", command=self.guardar_mantenimiento, 
                  bg='#2ecc71', fg='white', width=15).pack(side='left', padx=10)
         tk.Button(btn_frame, text="Cancelar", command=self.destroy, 
@@ -120,6 +135,12 @@ class VentanaProgramarMantenimiento(tk.Toplevel):
             
             if costo < 0:
                 raise ValueError("Costo negativo")
+            
+            # Hangar opcional (formato: "ID|Nombre - Ubicación")
+            hangar_id = int(self.var_hangar.get().split("|")[0]) if self.var_hangar.get() else None
+            duracion_dias = int(self.var_duracion.get())
+            if duracion_dias < 1:
+                raise ValueError("La duración debe ser de al menos un día")
 
         except (ValueError, IndexError, AttributeError) as e:
             messagebox.showerror("Error", f"Datos inválidos: {str(e)}")
@@ -133,7 +154,9 @@ class VentanaProgramarMantenimiento(tk.Toplevel):
                 fecha_programada=self.var_fecha.get(),
                 tecnico_id=tecnico_id,
                 descripcion=self.var_descripcion.get(),
-                costo=costo
+                costo=costo,
+                hangar_id=hangar_id,
+                duracion_dias=duracion_dias
             )
             messagebox.showinfo("Éxito", "Mantenimiento registrado correctamente")
             self.destroy()
@@ -146,6 +169,13 @@ class VentanaProgramarMantenimiento(tk.Toplevel):
             messagebox.showerror("Error", f"No se pudo registrar el mantenimiento: {str(e)}")
 
 class VentanaAlertas(tk.Toplevel):
+    """Alertas de horas de vuelo, actualizadas de forma incremental.
+
+    Sólo se piden a la base las alertas que cambiaron desde la última versión
+    vista, y se insertan, actualizan o quitan únicamente esas filas.
+    """
+    INTERVALO_ACTUALIZACION_MS = 5000
+    
     def __init__(self, parent):
         super().__init__(parent)
         self.parent = parent
@@ -153,7 +183,12 @@ class VentanaAlertas(tk.Toplevel):
         self.geometry("800x400")
         self.configure(bg='#ecf0f1')
         
+        self.version = 0
+        self.items = {}   # aeronave_id -> item del Treeview
+        self._id_actualizacion = None
+        
         self.crear_interfaz()
+        self.protocol("WM_DELETE_WINDOW", self.cerrar)
         self.actualizar_alertas()
     
     def crear_interfaz(self):
@@ -172,18 +207,50 @@ class VentanaAlertas(tk.Toplevel):
         
         self.tree.pack(fill='both', expand=True, padx=20, pady=10)
         scrollbar.pack(side='right', fill='y')
+        
+        self.lbl_estado = tk.Label(self, text="", font=('Arial', 9), bg='#ecf0f1', fg='#c0392b')
+        self.lbl_estado.pack(pady=(0, 10))
     
     def actualizar_alertas(self):
-        aeronaves = self.parent.db.obtener_aeronaves_con_alertas()
-        for a in aeronaves:
-            self.tree.insert('', 'end', values=(
-                a[1], a[2], f"{a[6]:.1f} h", a[5], 
-                self.calcular_horas_restantes(a[5], a[6])
-            ))
-    
-    def calcular_horas_restantes(self, categoria, horas_actuales):
-        limites = {'Liviana': 100, 'Mediana': 150, 'Pesada': 200}
-        return f"{limites[categoria] - horas_actuales:.1f} h"
+        self._id_actualizacion = None
+        self.parent.tareas.enviar(self.parent.db.obtener_alertas_cambiadas, self.version,
+                                  al_terminar=self.aplicar_cambios,
+                                  al_error=self.lectura_fallida)
+    
+    def lectura_fallida(self, error):
+        """Informar el error sin interrumpir la actualización periódica"""
+        self.lbl_estado.config(text=f"No se pudieron leer las alertas: {error}. Reintentando...")
+        self._id_actualizacion = self.after(self.INTERVALO_ACTUALIZACION_MS, self.actualizar_alertas)
+    
+    def aplicar_cambios(self, resultado):
+        version, cambios = resultado
+        if version < self.version:
+            cambios = []   # Respuesta atrasada: sólo se reprograma la consulta
+        else:
+            self.version = version
+        for aeronave_id, matricula, modelo, categoria, horas, limite, activa in cambios:
+            item = self.items.get(aeronave_id)
+            if not activa:
+                if item is not None:
+                    self.tree.delete(item)
+                    del self.items[aeronave_id]
+                continue
+            valores = (matricula, modelo, f"{horas:.1f} h", categoria,
+                       self.calcular_horas_restantes(limite, horas))
+            if item is None:
+                self.items[aeronave_id] = self.tree.insert('', 'end', values=valores)
+            else:
+                self.tree.item(item, values=valores)
+        self.lbl_estado.config(text="")
+        self._id_actualizacion = self.after(self.INTERVALO_ACTUALIZACION_MS, self.actualizar_alertas)
+    
+    def calcular_horas_restantes(self, horas_limite, horas_actuales):
+        return f"{horas_limite - horas_actuales:.1f} h"
+    
+    def cerrar(self):
+        if self._id_actualizacion is not None:
+            self.after_cancel(self._id_actualizacion)
+        self.destroy()
 def guardar_mantenimiento(self):
     # Validaciones
     if not all([self.var_aeronave.get(), self.var_tipo.get(), 
@@ -226,24 +293,124 @@ class VentanaHistorialTecnico(tk.Toplevel):
         tk.Label(self, text="Historial de Mantenimientos Registrados", 
                 font=('Arial', 16, 'bold'), bg='#ecf0f1').pack(pady=20)
         
-        columns = ("ID", "Aeronave", "Modelo", "Tipo", "Fecha Programada", 
-                 "Técnico", "Estado", "Costo (Bs)")
-        self.tree = ttk.Treeview(self, columns=columns, show='headings')
+        columnas = [
+            ("id", "ID", 60, None),
+            ("matricula", "Aeronave", 120, None),
+            ("modelo", "Modelo", 140, None),
+            ("tipo", "Tipo", 120, None),
+            ("fecha_programada", "Fecha Programada", 130, None),
+            ("tecnico", "Técnico", 150, None),
+            ("estado", "Estado", 110, None),
+            ("costo", "Costo (Bs)", 120, lambda v: f"{v:,.2f}")
+        ]
+        self.tabla = TablaVirtual(self, FuenteVistaDB(self.parent.db, 'mantenimientos'), columnas,
+                                  orden='fecha_programada', descendente=True,
+                                  ejecutor=self.parent.tareas, bg='#ecf0f1')
+        self.tabla.pack(fill='both', expand=True, padx=20, pady=10)
+        self.tree = self.tabla.tree
+
+    def actualizar_historial(self):
+        self.tabla.refrescar()
+
+class VentanaPlanificador(tk.Toplevel):
+    """Propuesta de agenda para los mantenimientos urgentes de la flota"""
+    
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.parent = parent
+        self.title("Planificar Mantenimientos")
+        self.geometry("1000x600")
+        self.configure(bg='#ecf0f1')
+        
+        self.var_horizonte = tk.StringVar(value="30")
+        self.planificador = None
+        self.resultado = None
         
+        self.crear_interfaz()
+    
+    def crear_interfaz(self):
+        tk.Label(self, text="Planificación de Mantenimientos", 
+                font=('Arial', 16, 'bold'), bg='#ecf0f1').pack(pady=20)
+        
+        opciones_frame = tk.Frame(self, bg='#ecf0f1')
+        opciones_frame.pack(pady=5)
+        tk.Label(opciones_frame, text="Horizonte (días):", bg='#ecf0f1').pack(side='left')
+        ttk.Entry(opciones_frame, textvariable=self.var_horizonte, width=6).pack(side='left', padx=5)
+        tk.Button(opciones_frame, text="Generar Plan", command=self.generar_plan,
+                 bg='#3498db', fg='white').pack(side='left', padx=10)
+        self.btn_confirmar = tk.Button(opciones_frame, text="Confirmar Plan", command=self.confirmar_plan,
+                                       bg='#2ecc71', fg='white', state='disabled')
+        self.btn_confirmar.pack(side='left', padx=10)
+        
+        self.lbl_resumen = tk.Label(self, text="", bg='#ecf0f1', fg='#2c3e50', justify='left')
+        self.lbl_resumen.pack(pady=5)
+        
+        columns = ("Aeronave", "Fecha", "Días", "Técnico", "Hangar", "Descripción", "Plazo")
+        tabla_frame = tk.Frame(self)
+        tabla_frame.pack(fill='both', expand=True, padx=20, pady=10)
+        self.tree = ttk.Treeview(tabla_frame, columns=columns, show='headings')
         for col in columns:
             self.tree.heading(col, text=col)
-            self.tree.column(col, width=120, anchor='center')
+            self.tree.column(col, width=130, anchor='center')
+        self.tree.tag_configure('atrasada', foreground='#e74c3c')
         
-        scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
+        scrollbar = ttk.Scrollbar(tabla_frame, orient="vertical", command=self.tree.yview)
         self.tree.configure(yscrollcommand=scrollbar.set)
-        
-        self.tree.pack(fill='both', expand=True, padx=20, pady=10)
+        self.tree.pack(side='left', fill='both', expand=True)
         scrollbar.pack(side='right', fill='y')
-
-    def actualizar_historial(self):
-        mantenimientos = self.parent.db.obtener_mantenimientos()
-        for m in mantenimientos:
-            self.tree.insert('', 'end', values=(
-                m[0], m[7], m[8], m[2], m[3],
-                m[9], m[6], f"{m[8]:,.2f}"
-            ))
\ No newline at end of file
+    
+    def generar_plan(self):
+        try:
+            horizonte = int(self.var_horizonte.get())
+            if horizonte < 1:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "El horizonte debe ser un entero positivo", parent=self)
+            return
+        
+        self.btn_confirmar.config(state='disabled')
+        self.lbl_resumen.config(text="🔄 Analizando la flota y planificando...")
+        self.planificador = planificador.PlanificadorMantenimiento(self.parent.db, horizonte_dias=horizonte)
+        self.parent.tareas.enviar(
+            self._planificar,
+            al_terminar=self.mostrar_plan,
+            al_error=lambda error: messagebox.showerror(
+                "Error", f"No se pudo planificar: {error}", parent=self)
+        )
+    
+    def _planificar(self):
+        prioridades = self.parent.ia_sistema.priorizar_mantenimiento_flota()
+        return self.planificador.planificar(planificador.demandas_desde_prioridades(prioridades))
+    
+    def mostrar_plan(self, resultado):
+        self.resultado = resultado
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        
+        tecnicos = {t[0]: t[1] for t in self.parent.db.obtener_tecnicos()}
+        hangares = {h[0]: h[1] for h in self.parent.db.obtener_hangares()}
+        aeronaves = self.parent.db.obtener_aeronaves_por_ids(
+            [a.demanda.aeronave_id for a in resultado.asignaciones[:1000]])
+        for a in resultado.asignaciones[:1000]:
+            aeronave = aeronaves.get(a.demanda.aeronave_id)
+            self.tree.insert('', 'end', tags=('atrasada',) if a.atrasada else (), values=(
+                aeronave[1] if aeronave else a.demanda.aeronave_id, a.fecha, a.demanda.duracion_dias,
+                tecnicos.get(a.tecnico_id, a.tecnico_id), hangares.get(a.hangar_id, a.hangar_id),
+                a.demanda.descripcion, "Fuera de plazo" if a.atrasada else "OK"))
+        
+        self.lbl_resumen.config(text=resultado.resumen())
+        if resultado.asignaciones:
+            self.btn_confirmar.config(state='normal')
+    
+    def confirmar_plan(self):
+        if not self.resultado:
+            return
+        self.btn_confirmar.config(state='disabled')
+        self.parent.tareas.enviar(
+            self.planificador.guardar, self.resultado,
+            al_terminar=lambda cantidad: messagebox.showinfo(
+                "Éxito", f"{cantidad} mantenimientos programados", parent=self),
+            al_error=lambda error: messagebox.showerror(
+                "Error", f"No se pudo guardar el plan: {error}\n\nVuelva a planificar.", parent=self)
+        )
+        self.resultado = None
@@ -1,8 +1,9 @@
 # ventana_reportes.py - Ventanas para reportes y estadísticas
 import tkinter as tk
-from tkinter import ttk
-import matplotlib.pyplot as plt
+from tkinter import ttk, messagebox, filedialog
+from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from reportes import GeneradorReportes, SolicitudReporte
 
 class VentanaEstadisticas(tk.Toplevel):
     def __init__(self, parent):
@@ -13,10 +14,37 @@ class VentanaEstadisticas(tk.Toplevel):
         self.crear_interfaz()
     
     def crear_interfaz(self):
-        stats = self.parent.db.obtener_estadisticas_generales()
+        tk.Button(self, text="💾 Exportar Reporte (PDF/PNG/CSV)", command=self.exportar,
+                 bg='#27ae60', fg='white').pack(anchor='e', padx=20, pady=(10, 0))
+        self.lbl_cargando = tk.Label(self, text="Generando reporte...", font=('Arial', 12))
+        self.lbl_cargando.pack(pady=20)
+        
+        # Consultar en segundo plano y dibujar al recibir los datos
+        self.parent.tareas.enviar(self.parent.db.obtener_estadisticas_generales,
+                                  al_terminar=self.mostrar_estadisticas,
+                                  al_error=self.mostrar_error)
+    
+    def mostrar_error(self, error):
+        self.lbl_cargando.config(text="No se pudo generar el reporte")
+        messagebox.showerror("Error", f"Error al generar reporte: {error}", parent=self)
+    
+    def exportar(self):
+        directorio = filedialog.askdirectory(parent=self, title="Carpeta para el reporte")
+        if not directorio:
+            return
+        # Render sin Tk (Agg) fuera del hilo de la interfaz
+        self.parent.tareas.enviar(
+            lambda: GeneradorReportes(self.parent.db, directorio).generar(SolicitudReporte()),
+            al_terminar=lambda rutas: messagebox.showinfo(
+                "Reporte exportado", "Archivos generados:\n" + "\n".join(rutas), parent=self),
+            al_error=lambda e: messagebox.showerror("Error", f"Error al exportar reporte: {e}", parent=self)
+        )
+    
+    def mostrar_estadisticas(self, stats):
+        self.lbl_cargando.destroy()
         
         # Gráfico de categorías
-        fig = plt.Figure(figsize=(6,4))
+        fig = Figure(figsize=(6,4))
         ax = fig.add_subplot(111)
         categorias = list(stats['aeronaves_por_categoria'].keys())
         valores = list(stats['aeronaves_por_categoria'].values())
@@ -27,27 +55,87 @@ class VentanaEstadisticas(tk.Toplevel):
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
 
 class VentanaReporteCostos(tk.Toplevel):
+    AGRUPACIONES = {
+        "Tipo": 'tipo',
+        "Mes": 'mes',
+        "Aeronave": 'aeronave',
+        "Categoría": 'categoria',
+        "Hangar": 'hangar'
+    }
+    MAX_BARRAS = 15
+    
     def __init__(self, parent):
         super().__init__(parent)
         self.parent = parent
         self.title("Reporte de Costos")
-        self.geometry("800x600")
+        self.geometry("900x750")
+        self.var_agrupacion = tk.StringVar(value="Tipo")
         self.crear_interfaz()
     
     def crear_interfaz(self):
-        stats = self.parent.db.obtener_estadisticas_generales()
+        control_frame = tk.Frame(self)
+        control_frame.pack(fill='x', padx=20, pady=10)
+        tk.Label(control_frame, text="Agrupar por:").pack(side='left')
+        combo = ttk.Combobox(control_frame, textvariable=self.var_agrupacion, state='readonly',
+                             values=list(self.AGRUPACIONES), width=15)
+        combo.pack(side='left', padx=5)
+        combo.bind('<<ComboboxSelected>>', lambda e: self.cargar_costos())
+        self.lbl_cargando = tk.Label(control_frame, text="", fg='#7f8c8d')
+        self.lbl_cargando.pack(side='left', padx=10)
         
-        fig = plt.Figure(figsize=(8,5))
-        ax = fig.add_subplot(111)
+        # Una sola figura, redibujada en cada cambio de agrupación
+        self.fig = Figure(figsize=(8, 4))
+        self.canvas = FigureCanvasTkAgg(self.fig, self)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=20)
         
-        # Gráfico de torta de costos por tipo
-        costos = self.parent.db.obtener_costos_por_tipo()
-        ax.pie(
-            [c[1] for c in costos],
-            labels=[c[0] for c in costos],
-            autopct='%1.1f%%'
-        )
-        ax.set_title("Distribución de Costos por Tipo de Mantenimiento")
+        columns = ("Grupo", "Costo Total", "Mantenimientos", "Costo Promedio")
+        self.tree = ttk.Treeview(self, columns=columns, show='headings', height=8)
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=150, anchor='center')
+        self.tree.pack(fill='x', padx=20, pady=10)
         
-        canvas = FigureCanvasTkAgg(fig, self)
-        canvas.get_tk_widget().pack()
+        self.cargar_costos()
+    
+    def cargar_costos(self):
+        agrupacion = self.AGRUPACIONES[self.var_agrupacion.get()]
+        self.lbl_cargando.config(text="Generando reporte...")
+        
+        # Consultar en segundo plano y dibujar al recibir los datos
+        self.parent.tareas.enviar(self.parent.db.obtener_costos, agrupacion,
+                                  al_terminar=lambda costos: self.mostrar_costos(agrupacion, costos),
+                                  al_error=self.mostrar_error)
+    
+    def mostrar_error(self, error):
+        self.lbl_cargando.config(text="No se pudo generar el reporte")
+        messagebox.showerror("Error", f"Error al generar reporte: {error}", parent=self)
+    
+    def mostrar_costos(self, agrupacion, costos):
+        if agrupacion != self.AGRUPACIONES[self.var_agrupacion.get()]:
+            return    # Llegó tarde: el usuario ya eligió otra agrupación
+        self.lbl_cargando.config(text=f"Total: Bs {sum(c[1] for c in costos):,.2f}")
+        
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        for clave, total, cantidad, promedio in costos:
+            self.tree.insert('', 'end', values=(clave, f"Bs {total:,.2f}", cantidad, f"Bs {promedio:,.2f}"))
+        
+        self.fig.clear()
+        ax = self.fig.add_subplot(111)
+        titulo = self.var_agrupacion.get()
+        if not costos:
+            ax.text(0.5, 0.5, "Sin mantenimientos registrados", ha='center', va='center')
+            ax.set_axis_off()
+        elif agrupacion == 'tipo':
+            # Gráfico de torta de costos por tipo
+            ax.pie([c[1] for c in costos], labels=[c[0] for c in costos], autopct='%1.1f%%')
+            ax.set_title("Distribución de Costos por Tipo de Mantenimiento")
+        else:
+            # Los meses en orden cronológico (los últimos); el resto, los de mayor costo
+            visibles = costos[-self.MAX_BARRAS:] if agrupacion == 'mes' else costos[:self.MAX_BARRAS]
+            ax.bar([str(c[0]) for c in visibles], [c[1] for c in visibles], color='#3498db')
+            ax.set_title(f"Costos de Mantenimiento por {titulo}")
+            ax.set_ylabel("Bs")
+            ax.tick_params(axis='x', labelrotation=45, labelsize=8)
+            self.fig.tight_layout()
+        self.canvas.draw_idle()